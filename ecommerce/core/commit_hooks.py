@@ -0,0 +1,52 @@
+"""
+Callbacks run once the changes made while handling the current request are committed.
+
+Django 1.8 has no transaction.on_commit(). Views run in a transaction (ATOMIC_REQUESTS), which is committed
+before the response goes through the middleware, so CommitCallbackMiddleware runs the callbacks registered while
+handling a request once its response is ready.
+"""
+from collections import OrderedDict
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def start_request_callbacks():
+    """ Start collecting the callbacks of a request handled by the current thread. """
+    _local.callbacks = OrderedDict()
+
+
+def run_request_callbacks():
+    """ Run, and forget, the callbacks registered while handling the current request. """
+    callbacks = getattr(_local, 'callbacks', None)
+    _local.callbacks = None
+    for func, args in (callbacks or {}):
+        try:
+            func(*args)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to run callback [%s] after committing a request.', func.__name__)
+
+
+def on_request_commit(func, *args):
+    """
+    Run a callback once the changes of the request being handled by the current thread are committed.
+
+    A callback registered several times, with the same arguments, is only run once.
+
+    Arguments:
+        func (callable): Callback.
+        args: Hashable arguments of the callback.
+
+    Returns:
+        bool: Whether the callback was registered. Callbacks are not registered outside of requests, e.g. in
+            Celery tasks and management commands.
+    """
+    callbacks = getattr(_local, 'callbacks', None)
+    if callbacks is None:
+        return False
+
+    callbacks[(func, args)] = True
+    return True
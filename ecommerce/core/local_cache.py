@@ -0,0 +1,80 @@
+"""Per-process LRU caches, kept in front of the shared Django cache."""
+from collections import Counter, OrderedDict
+import threading
+import time
+
+from django.conf import settings
+from django.utils.six.moves import cPickle as pickle
+
+
+class LocalCache(object):
+    """
+    Per-process LRU cache.
+
+    Entries are stored pickled, so that every lookup returns its own copy of the cached object, which can be
+    modified without affecting other requests. Save signals only reach the process that made the change, so
+    entries expire after a timeout. Entries may also be tagged with a version, usually found in the shared
+    cache: changing the version makes every process stop using the entries tagged with the previous one.
+
+    Lookups are counted in stats, by the callers of the cache.
+    """
+
+    def __init__(self, timeout_setting, size_setting):
+        """
+        Arguments:
+            timeout_setting (str): Name of the setting holding the lifetime of entries, in seconds.
+            size_setting (str): Name of the setting holding the maximum number of entries.
+        """
+        self.timeout_setting = timeout_setting
+        self.size_setting = size_setting
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    def get_many(self, keys, version=None):
+        """ Returns the unexpired entries of the given keys, tagged with the given version, by key. """
+        pickled_values = {}
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.pop(key, None)
+                if entry is None:
+                    continue
+
+                entry_version, expires, pickled_value = entry
+                if entry_version != version or expires < now:
+                    continue
+
+                # Re-insert the entry to mark it as the most recently used.
+                self._entries[key] = entry
+                pickled_values[key] = pickled_value
+
+        return {key: pickle.loads(pickled_value) for key, pickled_value in pickled_values.items()}
+
+    def get(self, key, version=None):
+        return self.get_many([key], version).get(key)
+
+    def set_many(self, values, version=None):
+        """ Stores the given values, by key, tagged with the given version. """
+        expires = time.time() + getattr(settings, self.timeout_setting)
+        entries = [
+            (key, (version, expires, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+            for key, value in values.items()
+        ]
+        with self._lock:
+            for key, entry in entries:
+                self._entries.pop(key, None)
+                self._entries[key] = entry
+            while len(self._entries) > getattr(settings, self.size_setting):
+                self._entries.popitem(last=False)
+
+    def set(self, key, value, version=None):
+        self.set_many({key: value}, version)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
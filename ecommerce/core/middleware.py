@@ -0,0 +1,17 @@
+from ecommerce.core.commit_hooks import run_request_callbacks, start_request_callbacks
+
+
+class CommitCallbackMiddleware(object):
+    """
+    Middleware that runs the callbacks registered with on_request_commit() once the request's changes are committed.
+
+    It should be the first middleware, so that the callbacks run after every other middleware has handled
+    the response.
+    """
+
+    def process_request(self, request):  # pylint: disable=unused-argument
+        start_request_callbacks()
+
+    def process_response(self, request, response):  # pylint: disable=unused-argument
+        run_request_callbacks()
+        return response
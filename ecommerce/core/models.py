@@ -3,7 +3,6 @@ import hashlib
 import logging
 from urlparse import urljoin
 
-from analytics import Client as SegmentClient
 from dateutil.parser import parse
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
@@ -22,8 +21,9 @@ from slumber.exceptions import HttpNotFoundError, SlumberBaseException
 from ecommerce.core.exceptions import VerificationStatusError
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.utils import mode_for_seat
+from ecommerce.extensions.analytics.utils import get_segment_client
 from ecommerce.extensions.payment.exceptions import ProcessorNotFoundError
-from ecommerce.extensions.payment.helpers import get_processor_class_by_name, get_processor_class
+from ecommerce.extensions.payment.helpers import get_processor_class_by_name, resolve_processor_classes
 
 log = logging.getLogger(__name__)
 
@@ -175,11 +175,6 @@ class SiteConfiguration(models.Model):
             raise ValidationError('Processor [{processor}] must be in the payment_processors field in order to '
                                   'be configured as a client-side processor.'.format(processor=value))
 
-    def _all_payment_processors(self):
-        """ Returns all processor classes declared in settings. """
-        all_processors = [get_processor_class(path) for path in settings.PAYMENT_PROCESSORS]
-        return all_processors
-
     def get_payment_processors(self):
         """
         Returns payment processor classes enabled for the corresponding Site
@@ -187,20 +182,15 @@ class SiteConfiguration(models.Model):
         Returns:
             list[BasePaymentProcessor]: Returns payment processor classes enabled for the corresponding Site
         """
-        all_processors = self._all_payment_processors()
-        all_processor_names = {processor.NAME for processor in all_processors}
+        resolved = resolve_processor_classes(self.payment_processors)
 
-        missing_processor_configurations = self.payment_processors_set - all_processor_names
-        if missing_processor_configurations:
-            processor_config_repr = ", ".join(missing_processor_configurations)
+        if resolved.unknown_names:
+            processor_config_repr = ", ".join(resolved.unknown_names)
             log.warning(
                 'Unknown payment processors [%s] are configured for site %s', processor_config_repr, self.site.id
             )
 
-        return [
-            processor for processor in all_processors
-            if processor.NAME in self.payment_processors_set and processor.is_enabled()
-        ]
+        return resolved.enabled
 
     def get_client_side_payment_processor_class(self):
         """ Returns the payment processor class to be used for client-side payments.
@@ -211,9 +201,10 @@ class SiteConfiguration(models.Model):
              BasePaymentProcessor
         """
         if self.client_side_payment_processor:
-            for processor in self._all_payment_processors():
-                if processor.NAME == self.client_side_payment_processor:
-                    return processor
+            try:
+                return get_processor_class_by_name(self.client_side_payment_processor)
+            except ProcessorNotFoundError:
+                pass
 
         return None
 
@@ -235,9 +226,10 @@ class SiteConfiguration(models.Model):
         if not exclude or 'client_side_payment_processor' not in exclude:
             self._clean_client_side_payment_processor()
 
-    @cached_property
+    @property
     def segment_client(self):
-        return SegmentClient(self.segment_key, debug=settings.DEBUG)
+        """ Returns the process-wide Segment client of the site's write key. """
+        return get_segment_client(self.segment_key)
 
     def save(self, *args, **kwargs):
         # Clear Site cache upon SiteConfiguration changed
@@ -0,0 +1,28 @@
+"""Utilities for code running outside of requests, such as Celery tasks."""
+from contextlib import contextmanager
+
+from django.http import HttpRequest
+from threadlocals.threadlocals import get_current_request, set_thread_variable
+
+
+@contextmanager
+def site_request(site):
+    """
+    Install a request for the given site as the current request, for the duration of the block.
+
+    Code building URLs, or reading the site configuration, reads the site of the current request. Tasks run
+    without a request, so they install one for the site they work on. The previous request is restored after.
+
+    Arguments:
+        site (Site): Site of the request.
+    """
+    previous_request = get_current_request()
+    request = HttpRequest()
+    request.META['HTTP_HOST'] = site.domain
+    request.site = site
+    set_thread_variable('request', request)
+
+    try:
+        yield request
+    finally:
+        set_thread_variable('request', previous_request)
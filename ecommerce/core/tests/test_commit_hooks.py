@@ -0,0 +1,47 @@
+import mock
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from ecommerce.core.commit_hooks import on_request_commit
+from ecommerce.core.middleware import CommitCallbackMiddleware
+from ecommerce.tests.testcases import TestCase
+
+
+class CommitCallbackMiddlewareTests(TestCase):
+    def setUp(self):
+        super(CommitCallbackMiddlewareTests, self).setUp()
+        self.middleware = CommitCallbackMiddleware()
+        self.request = RequestFactory().get('/')
+
+    def test_callbacks_run_once_with_response(self):
+        """ Callbacks should run once per distinct set of arguments, when the response is processed. """
+        callback = mock.Mock(__name__='callback')
+        self.middleware.process_request(self.request)
+        self.assertTrue(on_request_commit(callback, 1))
+        self.assertTrue(on_request_commit(callback, 1))
+        self.assertTrue(on_request_commit(callback, 2))
+        self.assertFalse(callback.called)
+
+        response = HttpResponse()
+        self.assertEqual(self.middleware.process_response(self.request, response), response)
+        self.assertEqual(callback.call_args_list, [mock.call(1), mock.call(2)])
+
+    def test_callbacks_outside_request(self):
+        """ Callbacks should not be registered outside of requests. """
+        callback = mock.Mock(__name__='callback')
+        self.middleware.process_request(self.request)
+        self.middleware.process_response(self.request, HttpResponse())
+        self.assertFalse(on_request_commit(callback))
+
+    def test_failing_callback(self):
+        """ A failing callback should be logged, without preventing the other callbacks from running. """
+        failing_callback = mock.Mock(__name__='failing_callback', side_effect=Exception)
+        callback = mock.Mock(__name__='callback')
+        self.middleware.process_request(self.request)
+        on_request_commit(failing_callback)
+        on_request_commit(callback)
+
+        with mock.patch('ecommerce.core.commit_hooks.logger.exception') as mock_log:
+            self.middleware.process_response(self.request, HttpResponse())
+        self.assertTrue(mock_log.called)
+        callback.assert_called_once_with()
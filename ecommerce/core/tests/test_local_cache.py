@@ -0,0 +1,53 @@
+import mock
+from django.test import override_settings
+
+from ecommerce.core.local_cache import LocalCache
+from ecommerce.tests.testcases import TestCase
+
+
+@override_settings(TEST_LOCAL_CACHE_TIMEOUT=60, TEST_LOCAL_CACHE_SIZE=2)
+class LocalCacheTests(TestCase):
+    def setUp(self):
+        super(LocalCacheTests, self).setUp()
+        self.local_cache = LocalCache('TEST_LOCAL_CACHE_TIMEOUT', 'TEST_LOCAL_CACHE_SIZE')
+
+    def test_copies(self):
+        """ Every lookup should return its own copy of the cached value. """
+        value = {'a': 1}
+        self.local_cache.set('key', value)
+        value['a'] = 2
+
+        cached_value = self.local_cache.get('key')
+        self.assertEqual(cached_value, {'a': 1})
+        cached_value['a'] = 3
+        self.assertEqual(self.local_cache.get('key'), {'a': 1})
+
+    def test_versions(self):
+        """ Entries should only be returned for the version they were stored with. """
+        self.local_cache.set_many({'a': 1, 'b': 2}, version='1')
+        self.assertEqual(self.local_cache.get_many(['a', 'b', 'c'], version='1'), {'a': 1, 'b': 2})
+        self.assertEqual(self.local_cache.get_many(['a', 'b'], version='2'), {})
+        self.assertIsNone(self.local_cache.get('a'))
+
+    def test_expiry(self):
+        """ Entries should expire after the configured timeout. """
+        self.local_cache.set('key', 1)
+        with mock.patch('ecommerce.core.local_cache.time.time', return_value=10 ** 12):
+            self.assertIsNone(self.local_cache.get('key'))
+
+    def test_least_recently_used_eviction(self):
+        """ The least recently used entries should be evicted once the cache is full. """
+        self.local_cache.set('a', 1)
+        self.local_cache.set('b', 2)
+        self.local_cache.get('a')
+        self.local_cache.set('c', 3)
+
+        self.assertEqual(self.local_cache.get_many(['a', 'b', 'c']), {'a': 1, 'c': 3})
+
+    def test_delete_and_clear(self):
+        self.local_cache.set_many({'a': 1, 'b': 2})
+        self.local_cache.delete('a')
+        self.assertEqual(self.local_cache.get_many(['a', 'b']), {'b': 2})
+
+        self.local_cache.clear()
+        self.assertEqual(self.local_cache.get_many(['a', 'b']), {})
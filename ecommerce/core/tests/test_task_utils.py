@@ -0,0 +1,19 @@
+from threadlocals.threadlocals import get_current_request
+
+from ecommerce.core.task_utils import site_request
+from ecommerce.tests.factories import SiteConfigurationFactory
+from ecommerce.tests.testcases import TestCase
+
+
+class SiteRequestTests(TestCase):
+    def test_site_request(self):
+        """ Verify a request for the site is installed for the block, and the previous request restored after. """
+        previous_request = get_current_request()
+        site = SiteConfigurationFactory().site
+
+        with site_request(site) as request:
+            self.assertIs(get_current_request(), request)
+            self.assertEqual(request.site, site)
+            self.assertEqual(request.META['HTTP_HOST'], site.domain)
+
+        self.assertIs(get_current_request(), previous_request)
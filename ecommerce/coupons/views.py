@@ -20,8 +20,9 @@ from ecommerce.core.views import StaffOnlyMixin
 from ecommerce.coupons.decorators import login_required_for_credit
 from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.basket.utils import prepare_basket
+from ecommerce.extensions.catalogue.utils import get_products
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
-from ecommerce.extensions.voucher.utils import get_voucher_and_products_from_code
+from ecommerce.extensions.voucher.utils import get_cached_voucher, get_voucher_and_products_from_code
 
 Applicator = get_class('offer.utils', 'Applicator')
 Basket = get_model('basket', 'Basket')
@@ -31,7 +32,6 @@ OrderLineVouchers = get_model('voucher', 'OrderLineVouchers')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
 Selector = get_class('partner.strategy', 'Selector')
-StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
 
@@ -132,14 +132,13 @@ class CouponRedeemView(EdxOrderPlacementMixin, View):
             return render(request, template_name, {'error': _('SKU not provided.')})
 
         try:
-            voucher = Voucher.objects.get(code=code)
+            voucher = get_cached_voucher(code)
         except Voucher.DoesNotExist:
             msg = 'No voucher found with code {code}'.format(code=code)
             return render(request, template_name, {'error': _(msg)})
 
-        try:
-            product = StockRecord.objects.get(partner_sku=sku).product
-        except StockRecord.DoesNotExist:
+        product = get_products([sku]).get(sku)
+        if product is None:
             return render(request, template_name, {'error': _('The product does not exist.')})
 
         valid_voucher, msg = voucher_is_valid(voucher, [product], request)
@@ -1,7 +1,9 @@
 from __future__ import unicode_literals
+import hashlib
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models import Q, Count
 from django.utils.translation import ugettext_lazy as _
@@ -9,13 +11,14 @@ from oscar.core.loading import get_model
 from simple_history.models import HistoricalRecords
 import waffle
 
+from ecommerce.core.commit_hooks import on_request_commit
 from ecommerce.core.constants import (
     ENROLLMENT_CODE_PRODUCT_CLASS_NAME,
     ENROLLMENT_CODE_SEAT_TYPES,
     ENROLLMENT_CODE_SWITCH
 )
 from ecommerce.courses.publishers import LMSPublisher
-from ecommerce.extensions.catalogue.utils import generate_sku
+from ecommerce.extensions.catalogue.utils import generate_sku, get_seats, prefetch_product_attributes
 
 logger = logging.getLogger(__name__)
 Category = get_model('catalogue', 'Category')
@@ -25,6 +28,25 @@ ProductCategory = get_model('catalogue', 'ProductCategory')
 ProductClass = get_model('catalogue', 'ProductClass')
 StockRecord = get_model('partner', 'StockRecord')
 
+SEAT_INDEX_CACHE_KEY = 'seat_index_{course_id}_{certificate_type}_{id_verification_required}'
+SIBLING_SKUS_CACHE_KEY = 'sibling_skus_{course_id}'
+
+
+def get_sibling_skus_cache_key(course_id):
+    return SIBLING_SKUS_CACHE_KEY.format(course_id=hashlib.md5(course_id.encode('utf-8')).hexdigest())
+
+
+def invalidate_cache_key(cache_key):
+    """
+    Delete a key from the shared cache, so that its value is computed again from the database when next read.
+
+    The key is deleted again once the changes of the current request are committed, in case it was read, and
+    cached, from the state of the database before the commit. Values are never written to the shared cache
+    while saving, since they would outlive a rollback.
+    """
+    cache.delete(cache_key)
+    on_request_commit(cache.delete, cache_key)
+
 
 class Course(models.Model):
     id = models.CharField(null=False, max_length=255, primary_key=True, verbose_name='ID')
@@ -87,7 +109,8 @@ class Course(models.Model):
     @property
     def type(self):
         """ Returns the type of the course (based on the available seat types). """
-        seat_types = [getattr(seat.attr, 'certificate_type', '').lower() for seat in self.seat_products]
+        seats = prefetch_product_attributes(self.seat_products)
+        seat_types = [getattr(seat.attr, 'certificate_type', '').lower() for seat in seats]
         if 'credit' in seat_types:
             return 'credit'
         elif 'professional' in seat_types or 'no-id-professional' in seat_types:
@@ -107,6 +130,55 @@ class Course(models.Model):
         """ Returns a queryset of course seat Products related to this course. """
         return self.parent_seat_product.children.all().prefetch_related('stockrecords')
 
+    def _get_seat_index_cache_key(self, certificate_type, id_verification_required):
+        return SEAT_INDEX_CACHE_KEY.format(
+            course_id=hashlib.md5(self.id.encode('utf-8')).hexdigest(),
+            certificate_type=certificate_type,
+            id_verification_required=id_verification_required
+        )
+
+    def get_seat(self, certificate_type, id_verification_required):
+        """
+        Returns the non-credit seat with the given certificate type and verification requirement.
+
+        Seat IDs are indexed in the shared cache as seats are retrieved, so that a seat is usually retrieved
+        with a single query on its primary key. Seats missing from the index, e.g. because
+        create_or_update_seat() removed them from it, are looked up through their projections, rather than by
+        joining their attribute values.
+
+        Raises:
+            Product.DoesNotExist: If the course has no such seat.
+        """
+        certificate_type = certificate_type.lower()
+        cache_key = self._get_seat_index_cache_key(certificate_type, id_verification_required)
+        seat_id = cache.get(cache_key)
+        if seat_id is not None:
+            try:
+                return Product.objects.get(id=seat_id, course=self, structure=Product.CHILD)
+            except Product.DoesNotExist:
+                # The seat has been deleted since it was indexed.
+                cache.delete(cache_key)
+
+        seat = get_seats(
+            course_ids=[self.id],
+            certificate_types=[certificate_type],
+            id_verification_required=id_verification_required,
+            credit_provider=''
+        ).get()
+        cache.set(cache_key, seat.id, settings.SEAT_INDEX_CACHE_TIMEOUT)
+        return seat
+
+    def _get_certificate_type_query(self, certificate_type):
+        if certificate_type == self.certificate_type_for_mode('audit'):
+            # Yields a match if attribute names do not include 'certificate_type'.
+            return ~Q(attributes__name='certificate_type')
+
+        # Yields a match if attribute with name 'certificate_type' matches provided value.
+        return Q(
+            attributes__name='certificate_type',
+            attribute_values__value_text=certificate_type
+        )
+
     def get_course_seat_name(self, certificate_type, id_verification_required):
         """ Returns the name for a course seat. """
         name = u'Seat in {}'.format(self.name)
@@ -153,15 +225,7 @@ class Course(models.Model):
         certificate_type = certificate_type.lower()
         course_id = unicode(self.id)
 
-        if certificate_type == self.certificate_type_for_mode('audit'):
-            # Yields a match if attribute names do not include 'certificate_type'.
-            certificate_type_query = ~Q(attributes__name='certificate_type')
-        else:
-            # Yields a match if attribute with name 'certificate_type' matches provided value.
-            certificate_type_query = Q(
-                attributes__name='certificate_type',
-                attribute_values__value_text=certificate_type
-            )
+        certificate_type_query = self._get_certificate_type_query(certificate_type)
 
         id_verification_required_query = Q(
             attributes__name='id_verification_required',
@@ -224,6 +288,10 @@ class Course(models.Model):
 
         seat.save()
 
+        if not credit_provider:
+            # Credit seats are told apart by their provider, which the seat index does not include.
+            invalidate_cache_key(self._get_seat_index_cache_key(certificate_type, id_verification_required))
+
         try:
             stock_record = StockRecord.objects.get(product=seat, partner=partner)
             logger.info(
@@ -257,7 +325,9 @@ class Course(models.Model):
                 id_verification_required_query,
                 orders=0
             ).delete()
+            invalidate_cache_key(self._get_seat_index_cache_key(certificate_type, not id_verification_required))
 
+        invalidate_cache_key(get_sibling_skus_cache_key(self.id))
         return seat
 
     @property
@@ -316,4 +386,45 @@ class Course(models.Model):
         stock_record.price_currency = settings.OSCAR_DEFAULT_CURRENCY
         stock_record.save()
 
+        invalidate_cache_key(get_sibling_skus_cache_key(self.id))
         return enrollment_code
+
+    def update_sibling_skus(self):
+        """
+        Index, in the shared cache, the SKU of the sibling of every seat and enrollment code of the course.
+
+        The sibling of a seat is the enrollment code of its certificate type, and the sibling of an enrollment
+        code is a seat of its seat type. Basket switch links lead from a product to its sibling.
+
+        Returns:
+            dict: SKUs of the siblings, by product ID.
+        """
+        products = prefetch_product_attributes(
+            self.products.exclude(structure=Product.PARENT).prefetch_related('stockrecords').order_by('id')
+        )
+
+        seat_skus = {}
+        enrollment_code_skus = {}
+        for product in products:
+            skus = [stock_record.partner_sku for stock_record in product.stockrecords.all()]
+            if not skus:
+                continue
+
+            certificate_type = getattr(product.attr, 'certificate_type', None)
+            seat_type = getattr(product.attr, 'seat_type', None)
+            if certificate_type:
+                seat_skus.setdefault(certificate_type, skus[0])
+            elif seat_type:
+                enrollment_code_skus.setdefault(seat_type, skus[0])
+
+        sibling_skus = {}
+        for product in products:
+            certificate_type = getattr(product.attr, 'certificate_type', None)
+            seat_type = getattr(product.attr, 'seat_type', None)
+            if certificate_type in enrollment_code_skus:
+                sibling_skus[product.id] = enrollment_code_skus[certificate_type]
+            elif seat_type in seat_skus:
+                sibling_skus[product.id] = seat_skus[seat_type]
+
+        cache.set(get_sibling_skus_cache_key(self.id), sibling_skus, settings.SIBLING_SKUS_CACHE_TIMEOUT)
+        return sibling_skus
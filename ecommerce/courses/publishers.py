@@ -12,6 +12,7 @@ import requests
 from ecommerce.core.constants import ENROLLMENT_CODE_SEAT_TYPES
 from ecommerce.core.url_utils import get_lms_url, get_lms_commerce_api_url
 from ecommerce.courses.utils import mode_for_seat
+from ecommerce.extensions.catalogue.utils import prefetch_product_attributes
 
 logger = logging.getLogger(__name__)
 Product = get_model('catalogue', 'Product')
@@ -93,7 +94,8 @@ class LMSPublisher(object):
 
         name = course.name
         verification_deadline = self.get_course_verification_deadline(course)
-        modes = [self.serialize_seat_for_commerce_api(seat) for seat in course.seat_products]
+        seats = prefetch_product_attributes(course.seat_products)
+        modes = [self.serialize_seat_for_commerce_api(seat) for seat in seats]
 
         has_credit = 'credit' in [mode['name'] for mode in modes]
         if has_credit:
@@ -1,10 +1,12 @@
 import ddt
 from django.conf import settings
+from django.core.cache import cache
 import mock
 from oscar.core.loading import get_model
 from oscar.test.factories import create_order
 from oscar.test.newfactories import BasketFactory
 
+from ecommerce.core.commit_hooks import run_request_callbacks, start_request_callbacks
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, ENROLLMENT_CODE_SWITCH
 from ecommerce.core.tests import toggle_switch
 from ecommerce.courses.models import Course
@@ -157,6 +159,62 @@ class CourseTests(CourseCatalogTestMixin, TestCase):
         self.assertEqual(stock_record.price_currency, settings.OSCAR_DEFAULT_CURRENCY)
         self.assertEqual(stock_record.partner, self.partner)
 
+    def test_get_seat(self):
+        """ Verify seats are indexed as they are retrieved, and retrieved from the seat index. """
+        course = CourseFactory()
+        verified_seat = course.create_or_update_seat('verified', True, 10, self.partner)
+        audit_seat = course.create_or_update_seat('', False, 0, self.partner)
+        course.get_seat('verified', True)
+        course.get_seat('', False)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(course.get_seat('verified', True), verified_seat)
+        with self.assertNumQueries(1):
+            self.assertEqual(course.get_seat('', False), audit_seat)
+
+    def test_create_or_update_seat_invalidates_index(self):
+        """ Verify saving a seat removes it from the seat index, now and once the request is committed. """
+        course = CourseFactory()
+        course.create_or_update_seat('verified', True, 10, self.partner)
+        course.get_seat('verified', True)
+        cache_key = course._get_seat_index_cache_key('verified', True)  # pylint: disable=protected-access
+
+        start_request_callbacks()
+        seat = course.create_or_update_seat('verified', True, 20, self.partner)
+        self.assertIsNone(cache.get(cache_key))
+
+        # A request reading the seat before the commit indexes it again.
+        course.get_seat('verified', True)
+        run_request_callbacks()
+        self.assertIsNone(cache.get(cache_key))
+        self.assertEqual(course.get_seat('verified', True), seat)
+
+    def test_get_seat_without_index(self):
+        """ Verify seats missing from the seat index are looked up by attribute, and indexed. """
+        course = CourseFactory()
+        seat = course.create_or_update_seat('verified', True, 10, self.partner)
+        course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT')
+        cache.clear()
+
+        self.assertEqual(course.get_seat('verified', True), seat)
+        with self.assertNumQueries(1):
+            self.assertEqual(course.get_seat('verified', True), seat)
+
+        with self.assertRaises(Product.DoesNotExist):
+            course.get_seat('verified', False)
+        with self.assertRaises(Product.DoesNotExist):
+            course.get_seat('credit', True)
+
+    def test_get_seat_after_stale_seat_removal(self):
+        """ Verify stale professional education seats are removed from the seat index. """
+        course = CourseFactory()
+        course.create_or_update_seat('professional', False, 0, self.partner)
+        seat = course.create_or_update_seat('professional', True, 0, self.partner)
+
+        self.assertEqual(course.get_seat('professional', True), seat)
+        with self.assertRaises(Product.DoesNotExist):
+            course.get_seat('professional', False)
+
     def test_create_credit_seats(self):
         """Verify that the model's seat creation method allows the creation of multiple credit seats."""
         course = Course.objects.create(id='a/b/c', name='Test Course')
@@ -285,6 +343,16 @@ class CourseTests(CourseCatalogTestMixin, TestCase):
         course.create_or_update_seat('credit', True, 1000, self.partner, credit_provider='SMU')
         self.assertEqual(course.type, 'credit')
 
+    def test_type_attribute_values_query(self):
+        """ Verify the attribute values of every seat are loaded with a single query. """
+        course = CourseFactory()
+        course.create_or_update_seat('audit', False, 0, self.partner)
+        course.create_or_update_seat('verified', True, 10, self.partner)
+        course.create_or_update_seat('credit', True, 1000, self.partner, credit_provider='SMU')
+
+        with self.assert_attribute_values_loaded_once():
+            self.assertEqual(course.type, 'credit')
+
     def test_enrollment_code_seat_type_filter(self):
         """ Verify that the ENROLLMENT_CODE_SEAT_TYPES constant is properly applied during seat creation """
         toggle_switch(ENROLLMENT_CODE_SWITCH, True)
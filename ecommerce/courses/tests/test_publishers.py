@@ -139,6 +139,15 @@ class LMSPublisherTests(CourseCatalogTestMixin, TestCase):
         }
         self.assertDictEqual(actual, expected)
 
+    @httpretty.activate
+    def test_publish_attribute_values_query(self):
+        """ Verify the attribute values of every seat are loaded with a single query. """
+        self.course.create_or_update_seat('professional', True, 100, self.partner)
+        self._mock_commerce_api(200)
+
+        with self.assert_attribute_values_loaded_once():
+            self.assertIsNone(self.publisher.publish(self.course))
+
     def test_serialize_seat_for_commerce_api(self):
         """ The method should convert a seat to a JSON-serializable dict consumable by the Commerce API. """
         # Grab the verified seat
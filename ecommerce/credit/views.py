@@ -18,9 +18,9 @@ from ecommerce.courses.models import Course
 from ecommerce.extensions.analytics.utils import prepare_analytics_data
 from ecommerce.extensions.offer.utils import format_benefit_value
 from ecommerce.extensions.partner.shortcuts import get_partner_for_site
+from ecommerce.extensions.voucher.utils import get_cached_voucher
 
 logger = logging.getLogger(__name__)
-Voucher = get_model('voucher', 'Voucher')
 
 
 class Checkout(TemplateView):
@@ -133,7 +133,7 @@ class Checkout(TemplateView):
         """
         code = self.request.GET.get('code')
         if code:
-            voucher = Voucher.objects.get(code=code)
+            voucher = get_cached_voucher(code)
             discount_type = voucher.benefit.type
             discount_value = voucher.benefit.value
 
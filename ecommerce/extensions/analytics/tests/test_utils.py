@@ -1,8 +1,13 @@
 import json
+import os
 
 from django.contrib.auth.models import AnonymousUser
+import mock
 
-from ecommerce.extensions.analytics.utils import prepare_analytics_data
+from ecommerce.extensions.analytics import utils
+from ecommerce.extensions.analytics.utils import (
+    SegmentClient, flush_segment_clients, get_segment_client, get_segment_client_metrics, prepare_analytics_data
+)
 from ecommerce.tests.testcases import TestCase
 
 
@@ -33,3 +38,54 @@ class UtilsTest(TestCase):
             'tracking': {'segmentApplicationId': self.site.siteconfiguration.segment_key},
             'user': 'AnonymousUser'
         })
+
+
+@mock.patch.dict(utils._segment_clients, clear=True)  # pylint: disable=protected-access
+class SegmentClientPoolTests(TestCase):
+    """ Tests for the process-wide pool of Segment clients. """
+
+    def test_get_segment_client(self):
+        """ Verify sites sharing a write key share a Segment client. """
+        client = get_segment_client('key-1')
+        self.assertIsInstance(client, SegmentClient)
+        self.assertIs(get_segment_client('key-1'), client)
+        self.assertIsNot(get_segment_client('key-2'), client)
+
+        site_configuration = self.site.siteconfiguration
+        self.assertIs(site_configuration.segment_client, get_segment_client(site_configuration.segment_key))
+
+    def test_get_segment_client_after_fork(self):
+        """ Verify a forked process does not reuse the clients, and consumer threads, of its parent. """
+        client = get_segment_client('key')
+        with mock.patch.object(os, 'getpid', return_value=os.getpid() + 1):
+            self.assertIsNot(get_segment_client('key'), client)
+
+    def test_metrics(self):
+        """ Verify the metrics report the events queued on, and dropped by, each client. """
+        client = SegmentClient('key', max_queue_size=1, send=False)
+        utils._segment_clients['key'] = client  # pylint: disable=protected-access
+
+        self.assertTrue(client.track('user', 'Event')[0])
+        self.assertFalse(client.track('user', 'Event')[0])
+        self.assertEqual(get_segment_client_metrics(), {'key': {'queued': 1, 'dropped': 1, 'failed': 0}})
+
+    def test_track_message_id(self):
+        """ Verify events are queued with the message ID they are tracked with, or a random one. """
+        client = SegmentClient('key', send=False)
+
+        client.track('user', 'Event', message_id='1:track_completed_order')
+        self.assertEqual(client.queue.get()['messageId'], '1:track_completed_order')
+
+        client.track('user', 'Event')
+        self.assertNotEqual(client.queue.get()['messageId'], '1:track_completed_order')
+
+    def test_flush_segment_clients(self):
+        """ Verify exiting processes stop waiting for their queued events to be uploaded after a timeout. """
+        get_segment_client('key')
+        client = SegmentClient('key', send=False)
+        utils._segment_clients['key'] = client  # pylint: disable=protected-access
+        client.track('user', 'Event')
+
+        with mock.patch.object(utils.logger, 'warning') as mock_warning:
+            flush_segment_clients(timeout=0)
+        mock_warning.assert_called_once_with('Exiting with [%d] events queued for Segment.', 1)
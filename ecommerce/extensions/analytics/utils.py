@@ -1,12 +1,167 @@
+import atexit
+import datetime
 from functools import wraps
 import json
 import logging
+import os
+import threading
+import time
+import uuid
 
+from analytics import Client
+from analytics.client import ID_TYPES, require
+from analytics.utils import clean, guess_timezone
+from analytics.version import VERSION as ANALYTICS_VERSION
+from dateutil.tz import tzutc
+from django.conf import settings
+from django.utils.six import string_types
 from threadlocals.threadlocals import get_current_request
 
 
 logger = logging.getLogger(__name__)
 
+# Segment clients of the current process, by write key. Each client batches the events queued on it
+# from a consumer thread, so every site sharing a write key shares a client.
+_segment_clients = {}
+_segment_clients_lock = threading.Lock()
+# ID of the process which created the clients. Consumer threads do not survive a fork, so a forked
+# process, such as a gunicorn worker, creates its own clients.
+_segment_clients_pid = None
+
+
+class SegmentClient(Client):
+    """
+    Segment client counting the events it drops because its queue is full, or fails to upload, and tracking
+    events under a given message ID.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.dropped = 0
+        self.failed = 0
+        kwargs['on_error'] = self._on_error
+        super(SegmentClient, self).__init__(*args, **kwargs)
+
+    def track(self, user_id=None, event=None, properties=None, context=None, timestamp=None, anonymous_id=None,
+              integrations=None, message_id=None):
+        """
+        Queue an event, as Client.track() does.
+
+        Keyword Arguments:
+            message_id (str): ID of the event's message. Segment ignores messages whose ID it has already received,
+                so events delivered more than once should be given a stable ID. Defaults to a random ID.
+        """
+        properties = properties or {}
+        require('user_id or anonymous_id', user_id or anonymous_id, ID_TYPES)
+        require('properties', properties, dict)
+        require('event', event, string_types)
+
+        msg = {
+            'integrations': integrations or {},
+            'anonymousId': anonymous_id,
+            'properties': properties,
+            'timestamp': timestamp,
+            'context': context or {},
+            'userId': user_id,
+            'type': 'track',
+            'event': event
+        }
+        return self._enqueue(msg, message_id=message_id)
+
+    def _enqueue(self, msg, message_id=None):
+        """ Queue a message, as Client._enqueue() does, under the given ID or a random one. """
+        timestamp = msg['timestamp']
+        if timestamp is None:
+            timestamp = datetime.datetime.utcnow().replace(tzinfo=tzutc())
+
+        require('integrations', msg['integrations'], dict)
+        require('type', msg['type'], string_types)
+        require('timestamp', timestamp, datetime.datetime)
+        require('context', msg['context'], dict)
+
+        msg['timestamp'] = guess_timezone(timestamp).isoformat()
+        msg['messageId'] = message_id or str(uuid.uuid4())
+        msg['context']['library'] = {'name': 'analytics-python', 'version': ANALYTICS_VERSION}
+        msg = clean(msg)
+
+        if self.queue.full():
+            self.dropped += 1
+            return False, msg
+
+        self.queue.put(msg)
+        return True, msg
+
+    def _on_error(self, error, batch):
+        self.failed += len(batch)
+        logger.warning('Failed to upload [%d] events to Segment: %s', len(batch), error)
+
+
+def get_segment_client(write_key):
+    """
+    Returns the Segment client of the current process for the given write key, creating it if needed.
+
+    Args:
+        write_key (str): Segment write key.
+
+    Returns:
+        SegmentClient
+    """
+    global _segment_clients_pid  # pylint: disable=global-statement
+
+    client = _segment_clients.get(write_key)
+    if client is not None and _segment_clients_pid == os.getpid():
+        return client
+
+    with _segment_clients_lock:
+        if _segment_clients_pid != os.getpid():
+            _segment_clients.clear()
+            _segment_clients_pid = os.getpid()
+
+        client = _segment_clients.get(write_key)
+        if client is None:
+            client = SegmentClient(
+                write_key,
+                debug=settings.DEBUG,
+                max_queue_size=settings.SEGMENT_CLIENT_MAX_QUEUE_SIZE
+            )
+            _segment_clients[write_key] = client
+
+    return client
+
+
+def get_segment_client_metrics():
+    """
+    Returns, by write key, the number of events queued on each Segment client of the current process,
+    and the number of events each client dropped or failed to upload.
+
+    Returns:
+        dict
+    """
+    return {
+        write_key: {'queued': client.queue.qsize(), 'dropped': client.dropped, 'failed': client.failed}
+        for write_key, client in _segment_clients.items()
+    }
+
+
+@atexit.register
+def flush_segment_clients(timeout=None):
+    """
+    Wait for the events queued on the Segment clients of the current process to be uploaded,
+    for up to SEGMENT_CLIENT_FLUSH_TIMEOUT seconds in total.
+    """
+    if _segment_clients_pid != os.getpid():
+        return
+
+    if timeout is None:
+        timeout = settings.SEGMENT_CLIENT_FLUSH_TIMEOUT
+    deadline = time.time() + timeout
+
+    for client in _segment_clients.values():
+        while client.queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+
+        if client.queue.unfinished_tasks:
+            logger.warning('Exiting with [%d] events queued for Segment.', client.queue.unfinished_tasks)
+
 
 def is_segment_configured():
     """Returns a Boolean indicating if Segment has been configured for use."""
@@ -1,13 +1,13 @@
 """Functions used for data retrieval and manipulation by the API."""
 import logging
 
-from oscar.core.loading import get_model, get_class
+from oscar.core.loading import get_class
 
 from ecommerce.extensions.api import exceptions
+from ecommerce.extensions.catalogue.utils import get_products
 
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
-Product = get_model('catalogue', 'Product')
 
 
 logger = logging.getLogger(__name__)
@@ -15,12 +15,12 @@ logger = logging.getLogger(__name__)
 
 def get_product(sku):
     """Retrieve the product corresponding to the provided SKU."""
-    try:
-        return Product.objects.get(stockrecords__partner_sku=sku)
-    except Product.DoesNotExist:
+    product = get_products([sku]).get(sku)
+    if product is None:
         raise exceptions.ProductNotFoundError(
             exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku)
         )
+    return product
 
 
 def get_order_metadata(basket):
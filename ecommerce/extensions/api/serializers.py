@@ -5,7 +5,7 @@ from decimal import Decimal
 import logging
 
 from dateutil.parser import parse
-from django.db import transaction
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth import get_user_model
@@ -18,6 +18,7 @@ from ecommerce.core.constants import ISO_8601_FORMAT, COURSE_ID_REGEX
 from ecommerce.core.models import Site, SiteConfiguration
 from ecommerce.core.url_utils import get_ecommerce_url
 from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.utils import prefetch_product_attributes
 from ecommerce.invoice.models import Invoice
 
 logger = logging.getLogger(__name__)
@@ -27,6 +28,7 @@ Benefit = get_model('offer', 'Benefit')
 BillingAddress = get_model('order', 'BillingAddress')
 Catalog = get_model('catalogue', 'Catalog')
 Category = get_model('catalogue', 'Category')
+CouponReport = get_model('voucher', 'CouponReport')
 Line = get_model('order', 'Line')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -164,6 +166,14 @@ class PartialStockRecordSerializerForUpdate(StockRecordSerializer):
         fields = ('price_currency', 'price_excl_tax',)
 
 
+class ProductListSerializer(serializers.ListSerializer):
+    """ Serializer for lists of Products, which loads the attribute values of every product at once. """
+
+    def to_representation(self, data):
+        products = data.all() if isinstance(data, models.Manager) else data
+        return super(ProductListSerializer, self).to_representation(prefetch_product_attributes(products))
+
+
 class ProductSerializer(ProductPaymentInfoMixin, serializers.HyperlinkedModelSerializer):
     """ Serializer for Products. """
     attribute_values = serializers.SerializerMethodField()
@@ -195,6 +205,7 @@ class ProductSerializer(ProductPaymentInfoMixin, serializers.HyperlinkedModelSer
         extra_kwargs = {
             'url': {'view_name': PRODUCT_DETAIL_VIEW},
         }
+        list_serializer_class = ProductListSerializer
 
 
 class LineSerializer(serializers.ModelSerializer):
@@ -526,6 +537,27 @@ class CouponListSerializer(serializers.ModelSerializer):
         fields = ('category', 'client', 'code', 'id', 'title')
 
 
+class CouponReportSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+    status = serializers.SerializerMethodField()
+
+    def get_status(self, obj):
+        # Reports which have timed out are reported as failed, so that they are requested again.
+        return CouponReport.FAILED if obj.has_timed_out() else obj.status
+
+    def get_download_url(self, obj):
+        if obj.status != CouponReport.COMPLETE:
+            return None
+
+        return reverse(
+            'api:v2:coupons:download_coupon_report', kwargs={'pk': obj.id}, request=self.context['request']
+        )
+
+    class Meta(object):
+        model = CouponReport
+        fields = ('id', 'coupon', 'status', 'created', 'modified', 'download_url')
+
+
 class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
     """ Serializer for Coupons. """
     benefit_type = serializers.SerializerMethodField()
@@ -118,6 +118,22 @@ class CatalogViewSetTest(CatalogMixin, CourseCatalogMockMixin, ApiMockMixin, Tes
 
         self.assertEqual(response.status_code, status_code)
 
+    @mock_course_catalog_api_client
+    def test_preview_attribute_values_query(self):
+        """ Verify the attribute values of every previewed seat are loaded with a single query. """
+        self.course.create_or_update_seat('verified', True, 10, self.partner)
+        self.course.create_or_update_seat('professional', True, 100, self.partner)
+        self.mock_dynamic_catalog_course_runs_api(course_run=self.course)
+        request = self.prepare_request(
+            '/api/v2/coupons/preview/?query=id:course*&seat_types=honor,verified,professional'
+        )
+
+        with self.assert_attribute_values_loaded_once():
+            response = CatalogViewSet().preview(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['seats']), 3)
+
     @ddt.data(ConnectionError, SlumberBaseException, Timeout)
     @mock_course_catalog_api_client
     def test_preview_catalog_course_discovery_service_not_available(self, error):
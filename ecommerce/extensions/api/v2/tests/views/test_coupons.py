@@ -3,13 +3,17 @@ from __future__ import unicode_literals
 
 import json
 import datetime
+import shutil
+import tempfile
 from decimal import Decimal
 
 import ddt
 import httpretty
+import mock
 import pytz
+from django.conf import settings
 from django.core.urlresolvers import reverse
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from django.utils.timezone import now
 from oscar.apps.catalogue.categories import create_from_breadcrumbs
 from oscar.core.loading import get_class, get_model
@@ -22,6 +26,7 @@ from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.api.v2.views.coupons import CouponViewSet
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.voucher.models import CouponVouchers
+from ecommerce.extensions.voucher.utils import get_coupon_report_watermark
 from ecommerce.invoice.models import Invoice
 from ecommerce.tests.factories import ProductFactory, SiteConfigurationFactory, SiteFactory
 from ecommerce.tests.mixins import ThrottlingMixin
@@ -32,6 +37,7 @@ Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
 Category = get_model('catalogue', 'Category')
+CouponReport = get_model('voucher', 'CouponReport')
 Course = get_model('courses', 'Course')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -686,3 +692,120 @@ class CouponCategoriesListViewTests(TestCase):
         response_data = json.loads(response.content)
         self.assertEqual(response_data['count'], 1)
         self.assertEqual(response_data['results'][0]['name'], 'Coupon test category')
+
+
+@ddt.ddt
+class CouponReportViewTests(CouponMixin, CourseCatalogTestMixin, TestCase):
+    """ Tests for the asynchronous coupon report views. """
+
+    def setUp(self):
+        super(CouponReportViewTests, self).setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media_root_override = override_settings(MEDIA_ROOT=media_root)
+        media_root_override.enable()
+        self.addCleanup(media_root_override.disable)
+
+        self.user = self.create_user(full_name='Tešt Ušer', is_staff=True)
+        self.client.login(username=self.user.username, password=self.password)
+
+        seat = CourseFactory().create_or_update_seat('verified', False, 100, self.partner)
+        catalog = Catalog.objects.create(partner=self.partner)
+        catalog.stock_records.add(StockRecord.objects.get(product=seat))
+        self.coupon = self.create_coupon(catalog=catalog, quantity=2)
+        self.coupon.history.all().update(history_user=self.user)
+        self.path = reverse('api:v2:coupons:create_coupon_report', kwargs={'coupon_id': self.coupon.id})
+
+    def request_report(self, expected_status_code):
+        """ Request a report of the coupon, and return the response data. """
+        response = self.client.post(self.path)
+        self.assertEqual(response.status_code, expected_status_code)
+        return json.loads(response.content)
+
+    def test_generate_and_download_report(self):
+        """ Verify a report is generated, and can be retrieved and downloaded once complete. """
+        report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertEqual(report_data['status'], CouponReport.COMPLETE)
+        self.assertEqual(report_data['coupon'], self.coupon.id)
+
+        response = self.client.get(reverse('api:v2:coupons:coupon_report', kwargs={'pk': report_data['id']}))
+        self.assertEqual(json.loads(response.content), report_data)
+
+        response = self.client.get(report_data['download_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        # A header line, the coupon line and a line per voucher.
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 4)
+
+    def test_report_reused(self):
+        """ Verify a report is reused for as long as the coupon's vouchers don't change. """
+        report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.request_report(status.HTTP_200_OK), report_data)
+
+    def test_report_regenerated_after_redemption(self):
+        """ Verify a new report is generated after a voucher is redeemed, and the outdated report is deleted. """
+        report_data = self.request_report(status.HTTP_202_ACCEPTED)
+
+        voucher = self.coupon.attr.coupon_vouchers.vouchers.first()
+        voucher.record_usage(factories.create_order(user=self.user), self.user)
+
+        new_report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertNotEqual(new_report_data['id'], report_data['id'])
+        self.assertEqual(list(CouponReport.objects.values_list('id', flat=True)), [new_report_data['id']])
+
+    def test_failed_report_regenerated(self):
+        """ Verify a report that failed to generate is generated again when requested. """
+        with mock.patch('ecommerce.extensions.voucher.tasks.stream_coupon_report', side_effect=Exception):
+            report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertEqual(report_data['status'], CouponReport.FAILED)
+        self.assertIsNone(report_data['download_url'])
+
+        response = self.client.get(reverse('api:v2:coupons:download_coupon_report', kwargs={'pk': report_data['id']}))
+        self.assertEqual(response.status_code, 404)
+
+        new_report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertEqual(new_report_data['id'], report_data['id'])
+        self.assertEqual(new_report_data['status'], CouponReport.COMPLETE)
+
+    def create_timed_out_report(self, report_status):
+        """ Create a report of the coupon's current state, left with the given status past the timeout. """
+        return CouponReport.objects.create(
+            coupon=self.coupon,
+            watermark=get_coupon_report_watermark(self.coupon),
+            status=report_status,
+            started=now() - datetime.timedelta(seconds=settings.COUPON_REPORT_TIMEOUT + 1)
+        )
+
+    @ddt.data(CouponReport.PENDING, CouponReport.IN_PROGRESS)
+    def test_timed_out_report_regenerated(self, report_status):
+        """ Verify a report stuck pending, or in progress, past the timeout is reported as failed, and
+        generated again when requested. """
+        coupon_report = self.create_timed_out_report(report_status)
+        response = self.client.get(reverse('api:v2:coupons:coupon_report', kwargs={'pk': coupon_report.id}))
+        self.assertEqual(json.loads(response.content)['status'], CouponReport.FAILED)
+
+        report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertEqual(report_data['id'], coupon_report.id)
+        self.assertEqual(report_data['status'], CouponReport.COMPLETE)
+
+    def test_report_in_progress_reused(self):
+        """ Verify a report being generated is not generated again before the timeout. """
+        coupon_report = self.create_timed_out_report(CouponReport.IN_PROGRESS)
+        CouponReport.objects.filter(id=coupon_report.id).update(started=now())
+
+        report_data = self.request_report(status.HTTP_200_OK)
+        self.assertEqual(report_data['status'], CouponReport.IN_PROGRESS)
+
+    def test_timed_out_report_deleted(self):
+        """ Verify timed out reports of a coupon's outdated state are deleted once a new report is generated. """
+        coupon_report = self.create_timed_out_report(CouponReport.IN_PROGRESS)
+        CouponReport.objects.filter(id=coupon_report.id).update(watermark='outdated')
+
+        report_data = self.request_report(status.HTTP_202_ACCEPTED)
+        self.assertEqual(list(CouponReport.objects.values_list('id', flat=True)), [report_data['id']])
+
+    def test_authorization_required(self):
+        """ Verify only staff users can request reports. """
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+        self.request_report(status.HTTP_403_FORBIDDEN)
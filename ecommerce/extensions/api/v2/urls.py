@@ -50,6 +50,21 @@ REFUND_URLS = [
 
 COUPON_URLS = [
     url(r'^coupon_reports/(?P<coupon_id>[\d]+)/$', CouponReportCSVView.as_view(), name='coupon_reports'),
+    url(
+        r'^coupon_reports/(?P<coupon_id>[\d]+)/jobs/$',
+        coupon_views.CouponReportCreateView.as_view(),
+        name='create_coupon_report'
+    ),
+    url(
+        r'^coupon_reports/jobs/(?P<pk>[\d]+)/$',
+        coupon_views.CouponReportRetrieveView.as_view(),
+        name='coupon_report'
+    ),
+    url(
+        r'^coupon_reports/jobs/(?P<pk>[\d]+)/download/$',
+        coupon_views.CouponReportDownloadView.as_view(),
+        name='download_coupon_report'
+    ),
     url(r'^categories/$', coupon_views.CouponCategoriesListView.as_view(), name='coupons_categories'),
 ]
 
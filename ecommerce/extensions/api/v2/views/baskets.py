@@ -16,6 +16,7 @@ from ecommerce.extensions.analytics.utils import audit_log
 from ecommerce.extensions.api import data as data_api, exceptions as api_exceptions
 from ecommerce.extensions.api.serializers import OrderSerializer
 from ecommerce.extensions.basket.utils import attribute_cookie_data
+from ecommerce.extensions.catalogue.utils import get_products
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
 from ecommerce.extensions.payment import exceptions as payment_exceptions
 from ecommerce.extensions.payment.helpers import (get_default_processor_class, get_processor_class_by_name)
@@ -138,15 +139,20 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
 
             requested_products = request.data.get('products')
             if requested_products:
+                # Resolve the products of all requested SKUs at once.
+                products = get_products(
+                    requested_product.get('sku') for requested_product in requested_products
+                    if requested_product.get('sku')
+                )
+
                 for requested_product in requested_products:
                     # Ensure the requested products exist
                     sku = requested_product.get('sku')
                     if sku:
-                        try:
-                            product = data_api.get_product(sku)
-                        except api_exceptions.ProductNotFoundError as error:
+                        product = products.get(sku)
+                        if product is None:
                             return self._report_bad_request(
-                                error.message,
+                                api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku),
                                 api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
                             )
                     else:
@@ -13,10 +13,10 @@ from slumber.exceptions import SlumberBaseException
 from ecommerce.core.constants import DEFAULT_CATALOG_PAGE_SIZE
 from ecommerce.coupons.utils import get_range_catalog_query_results
 from ecommerce.extensions.api import serializers
+from ecommerce.extensions.catalogue.utils import get_seats
 
 
 Catalog = get_model('catalogue', 'Catalog')
-Product = get_model('catalogue', 'Product')
 logger = logging.getLogger(__name__)
 
 
@@ -56,11 +56,7 @@ class CatalogViewSet(NestedViewSetMixin, ReadOnlyModelViewSet):
                 results = response['results']
                 course_ids = [result['key'] for result in results]
                 seats = serializers.ProductSerializer(
-                    Product.objects.filter(
-                        course_id__in=course_ids,
-                        attributes__name='certificate_type',
-                        attribute_values__value_text__in=seat_types
-                    ),
+                    get_seats(course_ids=course_ids, certificate_types=seat_types),
                     many=True,
                     context={'request': request}
                 ).data
@@ -1,13 +1,16 @@
 from __future__ import unicode_literals
 
 import logging
+import os
 
 import dateutil.parser
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.http import Http404
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from oscar.core.loading import get_model
 from rest_framework import filters, generics, serializers, status, viewsets
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
@@ -17,18 +20,22 @@ from ecommerce.core.models import BusinessClient
 from ecommerce.coupons.utils import prepare_course_seat_types
 from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.api.filters import ProductFilter
-from ecommerce.extensions.api.serializers import CategorySerializer, CouponSerializer, CouponListSerializer
+from ecommerce.extensions.api.serializers import (
+    CategorySerializer, CouponListSerializer, CouponReportSerializer, CouponSerializer
+)
 from ecommerce.extensions.basket.utils import prepare_basket
 from ecommerce.extensions.catalogue.utils import create_coupon_product, get_or_create_catalog
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
 from ecommerce.extensions.payment.processors.invoice import InvoicePayment
 from ecommerce.extensions.voucher.models import CouponVouchers
-from ecommerce.extensions.voucher.utils import update_voucher_offer
+from ecommerce.extensions.voucher.tasks import generate_coupon_report_file
+from ecommerce.extensions.voucher.utils import get_coupon_report_watermark, update_voucher_offer
 from ecommerce.invoice.models import Invoice
 
 Basket = get_model('basket', 'Basket')
 Catalog = get_model('catalogue', 'Catalog')
 Category = get_model('catalogue', 'Category')
+CouponReport = get_model('voucher', 'CouponReport')
 logger = logging.getLogger(__name__)
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -348,3 +355,64 @@ class CouponCategoriesListView(generics.ListAPIView):
     def get_queryset(self):
         parent_category = Category.objects.get(slug='coupons')
         return parent_category.get_children()
+
+
+class CouponReportCreateView(generics.CreateAPIView):
+    """Starts generating the CSV report of a coupon.
+
+    Reports are kept for as long as the coupon's vouchers stay the same. If a report of the coupon's current state
+    already exists, or is being generated, it is returned with HTTP 200. Otherwise a new report is generated in the
+    background, and returned with HTTP 202. Its status can be polled until it is complete, after which it can be
+    downloaded. Reports which failed, or have been generated for longer than COUPON_REPORT_TIMEOUT, are generated
+    again.
+    """
+    permission_classes = (IsAuthenticated, IsAdminUser)
+    serializer_class = CouponReportSerializer
+
+    @method_decorator(transaction.non_atomic_requests)
+    def dispatch(self, request, *args, **kwargs):
+        return super(CouponReportCreateView, self).dispatch(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        coupon = get_object_or_404(Product, id=kwargs['coupon_id'], product_class__name='Coupon')
+        watermark = get_coupon_report_watermark(coupon)
+
+        with transaction.atomic():
+            coupon_report, generate = CouponReport.objects.get_or_create(
+                coupon=coupon, watermark=watermark, defaults={'started': timezone.now()}
+            )
+            if coupon_report.status == CouponReport.FAILED or coupon_report.has_timed_out():
+                coupon_report.status = CouponReport.PENDING
+                coupon_report.started = timezone.now()
+                coupon_report.save()
+                generate = True
+
+        # The report must be committed before the task that generates it is sent.
+        if generate:
+            generate_coupon_report_file.delay(coupon_report.id, request.site.id)
+            coupon_report.refresh_from_db()
+
+        serializer = self.get_serializer(coupon_report)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED if generate else status.HTTP_200_OK)
+
+
+class CouponReportRetrieveView(generics.RetrieveAPIView):
+    """Returns the status of a coupon report, and its download URL once it is complete."""
+    permission_classes = (IsAuthenticated, IsAdminUser)
+    queryset = CouponReport.objects.all()
+    serializer_class = CouponReportSerializer
+
+
+class CouponReportDownloadView(generics.RetrieveAPIView):
+    """Returns the CSV file of a complete coupon report."""
+    permission_classes = (IsAuthenticated, IsAdminUser)
+    queryset = CouponReport.objects.filter(status=CouponReport.COMPLETE)
+
+    def retrieve(self, request, *args, **kwargs):
+        coupon_report = self.get_object()
+        report_file = coupon_report.report_file
+        report_file.open('rb')
+
+        response = FileResponse(report_file, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename={}'.format(os.path.basename(report_file.name))
+        return response
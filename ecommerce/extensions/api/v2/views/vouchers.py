@@ -21,6 +21,8 @@ from ecommerce.coupons.utils import get_range_catalog_query_results
 from ecommerce.extensions.api import serializers
 from ecommerce.extensions.api.permissions import IsOffersOrIsAuthenticatedAndStaff
 from ecommerce.extensions.api.v2.views import NonDestroyableModelViewSet
+from ecommerce.extensions.catalogue.utils import get_seats, prefetch_product_attributes
+from ecommerce.extensions.voucher.utils import get_cached_voucher
 
 
 logger = logging.getLogger(__name__)
@@ -67,7 +69,7 @@ class VoucherViewSet(NonDestroyableModelViewSet):
         code = request.GET.get('code', '')
 
         try:
-            voucher = Voucher.objects.get(code=code)
+            voucher = get_cached_voucher(code)
         except Voucher.DoesNotExist:
             logger.error('Voucher with code %s not found.', code)
             return Response(status=status.HTTP_400_BAD_REQUEST)
@@ -114,11 +116,11 @@ class VoucherViewSet(NonDestroyableModelViewSet):
 
         products = []
         for seat_type in course_seat_types.split(','):
-            products.extend(Product.objects.filter(
-                course_id__in=nonexpired_course_ids if seat_type == 'professional' else all_course_ids,
-                attributes__name='certificate_type',
-                attribute_values__value_text=seat_type
+            products.extend(get_seats(
+                course_ids=nonexpired_course_ids if seat_type == 'professional' else all_course_ids,
+                certificate_types=[seat_type]
             ))
+        products = prefetch_product_attributes(products)
         stock_records = StockRecord.objects.filter(product__in=products)
         return products, stock_records
 
@@ -168,7 +170,7 @@ class VoucherViewSet(NonDestroyableModelViewSet):
                         continue
                 else:
                     continue
-                credit_seats = Product.objects.filter(parent=product.parent, attributes__name='credit_provider')
+                credit_seats = get_seats(course_ids=[product.course_id], certificate_types=['credit'])
 
                 if credit_seats.count() > 1:
                     multiple_credit_providers = True
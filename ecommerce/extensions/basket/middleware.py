@@ -30,27 +30,28 @@ class BasketMiddleware(OscarBasketMiddleware):
         cookie_basket = self.get_cookie_basket(cookie_key, request, manager)
 
         if hasattr(request, 'user') and request.user.is_authenticated():
-            # Signed-in user: if they have a cookie basket too, it means
-            # that they have just signed in and we need to merge their cookie
-            # basket into their user basket, then delete the cookie.
-            try:
-                basket, __ = manager.get_or_create(owner=request.user, site=request.site)
-            except Basket.MultipleObjectsReturned:
-                # Not sure quite how we end up here with multiple baskets.
-                # We merge them and create a fresh one
-                old_baskets = list(manager.filter(owner=request.user, site=request.site))
-                basket = old_baskets[0]
-                for other_basket in old_baskets[1:]:
-                    self.merge_baskets(basket, other_basket)
+            basket = self.get_user_basket(request, manager)
 
             # Assign user onto basket to prevent further SQL queries when
             # basket.owner is accessed.
             basket.owner = request.user
 
             if cookie_basket:
-                self.merge_baskets(basket, cookie_basket)
+                # Signed-in user: if they have a cookie basket too, it means
+                # that they have just signed in and we need to merge their cookie
+                # basket into their user basket, then delete the cookie.
+                if basket.id:
+                    self.merge_baskets(basket, cookie_basket)
+                else:
+                    # The user has no basket yet, so the cookie basket becomes theirs.
+                    basket = cookie_basket
+                    basket.owner = request.user
+                    basket.save()
                 request.cookies_to_delete.append(cookie_key)
 
+            if basket.id:
+                self.set_session_basket_id(request, basket.id)
+
         elif cookie_basket:
             # Anonymous user with a basket tied to the cookie
             basket = cookie_basket
@@ -62,3 +63,51 @@ class BasketMiddleware(OscarBasketMiddleware):
         request._basket_cache = basket
 
         return basket
+
+    def get_user_basket(self, request, manager):
+        """
+        Returns the open basket of the request's user for the request's site.
+
+        The ID of the basket is kept in the session, so that the basket is usually retrieved by ID. Users
+        without an open basket get a new basket, which is only saved once a product is added to it.
+
+        Parameters:
+            request (Request) -- current request being processed
+            manager (Manager) -- manager of the open baskets
+
+        Returns:
+            Basket
+        """
+        basket_id = self.get_session_basket_id(request)
+        if basket_id:
+            basket = manager.filter(id=basket_id, owner=request.user, site=request.site).first()
+            if basket:
+                return basket
+
+        baskets = list(manager.filter(owner=request.user, site=request.site).order_by('id'))
+        if not baskets:
+            return Basket(owner=request.user, site=request.site)
+
+        # Not sure quite how we end up with multiple baskets. We merge them into the oldest one.
+        basket = baskets[0]
+        for other_basket in baskets[1:]:
+            self.merge_baskets(basket, other_basket)
+
+        return basket
+
+    def get_session_basket_key(self, request):
+        """ Returns the session key under which the ID of the user's open basket for the request's site is kept. """
+        return 'open_basket_id_{site_id}'.format(site_id=request.site.id)
+
+    def get_session_basket_id(self, request):
+        session = getattr(request, 'session', None)
+        if session is None:
+            return None
+        return session.get(self.get_session_basket_key(request))
+
+    def set_session_basket_id(self, request, basket_id):
+        session = getattr(request, 'session', None)
+        key = self.get_session_basket_key(request)
+        # Only modified sessions are saved at the end of the request.
+        if session is not None and session.get(key) != basket_id:
+            session[key] = basket_id
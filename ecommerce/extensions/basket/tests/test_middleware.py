@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.signing import Signer
 from django.test.client import RequestFactory
 from oscar.core.loading import get_model
 from oscar.test.factories import BasketFactory
@@ -79,6 +80,49 @@ class BasketMiddlewareTests(TestCase):
         self.assertEqual(self.request._basket_cache, basket)
         self.assertEqual(self.middleware.get_basket(self.request), self.request._basket_cache)
 
+    def test_get_basket_without_existing_basket(self):
+        """ Verify users without an open basket get a new basket, which is not saved. """
+        self.request.user = self.create_user()
+        basket = self.middleware.get_basket(self.request)
+        self.assertIsNone(basket.id)
+        self.assertEqual(basket.owner, self.request.user)
+        self.assertEqual(basket.site, self.site)
+        self.assertFalse(Basket.objects.exists())
+
+    def test_get_basket_session_cache(self):
+        """ Verify the ID of the user's open basket is kept in the session, and used to retrieve the basket. """
+        # pylint: disable=protected-access
+        self.request.user = self.create_user()
+        self.request.session = {}
+        basket = BasketFactory(owner=self.request.user, site=self.site)
+        self.assertEqual(self.middleware.get_basket(self.request), basket)
+        self.assertEqual(self.request.session[self.middleware.get_session_basket_key(self.request)], basket.id)
+
+        self.request._basket_cache = None
+        with self.assertNumQueries(1):
+            self.assertEqual(self.middleware.get_basket(self.request), basket)
+
+        # Baskets which are no longer open are ignored.
+        basket.submit()
+        self.request._basket_cache = None
+        self.assertIsNone(self.middleware.get_basket(self.request).id)
+
+    def test_get_basket_with_cookie_basket(self):
+        """ Verify the cookie basket of a user without an open basket becomes the user's basket. """
+        cookie_basket = BasketFactory(site=self.site)
+        cookie_key = self.middleware.get_cookie_key(self.request)
+        request_factory = RequestFactory()
+        request_factory.cookies[cookie_key] = Signer().sign(cookie_basket.id)
+        request = request_factory.get('/')
+        request.user = self.create_user()
+        request.site = self.site
+        self.middleware.process_request(request)
+
+        basket = self.middleware.get_basket(request)
+        self.assertEqual(basket, cookie_basket)
+        self.assertEqual(Basket.objects.get(id=basket.id).owner, request.user)
+        self.assertIn(cookie_key, request.cookies_to_delete)
+
     def test_get_basket_with_anonymous_user(self):
         """ Verify a new basket is created for anonymous users without cookies. """
         basket = self.middleware.get_basket(self.request)
@@ -27,6 +27,7 @@ from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.core.url_utils import get_lms_enrollment_api_url
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.coupons.tests.mixins import CouponMixin, CourseCatalogMockMixin
+from ecommerce.courses.models import get_sibling_skus_cache_key
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.basket.utils import get_basket_switch_data
 from ecommerce.extensions.basket.views import VoucherAddMessagesView
@@ -345,6 +346,28 @@ class BasketSummaryViewTests(CourseCatalogTestMixin, CourseCatalogMockMixin, Lms
         __, partner_sku = get_basket_switch_data(enrollment_code)
         self.assertEqual(partner_sku, seat_sku)
 
+    def test_basket_switch_data_cached(self):
+        """ Verify the SKUs of the switch links are indexed when missing, and removed from the index as seats
+        are saved. """
+        course = CourseFactory()
+        toggle_switch(ENROLLMENT_CODE_SWITCH, True)
+
+        seat = course.create_or_update_seat('verified', False, 10, self.partner, create_enrollment_code=True)
+        audit_seat = course.create_or_update_seat('', False, 0, self.partner)
+        seat_sku = StockRecord.objects.get(product=seat).partner_sku
+        enrollment_code = Product.objects.get(product_class__name=ENROLLMENT_CODE_PRODUCT_CLASS_NAME)
+        ec_sku = StockRecord.objects.get(product=enrollment_code).partner_sku
+
+        cache_key = get_sibling_skus_cache_key(course.id)
+        self.assertIsNone(cache.get(cache_key))
+        self.assertEqual(get_basket_switch_data(audit_seat)[1], None)
+        self.assertEqual(cache.get(cache_key), {seat.id: ec_sku, enrollment_code.id: seat_sku})
+
+        self.assertEqual(get_basket_switch_data(enrollment_code)[1], seat_sku)
+
+        course.create_or_update_seat('', False, 0, self.partner)
+        self.assertIsNone(cache.get(cache_key))
+
     @ddt.data(
         (Benefit.PERCENTAGE, 100),
         (Benefit.PERCENTAGE, 50),
@@ -3,16 +3,17 @@ import json
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
 from oscar.core.loading import get_class, get_model
 import pytz
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
+from ecommerce.courses.models import get_sibling_skus_cache_key
 from ecommerce.referrals.models import Referral
 
 Applicator = get_class('offer.utils', 'Applicator')
 Basket = get_model('basket', 'Basket')
-StockRecord = get_model('partner', 'StockRecord')
 
 logger = logging.getLogger(__name__)
 
@@ -55,38 +56,28 @@ def prepare_basket(request, product, voucher=None):
 
 
 def get_basket_switch_data(product):
+    """
+    Returns the text and partner SKU of the link which switches the basket between a course seat (single
+    purchase) and its enrollment code (multiple purchase).
+
+    The SKUs of the siblings of every seat and enrollment code of a course are indexed in the shared cache
+    by Course.update_sibling_skus() when missing, e.g. because the course's products were saved.
+    """
     product_class_name = product.get_product_class().name
 
     if product_class_name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME:
         switch_link_text = _('Click here to just purchase an enrollment for yourself')
-        structure = 'child'
     elif product_class_name == SEAT_PRODUCT_CLASS_NAME:
         switch_link_text = _('Click here to purchase multiple seats in this course')
-        structure = 'standalone'
-
-    stock_records = StockRecord.objects.filter(
-        product__course_id=product.course_id,
-        product__structure=structure
-    )
-
-    # Determine the proper partner SKU to embed in the single/multiple basket switch link
-    # The logic here is a little confusing.  "Seat" products have "certificate_type" attributes, and
-    # "Enrollment Code" products have "seat_type" attributes.  If the basket is in single-purchase
-    # mode, we are working with a Seat product and must present the 'buy multiple' switch link and
-    # SKU from the corresponding Enrollment Code product.  If the basket is in multi-purchase mode,
-    # we are working with an Enrollment Code product and must present the 'buy single' switch link
-    # and SKU from the corresponding Seat product.
-    partner_sku = None
-    product_cert_type = getattr(product.attr, 'certificate_type', None)
-    product_seat_type = getattr(product.attr, 'seat_type', None)
-    for stock_record in stock_records:
-        stock_record_cert_type = getattr(stock_record.product.attr, 'certificate_type', None)
-        stock_record_seat_type = getattr(stock_record.product.attr, 'seat_type', None)
-        if (product_seat_type and product_seat_type == stock_record_cert_type) or \
-           (product_cert_type and product_cert_type == stock_record_seat_type):
-            partner_sku = stock_record.partner_sku
-            break
-    return switch_link_text, partner_sku
+
+    if not product.course_id:
+        return switch_link_text, None
+
+    sibling_skus = cache.get(get_sibling_skus_cache_key(product.course_id))
+    if sibling_skus is None:
+        sibling_skus = product.course.update_sibling_skus()
+
+    return switch_link_text, sibling_skus.get(product.id)
 
 
 def attribute_cookie_data(basket, request):
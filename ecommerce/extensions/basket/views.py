@@ -17,15 +17,15 @@ from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.utils import get_certificate_type_display_value, get_course_info_from_catalog, mode_for_seat
 from ecommerce.extensions.analytics.utils import prepare_analytics_data
 from ecommerce.extensions.basket.utils import prepare_basket, get_basket_switch_data
+from ecommerce.extensions.catalogue.utils import get_products
 from ecommerce.extensions.offer.utils import format_benefit_value
 from ecommerce.extensions.partner.shortcuts import get_partner_for_site
 from ecommerce.extensions.payment.constants import CLIENT_SIDE_CHECKOUT_FLAG_NAME
 from ecommerce.extensions.payment.forms import PaymentForm
+from ecommerce.extensions.voucher.utils import get_cached_voucher
 
 Benefit = get_model('offer', 'Benefit')
 logger = logging.getLogger(__name__)
-StockRecord = get_model('partner', 'StockRecord')
-Voucher = get_model('voucher', 'Voucher')
 
 
 class BasketSingleItemView(View):
@@ -43,11 +43,10 @@ class BasketSingleItemView(View):
         if not sku:
             return HttpResponseBadRequest(_('No SKU provided.'))
 
-        voucher = Voucher.objects.get(code=code) if code else None
+        voucher = get_cached_voucher(code) if code else None
 
-        try:
-            product = StockRecord.objects.get(partner=partner, partner_sku=sku).product
-        except StockRecord.DoesNotExist:
+        product = get_products([sku], partner=partner).get(sku)
+        if product is None:
             return HttpResponseBadRequest(_('SKU [{sku}] does not exist.').format(sku=sku))
 
         # If the product isn't available then there's no reason to continue with the basket addition
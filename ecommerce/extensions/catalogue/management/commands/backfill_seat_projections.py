@@ -0,0 +1,45 @@
+"""
+Management command that creates, or brings up to date, the projections of every course seat.
+
+Projections are kept up to date as seats are saved, and were filled for existing seats by the catalogue
+0022_backfill_seat_projections migration. This command brings them up to date for seats updated without sending
+signals (e.g. through QuerySet.update()).
+"""
+from __future__ import unicode_literals
+
+import time
+
+from django.core.management import BaseCommand
+
+from ecommerce.extensions.catalogue.utils import iter_seat_id_batches, update_seat_projections
+
+
+class Command(BaseCommand):
+    help = 'Create, or bring up to date, the projections of every course seat.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-b', '--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            default=500,
+                            type=int,
+                            help='Number of seats updated at once.')
+        parser.add_argument('-s', '--sleep-seconds',
+                            action='store',
+                            dest='sleep_seconds',
+                            default=1,
+                            type=int,
+                            help='Seconds to sleep between each batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        sleep_seconds = options['sleep_seconds']
+
+        updated = 0
+        for batch in iter_seat_id_batches(batch_size):
+            update_seat_projections(batch)
+            updated += len(batch)
+            self.stderr.write('Updated the projections of [{}] seats.'.format(updated))
+            time.sleep(sleep_seconds)
+
+        self.stderr.write('Updated the projections of [{}] seats in total.'.format(updated))
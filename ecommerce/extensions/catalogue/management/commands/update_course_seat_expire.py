@@ -10,6 +10,7 @@ from slumber.exceptions import HttpClientError
 
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.utils import get_seats, update_seat_projections
 
 
 logger = logging.getLogger(__name__)
@@ -57,16 +58,16 @@ class Command(BaseCommand):
                 continue
 
             if save_to_db:
-                course_seats = course.seat_products.filter(
-                    attributes__name='certificate_type',
-                    attribute_values__value_text__in=seats_to_update
-                )
+                course_seats = get_seats(course_ids=[course.id], certificate_types=seats_to_update)
                 expires = parser.parse(enrollment_end_date)
                 course_seats.update(expires=expires)
+                # QuerySet.update() does not send the signals which update the projections.
+                seat_ids = list(course_seats.values_list('id', flat=True))
+                update_seat_projections(seat_ids)
                 logger.info(
                     'Updated expiration date for [%s] seats: [%s]',
                     course.id,
-                    ', '.join([str(seat.id) for seat in course_seats]),
+                    ', '.join([str(seat_id) for seat_id in seat_ids]),
                 )
 
     def _get_courses_enrollment_info(self):
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_auto_20150803_1406'),
+        ('partner', '0010_auto_20161025_1446'),
+        ('catalogue', '0020_auto_20161025_1446'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatProjection',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('certificate_type', models.CharField(max_length=255, blank=True)),
+                ('id_verification_required', models.BooleanField(default=False)),
+                ('credit_provider', models.CharField(max_length=255, blank=True)),
+                ('partner_sku', models.CharField(max_length=128, db_index=True)),
+                ('price_excl_tax', models.DecimalField(null=True, max_digits=12, decimal_places=2, blank=True)),
+                ('price_currency', models.CharField(max_length=12)),
+                ('expires', models.DateTimeField(null=True, blank=True)),
+                ('course', models.ForeignKey(related_name='seat_projections', to='courses.Course')),
+                ('partner', models.ForeignKey(related_name='seat_projections', to='partner.Partner')),
+                ('product', models.ForeignKey(related_name='seat_projections', to='catalogue.Product')),
+                ('stock_record', models.OneToOneField(related_name='seat_projection', to='partner.StockRecord')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='seatprojection',
+            index_together=set([('course', 'certificate_type', 'id_verification_required')]),
+        ),
+    ]
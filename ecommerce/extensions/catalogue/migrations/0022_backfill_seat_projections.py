@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from collections import defaultdict
+
+from django.db import migrations
+
+from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
+
+BATCH_SIZE = 500
+SEAT_PROJECTION_ATTRIBUTE_CODES = ('certificate_type', 'credit_provider', 'id_verification_required')
+
+
+def _project_seats(apps, product_ids):
+    ProductAttributeValue = apps.get_model('catalogue', 'ProductAttributeValue')
+    SeatProjection = apps.get_model('catalogue', 'SeatProjection')
+    StockRecord = apps.get_model('partner', 'StockRecord')
+
+    attributes = defaultdict(dict)
+    values = ProductAttributeValue.objects.filter(
+        product_id__in=product_ids,
+        attribute__code__in=SEAT_PROJECTION_ATTRIBUTE_CODES
+    ).values_list('product_id', 'attribute__code', 'value_text', 'value_boolean')
+    for product_id, code, value_text, value_boolean in values:
+        attributes[product_id][code] = value_boolean if code == 'id_verification_required' else value_text
+
+    projected_stock_record_ids = set(
+        SeatProjection.objects.filter(product_id__in=product_ids).values_list('stock_record_id', flat=True)
+    )
+    stock_records = StockRecord.objects.filter(
+        product_id__in=product_ids,
+        product__course__isnull=False
+    ).exclude(id__in=projected_stock_record_ids).select_related('product')
+
+    projections = []
+    for stock_record in stock_records:
+        product = stock_record.product
+        product_attributes = attributes[product.id]
+        projections.append(SeatProjection(
+            stock_record_id=stock_record.id,
+            product_id=product.id,
+            course_id=product.course_id,
+            certificate_type=product_attributes.get('certificate_type') or '',
+            id_verification_required=bool(product_attributes.get('id_verification_required')),
+            credit_provider=product_attributes.get('credit_provider') or '',
+            partner_id=stock_record.partner_id,
+            partner_sku=stock_record.partner_sku,
+            price_excl_tax=stock_record.price_excl_tax,
+            price_currency=stock_record.price_currency,
+            expires=product.expires,
+        ))
+    SeatProjection.objects.bulk_create(projections)
+
+
+def backfill_seat_projections(apps, schema_editor):
+    """Create the projections of the course seats saved before projections existed."""
+    Product = apps.get_model('catalogue', 'Product')
+    seat_ids = Product.objects.filter(
+        structure='child',
+        parent__product_class__name=SEAT_PRODUCT_CLASS_NAME
+    ).order_by('id').values_list('id', flat=True)
+
+    last_id = 0
+    while True:
+        batch = list(seat_ids.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not batch:
+            break
+
+        _project_seats(apps, batch)
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0021_seatprojection'),
+    ]
+    operations = [
+        migrations.RunPython(backfill_seat_projections, migrations.RunPython.noop)
+    ]
@@ -16,6 +16,31 @@ class ProductAttributeValue(AbstractProductAttributeValue):
     history = HistoricalRecords()
 
 
+class SeatProjection(models.Model):
+    """
+    Denormalized copy of the attributes and stock record of a course seat.
+
+    Seats can be looked up by course, certificate type and verification requirement without joining their
+    attribute values. Projections are kept up to date by update_seat_projections() as seats, their attribute
+    values and their stock records are saved.
+    """
+    stock_record = models.OneToOneField('partner.StockRecord', related_name='seat_projection')
+    product = models.ForeignKey('catalogue.Product', related_name='seat_projections')
+    course = models.ForeignKey('courses.Course', related_name='seat_projections')
+    # Audit seats have no certificate type.
+    certificate_type = models.CharField(max_length=255, blank=True)
+    id_verification_required = models.BooleanField(default=False)
+    credit_provider = models.CharField(max_length=255, blank=True)
+    partner = models.ForeignKey('partner.Partner', related_name='seat_projections')
+    partner_sku = models.CharField(max_length=128, db_index=True)
+    price_excl_tax = models.DecimalField(decimal_places=2, max_digits=12, null=True, blank=True)
+    price_currency = models.CharField(max_length=12)
+    expires = models.DateTimeField(null=True, blank=True)
+
+    class Meta(object):
+        index_together = (('course', 'certificate_type', 'id_verification_required'),)
+
+
 class Catalog(models.Model):
     name = models.CharField(max_length=255)
     partner = models.ForeignKey('partner.Partner', related_name='catalogs')
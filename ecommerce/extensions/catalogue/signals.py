@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.utils import invalidate_cached_products, update_seat_projections
+
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+@receiver(post_save, sender=Product, dispatch_uid='catalogue.invalidate_cached_product')
+@receiver(post_delete, sender=Product, dispatch_uid='catalogue.invalidate_deleted_cached_product')
+@receiver(post_save, sender=StockRecord, dispatch_uid='catalogue.invalidate_cached_stock_record')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='catalogue.invalidate_deleted_cached_stock_record')
+def invalidate_cached_product(**_kwargs):
+    """ Invalidate the cached products of SKUs when a product or stock record is saved or deleted. """
+    invalidate_cached_products()
+
+
+@receiver(post_save, sender=Product, dispatch_uid='catalogue.update_product_seat_projections')
+def update_product_seat_projections(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """ Update the seat projections of a product when it is saved. """
+    # Projections are deleted with their product and stock records.
+    update_seat_projections([instance.id])
+
+
+@receiver(post_save, sender=ProductAttributeValue, dispatch_uid='catalogue.update_attribute_seat_projections')
+@receiver(post_save, sender=StockRecord, dispatch_uid='catalogue.update_stock_record_seat_projections')
+def update_related_seat_projections(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """ Update the seat projections of a product when one of its attribute values or stock records is saved. """
+    # Product.save() saves the attribute values it changed after sending post_save for the product itself.
+    update_seat_projections([instance.product_id])
+
+
+@receiver(post_delete, sender=ProductAttributeValue,
+          dispatch_uid='catalogue.update_deleted_attribute_seat_projections')
+def update_deleted_attribute_seat_projections(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """ Update the seat projections of a product when one of its attribute values is deleted. """
+    # Attribute values are also deleted along with their product, which must not get new projections then.
+    update_seat_projections([instance.product_id], create_missing=False)
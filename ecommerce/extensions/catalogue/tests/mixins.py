@@ -1,6 +1,9 @@
 from __future__ import unicode_literals
+from contextlib import contextmanager
 import logging
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_model
 from oscar.test import factories
 
@@ -12,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 Category = get_model('catalogue', 'Category')
 Partner = get_model('partner', 'Partner')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 ProductClass = get_model('catalogue', 'ProductClass')
 
 
@@ -57,6 +61,16 @@ class CourseCatalogTestMixin(object):
         seat = course.create_or_update_seat(seat_type, id_verification, price, partner)
         return course, seat
 
+    @contextmanager
+    def assert_attribute_values_loaded_once(self):
+        """ Assert the attribute values of products are loaded with a single query within the block. """
+        table = ProductAttributeValue._meta.db_table
+        with CaptureQueriesContext(connection) as context:
+            yield
+
+        queries = [query['sql'] for query in context.captured_queries if table in query['sql']]
+        self.assertEqual(len(queries), 1, queries)
+
     def _create_product_class(self, class_name, slug, attributes):
         """ Helper method for creating product classes.
 
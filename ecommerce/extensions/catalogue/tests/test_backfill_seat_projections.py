@@ -0,0 +1,43 @@
+from __future__ import unicode_literals
+
+from importlib import import_module
+
+from django.apps import apps
+from django.core.management import call_command
+from oscar.core.loading import get_model
+
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+SeatProjection = get_model('catalogue', 'SeatProjection')
+
+
+class BackfillSeatProjectionsTests(CourseCatalogTestMixin, TestCase):
+    def test_backfill(self):
+        """ Verify the command projects every seat, in batches. """
+        course = CourseFactory()
+        seats = [
+            course.create_or_update_seat('verified', True, 10, self.partner),
+            course.create_or_update_seat('', False, 0, self.partner),
+            course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT'),
+        ]
+        SeatProjection.objects.all().delete()
+
+        call_command('backfill_seat_projections', batch_size=2, sleep_seconds=0)
+
+        self.assertEqual(
+            set(SeatProjection.objects.values_list('product_id', 'certificate_type')),
+            {(seats[0].id, 'verified'), (seats[1].id, ''), (seats[2].id, 'credit')}
+        )
+
+    def test_backfill_migration(self):
+        """ Verify the data migration projects the seats saved before projections existed. """
+        migration = import_module('ecommerce.extensions.catalogue.migrations.0022_backfill_seat_projections')
+        course = CourseFactory()
+        seat = course.create_or_update_seat('verified', True, 10, self.partner)
+        SeatProjection.objects.all().delete()
+
+        migration.backfill_seat_projections(apps, None)
+
+        self.assertEqual(list(SeatProjection.objects.values_list('product_id', flat=True)), [seat.id])
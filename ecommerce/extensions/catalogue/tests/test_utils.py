@@ -4,18 +4,23 @@ from __future__ import unicode_literals
 from hashlib import md5
 
 from django.db.utils import IntegrityError
+from django.utils.timezone import now
 from oscar.core.loading import get_model
 
 from ecommerce.coupons.tests.mixins import CouponMixin
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
-from ecommerce.extensions.catalogue.utils import create_coupon_product, generate_sku, get_or_create_catalog
-from ecommerce.tests.factories import ProductFactory
+from ecommerce.extensions.catalogue.utils import (
+    create_coupon_product, generate_sku, get_or_create_catalog, get_products, get_seat_course_ids, get_seats,
+    product_cache, update_seat_projections
+)
+from ecommerce.tests.factories import PartnerFactory, ProductFactory
 from ecommerce.tests.testcases import TestCase
 
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
 Course = get_model('courses', 'Course')
 Product = get_model('catalogue', 'Product')
+SeatProjection = get_model('catalogue', 'SeatProjection')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
@@ -173,3 +178,163 @@ class CouponCreationTests(CouponMixin, TestCase):
         coupon = self.create_custom_coupon(max_uses=max_uses_number)
         voucher = coupon.attr.coupon_vouchers.vouchers.first()
         self.assertEqual(voucher.offers.first().max_global_applications, max_uses_number)
+
+
+class GetProductsTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(GetProductsTests, self).setUp()
+        self.course = Course.objects.create(id=COURSE_ID, name='Test Course')
+        self.verified_seat = self.course.create_or_update_seat('verified', False, 10, self.partner)
+        self.honor_seat = self.course.create_or_update_seat('honor', False, 0, self.partner)
+        product_cache.clear()
+        product_cache.stats.clear()
+
+    def test_get_products(self):
+        """ Verify the products of several SKUs are fetched together, and missing SKUs are left out. """
+        skus = [seat.stockrecords.first().partner_sku for seat in (self.verified_seat, self.honor_seat)]
+
+        with self.assertNumQueries(2):
+            products = get_products(skus + ['missing'])
+
+        self.assertEqual(products, {skus[0]: self.verified_seat, skus[1]: self.honor_seat})
+        self.assertEqual(product_cache.stats['misses'], 3)
+
+    def test_get_products_cached(self):
+        """ Verify products are served from the cache once fetched. """
+        sku = self.verified_seat.stockrecords.first().partner_sku
+        get_products([sku])
+
+        with self.assertNumQueries(0):
+            product = get_products([sku])[sku]
+            self.assertEqual(product.stockrecords.all()[0].partner_sku, sku)
+
+        self.assertEqual(product, self.verified_seat)
+        self.assertEqual(product_cache.stats['hits'], 1)
+
+    def test_get_products_invalidated(self):
+        """ Verify cached products are fetched again once a stock record is saved. """
+        stockrecord = self.verified_seat.stockrecords.first()
+        get_products([stockrecord.partner_sku])
+
+        stockrecord.price_excl_tax = 20
+        stockrecord.save()
+
+        product = get_products([stockrecord.partner_sku])[stockrecord.partner_sku]
+        self.assertEqual(product.stockrecords.all()[0].price_excl_tax, 20)
+        self.assertEqual(product_cache.stats['misses'], 2)
+
+    def test_get_products_with_partner(self):
+        """ Verify only the stock records of the given partner are considered. """
+        sku = self.verified_seat.stockrecords.first().partner_sku
+        other_partner = PartnerFactory()
+
+        self.assertEqual(get_products([sku], partner=other_partner), {})
+        self.assertEqual(get_products([sku], partner=self.partner), {sku: self.verified_seat})
+
+
+class SeatProjectionTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(SeatProjectionTests, self).setUp()
+        self.course = Course.objects.create(id=COURSE_ID, name='Test Course')
+
+    def test_seat_projection(self):
+        """ Verify seats are projected as they are created and updated. """
+        seat = self.course.create_or_update_seat('verified', True, 10, self.partner)
+        stock_record = seat.stockrecords.first()
+
+        projection = SeatProjection.objects.get(product=seat)
+        self.assertEqual(projection.stock_record, stock_record)
+        self.assertEqual(projection.course, self.course)
+        self.assertEqual(projection.certificate_type, 'verified')
+        self.assertTrue(projection.id_verification_required)
+        self.assertEqual(projection.credit_provider, '')
+        self.assertEqual(projection.partner, self.partner)
+        self.assertEqual(projection.partner_sku, stock_record.partner_sku)
+        self.assertEqual(projection.price_excl_tax, 10)
+        self.assertIsNone(projection.expires)
+
+        seat = self.course.create_or_update_seat('verified', True, 20, self.partner, expires=now())
+        projection = SeatProjection.objects.get(product=seat)
+        self.assertEqual(projection.price_excl_tax, 20)
+        self.assertEqual(projection.expires, seat.expires)
+
+    def test_seat_projection_attribute_deleted(self):
+        """ Verify projections are updated when an attribute value of their seat is deleted. """
+        seat = self.course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT')
+        seat.attr.credit_provider = None
+        seat.save()
+
+        self.assertEqual(SeatProjection.objects.get(product=seat).credit_provider, '')
+
+    def test_seat_projection_deleted(self):
+        """ Verify projections are deleted along with their seat. """
+        seat = self.course.create_or_update_seat('verified', True, 10, self.partner)
+        seat.delete()
+        self.assertFalse(SeatProjection.objects.exists())
+
+    def test_update_seat_projections(self):
+        """ Verify missing and stale projections are brought up to date, and other products are not projected. """
+        seat = self.course.create_or_update_seat('verified', True, 10, self.partner)
+        audit_seat = self.course.create_or_update_seat('', False, 0, self.partner)
+        SeatProjection.objects.filter(product=seat).delete()
+        SeatProjection.objects.filter(product=audit_seat).update(certificate_type='honor')
+        product = ProductFactory()
+
+        update_seat_projections([seat.id, audit_seat.id, product.id, self.course.parent_seat_product.id])
+
+        self.assertEqual(SeatProjection.objects.get(product=seat).certificate_type, 'verified')
+        self.assertEqual(SeatProjection.objects.get(product=audit_seat).certificate_type, '')
+        self.assertEqual(SeatProjection.objects.count(), 2)
+
+    def test_get_seats(self):
+        """ Verify seats are looked up by course, certificate type, verification requirement and credit provider. """
+        verified_seat = self.course.create_or_update_seat('verified', True, 10, self.partner)
+        audit_seat = self.course.create_or_update_seat('', False, 0, self.partner)
+        credit_seat = self.course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT')
+        other_course = Course.objects.create(id='a/b/c', name='Other Course')
+        other_seat = other_course.create_or_update_seat('verified', True, 10, self.partner)
+
+        self.assertEqual(set(get_seats()), {verified_seat, audit_seat, credit_seat, other_seat})
+        self.assertEqual(set(get_seats(course_ids=[self.course.id])), {verified_seat, audit_seat, credit_seat})
+        self.assertEqual(set(get_seats(certificate_types=['verified'])), {verified_seat, other_seat})
+        self.assertEqual(list(get_seats(course_ids=[self.course.id], certificate_types=[''])), [audit_seat])
+        self.assertEqual(
+            set(get_seats(course_ids=[self.course.id], id_verification_required=True)),
+            {verified_seat, credit_seat}
+        )
+        self.assertEqual(
+            set(get_seats(course_ids=[self.course.id], id_verification_required=True, credit_provider='')),
+            {verified_seat}
+        )
+        self.assertEqual(list(get_seats(credit_provider='MIT')), [credit_seat])
+        self.assertEqual(set(get_seat_course_ids(['verified', 'credit'])), {self.course.id, other_course.id})
+
+
+class PrefetchProductAttributesTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(PrefetchProductAttributesTests, self).setUp()
+        self.course = Course.objects.create(id=COURSE_ID, name='Test Course')
+        self.course.create_or_update_seat('verified', True, 10, self.partner)
+        self.course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT')
+
+    def test_prefetch_product_attributes(self):
+        """ Verify the attribute values of every product are loaded at once. """
+        seats = Product.objects.filter(course=self.course, structure=Product.CHILD).order_by('id')
+
+        with self.assertNumQueries(2):
+            seats = prefetch_product_attributes(seats)
+
+        with self.assertNumQueries(0):
+            self.assertEqual([seat.attr.certificate_type for seat in seats], ['verified', 'credit'])
+            self.assertEqual(getattr(seats[0].attr, 'credit_provider', None), None)
+            self.assertEqual(seats[1].attr.credit_provider, 'MIT')
+            self.assertEqual(len(list(seats[1].attr)), 4)
+
+    def test_prefetch_product_attributes_keeps_unsaved_values(self):
+        """ Verify attribute values set on a product, but not saved, are not overwritten. """
+        seat = Product.objects.get(course=self.course, attributes__name='credit_provider')
+        seat.attr.credit_provider = 'ASU'
+
+        prefetch_product_attributes([seat])
+        self.assertEqual(seat.attr.credit_provider, 'ASU')
+        self.assertEqual(seat.attr.certificate_type, 'credit')
@@ -1,23 +1,36 @@
 from __future__ import unicode_literals
 
+from collections import defaultdict
 from hashlib import md5
 import logging
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.query import prefetch_related_objects
 from django.db.utils import IntegrityError
 from oscar.core.loading import get_model
 
+from ecommerce.core.commit_hooks import on_request_commit
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
+from ecommerce.core.local_cache import LocalCache
 from ecommerce.extensions.voucher.models import CouponVouchers
 from ecommerce.extensions.voucher.utils import create_vouchers
 
 Catalog = get_model('catalogue', 'Catalog')
 logger = logging.getLogger(__name__)
 Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 ProductCategory = get_model('catalogue', 'ProductCategory')
 ProductClass = get_model('catalogue', 'ProductClass')
+SeatProjection = get_model('catalogue', 'SeatProjection')
 StockRecord = get_model('partner', 'StockRecord')
 
+PRODUCT_CACHE_VERSION_CACHE_KEY = 'product_cache_version'
+SEAT_PROJECTION_ATTRIBUTE_CODES = ('certificate_type', 'credit_provider', 'id_verification_required')
+
 
 def create_coupon_product(
         benefit_type,
@@ -170,3 +183,241 @@ def get_or_create_catalog(name, partner, stock_record_ids):
     for stock_record in stock_records:
         catalog.stock_records.add(stock_record)
     return catalog, True
+
+
+# Products, by partner ID and SKU, tagged with the version of the catalogue found in the shared cache.
+# Saving a product or stock record changes the version, so every process stops using its entries as soon
+# as the catalogue changes.
+product_cache = LocalCache('PRODUCT_LOCAL_CACHE_TIMEOUT', 'PRODUCT_LOCAL_CACHE_SIZE')
+
+
+def _get_product_cache_version():
+    version = cache.get(PRODUCT_CACHE_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(PRODUCT_CACHE_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        version = cache.get(PRODUCT_CACHE_VERSION_CACHE_KEY)
+    return version
+
+
+def _fetch_products(skus, partner):
+    """ Returns the products of the given SKUs, by SKU, with their stock records, product class and parent. """
+    products = Product.objects.filter(stockrecords__partner_sku__in=skus)
+    if partner:
+        products = products.filter(stockrecords__partner=partner)
+    products = products.distinct().select_related(
+        'product_class', 'parent__product_class'
+    ).prefetch_related('stockrecords').order_by('id')
+
+    products_by_sku = {}
+    for product in products:
+        for stockrecord in product.stockrecords.all():
+            if stockrecord.partner_sku in skus and (partner is None or stockrecord.partner_id == partner.id):
+                products_by_sku.setdefault(stockrecord.partner_sku, product)
+
+    return products_by_sku
+
+
+def get_products(skus, partner=None):
+    """
+    Returns the products of the given SKUs.
+
+    Products are looked up in a per-process LRU cache first, then fetched from the database together,
+    with their stock records, product class and parent. Cache entries are invalidated when a product or
+    stock record is saved or deleted (see ecommerce.extensions.catalogue.signals).
+    Lookups are counted in product_cache.stats, under hits and misses.
+
+    Arguments:
+        skus (Iterable[str]): SKUs of the products.
+
+    Keyword Arguments:
+        partner (Partner): If given, only the stock records of this partner are considered.
+
+    Returns:
+        dict: Products, by SKU. SKUs without a product are left out.
+    """
+    skus = set(skus)
+    partner_id = partner.id if partner else None
+    version = _get_product_cache_version()
+
+    cached_products = product_cache.get_many([(partner_id, sku) for sku in skus], version)
+    products = {sku: product for (__, sku), product in cached_products.items()}
+    product_cache.stats['hits'] += len(products)
+
+    missing_skus = skus - set(products)
+    if missing_skus:
+        product_cache.stats['misses'] += len(missing_skus)
+        fetched_products = _fetch_products(missing_skus, partner)
+        product_cache.set_many(
+            {(partner_id, sku): product for sku, product in fetched_products.items()}, version
+        )
+        products.update(fetched_products)
+
+    return products
+
+
+def invalidate_cached_products():
+    """
+    Remove all products from the product caches of every process.
+
+    The caches are invalidated again once the current request's changes are committed, since other processes
+    may cache the products committed before the change in the meantime.
+    """
+    _change_product_cache_version()
+    on_request_commit(_change_product_cache_version)
+
+
+def _change_product_cache_version():
+    product_cache.clear()
+    cache.set(PRODUCT_CACHE_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def update_seat_projections(product_ids, create_missing=True):
+    """
+    Bring the seat projections of the given products up to date with their attribute values and stock records.
+
+    Projections of products which are not course seats, and of their stock records, are deleted.
+
+    Arguments:
+        product_ids (Iterable[int]): IDs of the products.
+
+    Keyword Arguments:
+        create_missing (bool): Whether projections are created for the stock records without one. Existing
+            projections are always updated.
+    """
+    product_ids = set(product_ids)
+    stock_records = StockRecord.objects.filter(
+        product_id__in=product_ids,
+        product__structure=Product.CHILD,
+        product__parent__product_class__name=SEAT_PRODUCT_CLASS_NAME,
+        product__course__isnull=False
+    ).select_related('product')
+
+    attributes = defaultdict(dict)
+    values = ProductAttributeValue.objects.filter(
+        product_id__in=product_ids,
+        attribute__code__in=SEAT_PROJECTION_ATTRIBUTE_CODES
+    ).values_list('product_id', 'attribute__code', 'value_text', 'value_boolean')
+    for product_id, code, value_text, value_boolean in values:
+        attributes[product_id][code] = value_boolean if code == 'id_verification_required' else value_text
+
+    projected_fields = {}
+    for stock_record in stock_records:
+        product = stock_record.product
+        product_attributes = attributes[product.id]
+        projected_fields[stock_record.id] = {
+            'product_id': product.id,
+            'course_id': product.course_id,
+            'certificate_type': product_attributes.get('certificate_type') or '',
+            'id_verification_required': bool(product_attributes.get('id_verification_required')),
+            'credit_provider': product_attributes.get('credit_provider') or '',
+            'partner_id': stock_record.partner_id,
+            'partner_sku': stock_record.partner_sku,
+            'price_excl_tax': stock_record.price_excl_tax,
+            'price_currency': stock_record.price_currency,
+            'expires': product.expires,
+        }
+
+    projections = SeatProjection.objects.filter(product_id__in=product_ids)
+    with transaction.atomic():
+        projections.exclude(stock_record_id__in=projected_fields.keys()).delete()
+
+        # Projections are updated in place, rather than replaced, so that updating them while their product is
+        # being deleted does not leave new projections behind.
+        projected_stock_record_ids = set(projections.values_list('stock_record_id', flat=True))
+        for stock_record_id in projected_stock_record_ids:
+            SeatProjection.objects.filter(stock_record_id=stock_record_id).update(**projected_fields[stock_record_id])
+
+        if create_missing:
+            SeatProjection.objects.bulk_create([
+                SeatProjection(stock_record_id=stock_record_id, **fields)
+                for stock_record_id, fields in projected_fields.items()
+                if stock_record_id not in projected_stock_record_ids
+            ])
+
+
+def iter_seat_id_batches(batch_size):
+    """
+    Yields the IDs of every course seat, in batches of up to batch_size IDs, in increasing order.
+
+    Batches are read as they are consumed, so that seats can be updated between batches.
+    """
+    seat_ids = Product.objects.filter(
+        structure=Product.CHILD,
+        parent__product_class__name=SEAT_PRODUCT_CLASS_NAME
+    ).order_by('id').values_list('id', flat=True)
+
+    last_id = 0
+    while True:
+        batch = list(seat_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return
+
+        yield batch
+        last_id = batch[-1]
+
+
+def get_seats(course_ids=None, certificate_types=None, id_verification_required=None, credit_provider=None):
+    """
+    Returns the course seats matching the given criteria, looked up through their projections.
+
+    Keyword Arguments:
+        course_ids (Iterable[str]): If given, only the seats of these courses are returned.
+        certificate_types (Iterable[str]): If given, only the seats of these certificate types are returned.
+            Audit seats have an empty certificate type.
+        id_verification_required (bool): If given, only the seats with this verification requirement are returned.
+        credit_provider (str): If given, only the seats of this credit provider are returned.
+            Non-credit seats have an empty credit provider.
+
+    Returns:
+        QuerySet: Products of the seats.
+    """
+    projections = SeatProjection.objects.all()
+    if course_ids is not None:
+        projections = projections.filter(course_id__in=course_ids)
+    if certificate_types is not None:
+        projections = projections.filter(certificate_type__in=certificate_types)
+    if id_verification_required is not None:
+        projections = projections.filter(id_verification_required=id_verification_required)
+    if credit_provider is not None:
+        projections = projections.filter(credit_provider=credit_provider)
+
+    return Product.objects.filter(id__in=projections.values('product_id'))
+
+
+def get_seat_course_ids(certificate_types):
+    """ Returns the IDs of the courses with seats of the given certificate types. """
+    return SeatProjection.objects.filter(
+        certificate_type__in=certificate_types
+    ).values_list('course_id', flat=True).distinct()
+
+
+def prefetch_product_attributes(products):
+    """
+    Load the attribute values of the given products in a single query.
+
+    Reading, or iterating over, the attributes of the products does not query the database afterwards.
+    Attribute values already set on a product, but not saved, are kept.
+
+    Arguments:
+        products (Iterable[Product]): Products whose attribute values are loaded. Querysets are evaluated.
+
+    Returns:
+        list: The products.
+    """
+    products = list(products)
+    prefetch_related_objects(products, [
+        Prefetch('attribute_values', queryset=ProductAttributeValue.objects.select_related('attribute'))
+    ])
+
+    for product in products:
+        container = product.attr
+        if container.initialised:
+            continue
+
+        for value in product.attribute_values.all():
+            # Reading the container's own attributes through vars() does not initialise it from the database.
+            if value.attribute.code not in vars(container):
+                setattr(container, value.attribute.code, value.value)
+        container.initialised = True
+
+    return products
@@ -10,11 +10,15 @@ from ecommerce_worker.fulfillment.v1.tasks import fulfill_order
 from oscar.apps.checkout.mixins import OrderPlacementMixin
 from oscar.core.loading import get_class, get_model
 
+from ecommerce.core.commit_hooks import on_request_commit
 from ecommerce.extensions.analytics.utils import audit_log
 from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.checkout.exceptions import BasketNotFreeError
+from ecommerce.extensions.checkout.tasks import dispatch_post_checkout_effects
+from ecommerce.extensions.checkout.utils import record_post_checkout_effects
 from ecommerce.extensions.customer.utils import Dispatcher
 from ecommerce.extensions.order.constants import PaymentEventTypeName
+from ecommerce.sailthru.signals import save_campaign_id
 
 CommunicationEventType = get_model('customer', 'CommunicationEventType')
 logger = logging.getLogger(__name__)
@@ -25,6 +29,13 @@ Source = get_model('payment', 'Source')
 SourceType = get_model('payment', 'SourceType')
 
 
+def _dispatch_post_checkout_effects(order_number):
+    try:
+        dispatch_post_checkout_effects.delay(order_number)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Failed to dispatch the post-checkout effects of order [%s].', order_number)
+
+
 class EdxOrderPlacementMixin(OrderPlacementMixin):
     """ Mixin for edX-specific order placement. """
 
@@ -96,9 +107,10 @@ class EdxOrderPlacementMixin(OrderPlacementMixin):
         """
         Place an order and mark the corresponding basket as submitted.
 
-        Differs from the superclass' method by wrapping order placement
-        and basket submission in a transaction. Should be used only in
-        the context of an exception handler.
+        Differs from the superclass' method by wrapping order placement,
+        basket submission and the recording of the order's post-checkout
+        effects in a transaction. Should be used only in the context of an
+        exception handler.
         """
         with transaction.atomic():
             order = self.place_order(
@@ -114,11 +126,16 @@ class EdxOrderPlacementMixin(OrderPlacementMixin):
             )
 
             basket.submit()
+            save_campaign_id(basket, request)
+            record_post_checkout_effects(order)
 
         return self.handle_successful_order(order, request)
 
     def handle_successful_order(self, order, request=None):  # pylint: disable=arguments-differ
-        """Send a signal so that receivers can perform relevant tasks (e.g., fulfill the order)."""
+        """
+        Send a signal so that receivers can perform relevant tasks (e.g., fulfill the order), and dispatch
+        the order's other post-checkout effects (e.g., tracking events and emails) asynchronously.
+        """
         audit_log(
             'order_placed',
             amount=order.total_excl_tax,
@@ -138,6 +155,14 @@ class EdxOrderPlacementMixin(OrderPlacementMixin):
         else:
             post_checkout.send(sender=self, order=order, request=request)
 
+        # Effects are normally recorded with the order. This records those of orders placed otherwise.
+        record_post_checkout_effects(order)
+        # The task only sees the effects once they are committed, so it is queued once the request's changes are.
+        # Outside of requests, or if the task does not find them, the effects are delivered by the next periodic
+        # run of the dispatcher.
+        if not on_request_commit(_dispatch_post_checkout_effects, order.number):
+            _dispatch_post_checkout_effects(order.number)
+
         return order
 
     def place_free_order(self, basket, request=None):
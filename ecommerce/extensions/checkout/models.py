@@ -1,3 +1,25 @@
+from django.db import models
+from django_extensions.db.models import TimeStampedModel
+
+
+class PostCheckoutEffect(TimeStampedModel):
+    """
+    Side effect of placing an order (e.g. a tracking event or a receipt email), delivered asynchronously.
+
+    Effects are recorded in the transaction which places their order, and delivered at least once by the
+    dispatch_post_checkout_effects task.
+    """
+    order = models.ForeignKey('order.Order', related_name='post_checkout_effects')
+    # Key of the effect's function in the POST_CHECKOUT_EFFECTS setting.
+    name = models.CharField(max_length=255)
+    # Identifies a delivery of an effect for an order, so that receivers can ignore repeated deliveries.
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    # Number of times the effect's delivery has been attempted.
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(db_index=True)
+    delivered = models.DateTimeField(null=True, blank=True)
+
+
 # noinspection PyUnresolvedReferences
 # pylint: disable=wildcard-import
-from oscar.apps.checkout.models import *    # pragma: no cover
+from oscar.apps.checkout.models import *    # noqa pylint: disable=wrong-import-position,wrong-import-order,ungrouped-imports
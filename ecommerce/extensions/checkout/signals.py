@@ -1,26 +1,28 @@
 import logging
 
-from django.dispatch import receiver
-from oscar.core.loading import get_class
 import waffle
 
 from ecommerce.courses.utils import mode_for_seat
-from ecommerce.extensions.analytics.utils import is_segment_configured, parse_tracking_context, silence_exceptions
-from ecommerce.extensions.checkout.utils import get_credit_provider_details, get_receipt_page_url
+from ecommerce.extensions.analytics.utils import is_segment_configured, parse_tracking_context
+from ecommerce.extensions.checkout.utils import (
+    get_credit_provider_details, get_receipt_page_url, is_post_checkout_effect_delivered,
+    record_post_checkout_effect_delivery
+)
 from ecommerce.notifications.notifications import send_notification
 
 
 logger = logging.getLogger(__name__)
-post_checkout = get_class('checkout.signals', 'post_checkout')
 
 # Number of orders currently supported for the email notifications
 ORDER_LINE_COUNT = 1
 
 
-@receiver(post_checkout, dispatch_uid='tracking.post_checkout_callback')
-@silence_exceptions("Failed to emit tracking event upon order completion.")
-def track_completed_order(sender, order=None, **kwargs):  # pylint: disable=unused-argument
-    """Emit a tracking event when an order is placed."""
+def track_completed_order(sender, order=None, idempotency_key=None, **kwargs):  # pylint: disable=unused-argument
+    """Emit a tracking event when an order is placed.
+
+    The idempotency key of the effect is the ID of the event's message, so that Segment ignores repeated
+    deliveries of the event.
+    """
     if not (is_segment_configured() and order.total_excl_tax > 0):
         return
 
@@ -54,13 +56,19 @@ def track_completed_order(sender, order=None, **kwargs):  # pylint: disable=unus
                 'clientId': lms_client_id
             }
         },
+        message_id=idempotency_key,
     )
 
 
-@receiver(post_checkout, dispatch_uid='send_completed_order_email')
-@silence_exceptions("Failed to send order completion email.")
-def send_course_purchase_email(sender, order=None, **kwargs):  # pylint: disable=unused-argument
-    """Send course purchase notification email when a course is purchased."""
+def send_course_purchase_email(sender, order=None, idempotency_key=None, **kwargs):  # pylint: disable=unused-argument
+    """Send course purchase notification email when a course is purchased.
+
+    Emails already sent for the idempotency key of the effect are not sent again.
+    """
+    if idempotency_key and is_post_checkout_effect_delivered(idempotency_key):
+        logger.info('Ignoring repeated delivery [%s] of the course purchase email.', idempotency_key)
+        return
+
     if waffle.switch_is_active('ENABLE_NOTIFICATIONS'):
         # We do not currently support email sending for orders with more than one item.
         if len(order.lines.all()) == ORDER_LINE_COUNT:
@@ -95,6 +103,8 @@ def send_course_purchase_email(sender, order=None, **kwargs):  # pylint: disable
                         },
                         order.site
                     )
+                    if idempotency_key:
+                        record_post_checkout_effect_delivery(idempotency_key)
 
         else:
             logger.info('Currently support receipt emails for order with one item.')
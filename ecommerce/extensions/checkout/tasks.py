@@ -0,0 +1,89 @@
+"""Asynchronous tasks for checkout."""
+import datetime
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+
+from ecommerce.core.task_utils import site_request
+
+logger = logging.getLogger(__name__)
+
+PostCheckoutEffect = get_model('checkout', 'PostCheckoutEffect')
+
+
+def get_post_checkout_effect_retry_delay(attempts):
+    """ Returns the number of seconds to wait before delivering an effect again, after its given attempt. """
+    return min(
+        settings.POST_CHECKOUT_EFFECT_RETRY_BACKOFF * 2 ** (attempts - 1),
+        settings.POST_CHECKOUT_EFFECT_RETRY_MAX_BACKOFF
+    )
+
+
+def _deliver_post_checkout_effect(effect):
+    """
+    Deliver an effect, unless another run of the dispatcher has claimed it.
+
+    Claiming an effect schedules its next attempt, so that it is delivered again if this attempt fails,
+    or dies before recording its delivery.
+    """
+    attempts = effect.attempts + 1
+    claimed = PostCheckoutEffect.objects.filter(
+        id=effect.id,
+        attempts=effect.attempts,
+        delivered__isnull=True
+    ).update(
+        attempts=attempts,
+        next_attempt=now() + datetime.timedelta(seconds=get_post_checkout_effect_retry_delay(attempts))
+    )
+    if not claimed:
+        return
+
+    order = effect.order
+
+    # Receivers building LMS URLs read the site of the current request.
+    try:
+        with site_request(order.site):
+            receiver = import_string(settings.POST_CHECKOUT_EFFECTS[effect.name])
+            receiver(sender=PostCheckoutEffect, order=order, idempotency_key=effect.idempotency_key)
+    except Exception:  # pylint: disable=broad-except
+        if attempts >= settings.POST_CHECKOUT_EFFECT_MAX_ATTEMPTS:
+            logger.exception(
+                'Giving up on post-checkout effect [%s] of order [%s] after [%d] attempts.',
+                effect.name, order.number, attempts
+            )
+        else:
+            logger.exception(
+                'Failed to deliver post-checkout effect [%s] of order [%s]. It will be delivered again.',
+                effect.name, order.number
+            )
+        return
+
+    PostCheckoutEffect.objects.filter(id=effect.id).update(delivered=now())
+
+
+@shared_task
+def dispatch_post_checkout_effects(order_number=None):
+    """
+    Deliver up to POST_CHECKOUT_EFFECT_BATCH_SIZE post-checkout effects which are due.
+
+    Effects are delivered at least once: an effect whose delivery fails, or is interrupted, is delivered
+    again, with a longer delay, up to POST_CHECKOUT_EFFECT_MAX_ATTEMPTS times.
+
+    Args:
+        order_number (str): If given, only the effects of this order are delivered.
+    """
+    effects = PostCheckoutEffect.objects.filter(
+        delivered__isnull=True,
+        attempts__lt=settings.POST_CHECKOUT_EFFECT_MAX_ATTEMPTS,
+        next_attempt__lte=now()
+    )
+    if order_number:
+        effects = effects.filter(order__number=order_number)
+
+    effects = effects.select_related('order__site__siteconfiguration', 'order__user').order_by('next_attempt')
+    for effect in effects[:settings.POST_CHECKOUT_EFFECT_BATCH_SIZE]:
+        _deliver_post_checkout_effect(effect)
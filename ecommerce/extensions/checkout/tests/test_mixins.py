@@ -2,6 +2,7 @@
 Tests for the ecommerce.extensions.checkout.mixins module.
 """
 
+from django.conf import settings
 from django.core import mail
 from django.test import RequestFactory
 from mock import Mock, patch
@@ -11,19 +12,23 @@ from oscar.test.newfactories import BasketFactory, ProductFactory, UserFactory
 from testfixtures import LogCapture
 from waffle.models import Sample
 
-from ecommerce.core.models import SegmentClient
+from ecommerce.core.commit_hooks import run_request_callbacks, start_request_callbacks
+from ecommerce.extensions.analytics.utils import SegmentClient
 from ecommerce.extensions.checkout.exceptions import BasketNotFreeError
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.checkout.tasks import dispatch_post_checkout_effects
 from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.extensions.payment.tests.mixins import PaymentEventsMixin
 from ecommerce.extensions.payment.tests.processors import DummyProcessor
 from ecommerce.extensions.refund.tests.mixins import RefundTestMixin
+from ecommerce.sailthru.signals import SAILTHRU_CAMPAIGN
 from ecommerce.tests.factories import SiteConfigurationFactory
 from ecommerce.tests.mixins import BusinessIntelligenceMixin
 from ecommerce.tests.testcases import TestCase
 
 LOGGER_NAME = 'ecommerce.extensions.analytics.utils'
 Basket = get_model('basket', 'Basket')
+BasketAttributeType = get_model('basket', 'BasketAttributeType')
 PaymentEventType = get_model('order', 'PaymentEventType')
 SourceType = get_model('payment', 'SourceType')
 
@@ -206,6 +211,60 @@ class EdxOrderPlacementMixinTests(BusinessIntelligenceMixin, PaymentEventsMixin,
         self.assertIsNotNone(order)
         self.assertEqual(basket.status, Basket.SUBMITTED)
 
+    def test_place_free_order_post_checkout_effects(self, __):
+        """ Verify the effects of an order are recorded with the order, and delivered. """
+        basket = BasketFactory(owner=self.user, site=self.site)
+        basket.add_product(ProductFactory(stockrecords__price_excl_tax=0))
+
+        with patch('ecommerce.extensions.checkout.mixins.dispatch_post_checkout_effects.delay') as mock_delay:
+            order = EdxOrderPlacementMixin().place_free_order(basket)
+
+        mock_delay.assert_called_once_with(order.number)
+        self.assertEqual(
+            set(order.post_checkout_effects.values_list('name', flat=True)),
+            set(settings.POST_CHECKOUT_EFFECTS)
+        )
+
+        dispatch_post_checkout_effects(order.number)
+        self.assertFalse(order.post_checkout_effects.filter(delivered__isnull=True).exists())
+
+    def test_place_free_order_saves_campaign_id(self, __):
+        """ Verify the Sailthru campaign ID of the purchase request is saved with the basket, for the
+        post-checkout effects dispatched without the request. """
+        basket = BasketFactory(owner=self.user, site=self.site)
+        basket.add_product(ProductFactory(stockrecords__price_excl_tax=0))
+        BasketAttributeType.objects.get_or_create(name=SAILTHRU_CAMPAIGN)
+        request = RequestFactory().get('/')
+        request.COOKIES[SAILTHRU_CAMPAIGN] = 'campaign-id'
+
+        EdxOrderPlacementMixin().place_free_order(basket, request=request)
+        self.assertEqual(
+            basket.basketattribute_set.get(attribute_type__name=SAILTHRU_CAMPAIGN).value_text,
+            'campaign-id'
+        )
+
+    def test_handle_successful_order_dispatch_after_commit(self, __):
+        """ Verify the effects of an order placed while handling a request are dispatched once it is committed. """
+        with patch('ecommerce.extensions.checkout.mixins.dispatch_post_checkout_effects.delay') as mock_delay:
+            start_request_callbacks()
+            EdxOrderPlacementMixin().handle_successful_order(self.order)
+            self.assertFalse(mock_delay.called)
+
+            run_request_callbacks()
+            mock_delay.assert_called_once_with(self.order.number)
+
+    def test_handle_successful_order_dispatch_error(self, mock_track):
+        """ Verify the effects of an order are left for the periodic dispatcher if they cannot be dispatched. """
+        with patch('ecommerce.extensions.checkout.mixins.dispatch_post_checkout_effects.delay') as mock_delay:
+            mock_delay.side_effect = Exception('Broker unavailable')
+            EdxOrderPlacementMixin().handle_successful_order(self.order)
+
+        self.assertFalse(mock_track.called)
+        self.assertEqual(
+            self.order.post_checkout_effects.filter(delivered__isnull=True).count(),
+            len(settings.POST_CHECKOUT_EFFECTS)
+        )
+
     def test_non_free_basket_order(self, __):
         """ Verify an error is raised for non-free basket. """
         basket = BasketFactory(owner=self.user, site=self.site)
@@ -95,6 +95,26 @@ class SignalTests(CourseCatalogTestMixin, TestCase):
             )
         )
 
+    @httpretty.activate
+    def test_post_checkout_callback_repeated_delivery(self):
+        """ Verify the receipt email is only sent once per idempotency key. """
+        credit_provider_id = 'HGW'
+        httpretty.register_uri(
+            httpretty.GET,
+            self.site.siteconfiguration.build_lms_url(
+                'api/credit/v1/providers/{credit_provider_id}/'.format(credit_provider_id=credit_provider_id)
+            ),
+            body=json.dumps({'display_name': 'Hogwarts'}),
+            content_type='application/json'
+        )
+
+        order = self.prepare_order('credit', credit_provider_id=credit_provider_id)
+        self.mock_access_token_response()
+        idempotency_key = '{}:send_course_purchase_email'.format(order.number)
+        send_course_purchase_email(None, order=order, idempotency_key=idempotency_key)
+        send_course_purchase_email(None, order=order, idempotency_key=idempotency_key)
+        self.assertEqual(len(mail.outbox), 1)
+
     def test_post_checkout_callback_no_credit_provider(self):
         order = self.prepare_order('verified')
         with LogCapture(LOGGER_NAME) as l:
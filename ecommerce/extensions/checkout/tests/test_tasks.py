@@ -0,0 +1,93 @@
+"""Tests of the checkout's asynchronous tasks."""
+import datetime
+
+from django.test.utils import override_settings
+from django.utils.timezone import now
+import mock
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.checkout.tasks import _deliver_post_checkout_effect, dispatch_post_checkout_effects
+from ecommerce.extensions.checkout.utils import record_post_checkout_effects
+from ecommerce.tests.testcases import TestCase
+
+PostCheckoutEffect = get_model('checkout', 'PostCheckoutEffect')
+
+EFFECT_PATH = 'ecommerce.extensions.checkout.signals.track_completed_order'
+
+
+@override_settings(
+    POST_CHECKOUT_EFFECTS={'track_completed_order': EFFECT_PATH},
+    POST_CHECKOUT_EFFECT_MAX_ATTEMPTS=3
+)
+class DispatchPostCheckoutEffectsTests(TestCase):
+    """ Tests for the dispatch_post_checkout_effects task. """
+
+    def setUp(self):
+        super(DispatchPostCheckoutEffectsTests, self).setUp()
+        self.order = factories.create_order()
+        self.order.site = self.site
+        self.order.save()
+        record_post_checkout_effects(self.order)
+        self.effect = PostCheckoutEffect.objects.get(order=self.order)
+
+    def test_record_post_checkout_effects(self):
+        """ Verify recording the effects of an order again does not duplicate them. """
+        record_post_checkout_effects(self.order)
+        self.assertEqual(PostCheckoutEffect.objects.filter(order=self.order).count(), 1)
+        self.assertEqual(self.effect.idempotency_key, '{}:track_completed_order'.format(self.order.number))
+
+    def test_dispatch(self):
+        """ Verify due effects are delivered once, with their idempotency key. """
+        with mock.patch(EFFECT_PATH) as mock_effect:
+            dispatch_post_checkout_effects(self.order.number)
+            dispatch_post_checkout_effects()
+
+        mock_effect.assert_called_once_with(
+            sender=PostCheckoutEffect,
+            order=self.order,
+            idempotency_key=self.effect.idempotency_key
+        )
+        self.effect.refresh_from_db()
+        self.assertIsNotNone(self.effect.delivered)
+        self.assertEqual(self.effect.attempts, 1)
+
+    def test_dispatch_other_order(self):
+        """ Verify only the effects of the given order are delivered. """
+        with mock.patch(EFFECT_PATH) as mock_effect:
+            dispatch_post_checkout_effects('not-an-order')
+
+        self.assertFalse(mock_effect.called)
+
+    def test_dispatch_failure(self):
+        """ Verify effects whose delivery fails are delivered again once they are due, up to a limit. """
+        with mock.patch(EFFECT_PATH) as mock_effect:
+            mock_effect.side_effect = Exception('Segment is down')
+            dispatch_post_checkout_effects()
+
+            self.effect.refresh_from_db()
+            self.assertIsNone(self.effect.delivered)
+            self.assertEqual(self.effect.attempts, 1)
+            self.assertGreater(self.effect.next_attempt, now())
+
+            # The effect is not due yet.
+            dispatch_post_checkout_effects()
+            self.assertEqual(mock_effect.call_count, 1)
+
+            for __ in range(3):
+                PostCheckoutEffect.objects.update(next_attempt=now() - datetime.timedelta(seconds=1))
+                dispatch_post_checkout_effects()
+
+        # The effect is given up on after three attempts.
+        self.assertEqual(mock_effect.call_count, 3)
+        self.effect.refresh_from_db()
+        self.assertIsNone(self.effect.delivered)
+
+    def test_dispatch_claimed_effect(self):
+        """ Verify an effect claimed by another run of the dispatcher is not delivered again. """
+        stale_effect = PostCheckoutEffect.objects.get(id=self.effect.id)
+        with mock.patch(EFFECT_PATH) as mock_effect:
+            dispatch_post_checkout_effects()
+            _deliver_post_checkout_effect(stale_effect)
+
+        self.assertEqual(mock_effect.call_count, 1)
@@ -2,13 +2,18 @@ import logging
 
 from babel.numbers import format_currency
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
 from django.utils.translation import get_language, to_locale
 from edx_rest_api_client.client import EdxRestApiClient
+from oscar.core.loading import get_model
 from requests.exceptions import ConnectionError, Timeout
 from slumber.exceptions import SlumberHttpBaseException
 
 
 logger = logging.getLogger(__name__)
+POST_CHECKOUT_EFFECT_DELIVERY_CACHE_KEY = 'post_checkout_effect_delivery_{idempotency_key}'
+PostCheckoutEffect = get_model('checkout', 'PostCheckoutEffect')
 
 
 def get_credit_provider_details(access_token, credit_provider_id, site_configuration):
@@ -69,3 +74,66 @@ def add_currency(amount):
         format=u'#,##0.00',
         locale=to_locale(get_language())
     )
+
+
+def get_post_checkout_effect_idempotency_key(order, name):
+    return '{order_number}:{name}'.format(order_number=order.number, name=name)
+
+
+def record_post_checkout_effects(order):
+    """
+    Record the post-checkout side effects of an order, listed in the POST_CHECKOUT_EFFECTS setting,
+    for delivery by the dispatch_post_checkout_effects task.
+
+    Effects which have already been recorded for the order are left untouched.
+
+    Args:
+        order (Order): Order which has just been placed.
+    """
+    keys = {
+        get_post_checkout_effect_idempotency_key(order, name): name for name in settings.POST_CHECKOUT_EFFECTS
+    }
+    recorded_keys = set(
+        PostCheckoutEffect.objects.filter(idempotency_key__in=keys).values_list('idempotency_key', flat=True)
+    )
+
+    timestamp = now()
+    PostCheckoutEffect.objects.bulk_create([
+        PostCheckoutEffect(order=order, name=name, idempotency_key=key, next_attempt=timestamp)
+        for key, name in keys.items() if key not in recorded_keys
+    ])
+
+
+def _get_post_checkout_effect_delivery_cache_key(idempotency_key):
+    return POST_CHECKOUT_EFFECT_DELIVERY_CACHE_KEY.format(idempotency_key=idempotency_key)
+
+
+def is_post_checkout_effect_delivered(idempotency_key):
+    """
+    Returns whether a receiver has recorded the delivery of the effect with the given idempotency key.
+
+    Effects are delivered at least once, so the dispatcher may deliver an effect again after its receiver
+    completed, e.g. when the dispatcher dies before marking the effect delivered. Receivers with side effects
+    which cannot be repeated safely, such as emails, check their deliveries with this function.
+
+    Args:
+        idempotency_key (str): Idempotency key of the effect, or of a part of its delivery.
+
+    Returns:
+        bool
+    """
+    return bool(cache.get(_get_post_checkout_effect_delivery_cache_key(idempotency_key)))
+
+
+def record_post_checkout_effect_delivery(idempotency_key):
+    """
+    Record the delivery of the effect with the given idempotency key, once its side effect has taken place.
+
+    Args:
+        idempotency_key (str): Idempotency key of the effect, or of a part of its delivery.
+    """
+    cache.set(
+        _get_post_checkout_effect_delivery_cache_key(idempotency_key),
+        True,
+        settings.POST_CHECKOUT_EFFECT_DELIVERY_CACHE_TIMEOUT
+    )
@@ -5,11 +5,15 @@ Calls down to a common interface for fulfillment of each line of an order based
 can successfully fulfill the product. Success can be reported back based on each line item in the order.
 
 """
+from collections import OrderedDict, defaultdict
+import datetime
 import logging
+import random
 
 from django.conf import settings
 from django.utils import importlib
 from django.utils.timezone import now
+from oscar.core.loading import get_model
 
 from ecommerce.extensions.fulfillment import exceptions
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
@@ -18,6 +22,14 @@ from ecommerce.extensions.refund.status import REFUND_LINE
 
 logger = logging.getLogger(__name__)
 
+FulfillmentRetry = get_model('order', 'FulfillmentRetry')
+
+# Lines failing with these statuses are fulfilled again later, since their errors are likely to be transient.
+RETRYABLE_LINE_STATUSES = (LINE.FULFILLMENT_NETWORK_ERROR, LINE.FULFILLMENT_TIMEOUT_ERROR)
+
+# Relations loaded along with order lines, so that the product class of each line is known without a query.
+LINE_PRODUCT_CLASS_RELATIONS = ('product__product_class', 'product__parent__product_class')
+
 
 def fulfill_order(order, lines):
     """ Fulfills line items in an Order
@@ -43,20 +55,15 @@ def fulfill_order(order, lines):
         logger.error(error_msg)
         raise exceptions.IncorrectOrderStatusError(error_msg)
 
-    # Construct a dict of lines by their product type.
-    line_items = list(lines.all())
+    line_items = list(lines.select_related(*LINE_PRODUCT_CLASS_RELATIONS))
 
     try:
-        # Iterate over the Fulfillment Modules defined in our configuration and determine if they support
-        # any of the lines in the order. Fulfill line items in the order they are designated by the configuration.
-        # Remaining line items should be marked with a fulfillment error since we have no configuration that
-        # allows them to be fulfilled.
-        for module_class in get_fulfillment_modules():
-            module = module_class()
-            supported_lines = module.get_supported_lines(line_items)
-            if supported_lines:
-                line_items = list(set(line_items) - set(supported_lines))
-                module.fulfill_product(order, supported_lines)
+        # Group the lines by the Fulfillment Module supporting them, and fulfill them in the order the modules
+        # are designated by the configuration. Remaining line items should be marked with a fulfillment error
+        # since we have no configuration that allows them to be fulfilled.
+        grouped_lines, line_items = get_fulfillment_module_registry().group_lines(line_items)
+        for module, supported_lines in grouped_lines:
+            module.fulfill_product(order, supported_lines)
 
         # Check to see if any line items in the order have not been accounted for by a FulfillmentModule
         # Any product does not line up with a module, we have to mark a fulfillment error.
@@ -68,9 +75,12 @@ def fulfill_order(order, lines):
     except Exception:   # pylint: disable=broad-except
         logger.exception('An unexpected error occurred while fulfilling order [%s].', order.number)
     finally:
+        fulfilled_lines = list(lines.all())
+        schedule_fulfillment_retries(fulfilled_lines)
+
         # Check if all lines are successful, or there were errors, and set the status of the Order.
         order_status = ORDER.COMPLETE
-        for line in lines.all():
+        for line in fulfilled_lines:
             if line.status != LINE.COMPLETE:
                 logger.error('There was an error while fulfilling order [%s]', order.number)
                 order_status = ORDER.FULFILLMENT_ERROR
@@ -89,6 +99,58 @@ def fulfill_order(order, lines):
         return order  # pylint: disable=lost-exception
 
 
+def get_fulfillment_retry_delay(attempts):
+    """
+    Returns the number of seconds to wait before retrying the fulfillment of a line.
+
+    The delay doubles with each attempt, up to FULFILLMENT_RETRY_MAX_BACKOFF, and is randomly shortened by up
+    to half so that lines failing together during an LMS outage are not all retried at the same time.
+
+    Args:
+        attempts (int): Number of times the line's fulfillment has been retried.
+    """
+    delay = min(settings.FULFILLMENT_RETRY_BACKOFF * 2 ** attempts, settings.FULFILLMENT_RETRY_MAX_BACKOFF)
+    return random.uniform(delay / 2.0, delay)
+
+
+def schedule_fulfillment_retries(lines):
+    """
+    Schedules the retry of lines whose fulfillment failed with a transient error, and cancels the retries of
+    the other lines. Lines are given up on once they have been retried FULFILLMENT_RETRY_MAX_ATTEMPTS times.
+
+    Args:
+        lines (List of Lines): Lines whose fulfillment has just been attempted.
+    """
+    retries = {retry.line_id: retry for retry in FulfillmentRetry.objects.filter(line__in=lines)}
+    cancelled_retry_ids = []
+
+    for line in lines:
+        retry = retries.get(line.id)
+        if line.status not in RETRYABLE_LINE_STATUSES:
+            if retry:
+                cancelled_retry_ids.append(retry.id)
+            continue
+
+        retry = retry or FulfillmentRetry(line=line)
+        if retry.attempts >= settings.FULFILLMENT_RETRY_MAX_ATTEMPTS:
+            logger.error(
+                'Giving up on fulfilling line [%d] of order [%s] after [%d] retries.',
+                line.id, line.order.number, retry.attempts
+            )
+            cancelled_retry_ids.append(retry.id)
+            continue
+
+        retry.next_attempt = now() + datetime.timedelta(seconds=get_fulfillment_retry_delay(retry.attempts))
+        retry.save()
+        logger.info(
+            'Scheduled retry [%d] of the fulfillment of line [%d] for [%s].',
+            retry.attempts + 1, line.id, retry.next_attempt
+        )
+
+    if cancelled_retry_ids:
+        FulfillmentRetry.objects.filter(id__in=cancelled_retry_ids).delete()
+
+
 def get_fulfillment_modules():
     """ Retrieves all fulfillment modules declared in settings. """
     module_paths = getattr(settings, 'FULFILLMENT_MODULES', [])
@@ -105,6 +167,84 @@ def get_fulfillment_modules():
     return modules
 
 
+class FulfillmentModuleRegistry(object):
+    """ Instances of the configured fulfillment modules, indexed by the names of the product classes they fulfill. """
+
+    def __init__(self, module_classes):
+        self.modules = [module_class() for module_class in module_classes]
+        self.modules_by_product_class = defaultdict(list)
+        self.generic_modules = []
+        for module in self.modules:
+            if module.product_class_names:
+                for product_class_name in module.product_class_names:
+                    self.modules_by_product_class[product_class_name].append(module)
+            else:
+                self.generic_modules.append(module)
+
+    def get_modules_for_line(self, line):
+        """ Returns the modules supporting a line, in the order they are configured. """
+        product_class_modules = self.modules_by_product_class.get(line.product.get_product_class().name, [])
+        return [
+            module for module in self.modules
+            if module in product_class_modules or (not module.product_class_names and module.supports_line(line))
+        ]
+
+    def group_lines(self, lines):
+        """
+        Groups lines by the first configured module supporting them, in a single pass over the lines.
+
+        Modules declaring product classes are handed the lines of those classes before modules which do not
+        are asked for the lines they support.
+
+        Arguments:
+            lines (List of Lines): Order lines, with their product classes loaded.
+
+        Returns:
+            A list of (module, lines) pairs, in the order the modules are configured, and the list of the
+            lines no module supports.
+        """
+        lines_by_module = OrderedDict((module, []) for module in self.modules)
+        remaining_lines = []
+        for line in lines:
+            product_class_modules = self.modules_by_product_class.get(line.product.get_product_class().name)
+            if product_class_modules:
+                lines_by_module[product_class_modules[0]].append(line)
+            else:
+                remaining_lines.append(line)
+
+        for module in self.generic_modules:
+            if not remaining_lines:
+                break
+
+            supported_lines = set(module.get_supported_lines(remaining_lines))
+            lines_by_module[module].extend(line for line in remaining_lines if line in supported_lines)
+            remaining_lines = [line for line in remaining_lines if line not in supported_lines]
+
+        grouped_lines = [(module, module_lines) for module, module_lines in lines_by_module.items() if module_lines]
+        return grouped_lines, remaining_lines
+
+
+_fulfillment_module_registry = None
+
+
+def get_fulfillment_module_registry():
+    """
+    Returns the registry of the fulfillment modules declared in settings.
+
+    The registry is built when the app is ready, and rebuilt after FULFILLMENT_MODULES is changed.
+    """
+    global _fulfillment_module_registry  # pylint: disable=global-statement
+    if _fulfillment_module_registry is None:
+        _fulfillment_module_registry = FulfillmentModuleRegistry(get_fulfillment_modules())
+    return _fulfillment_module_registry
+
+
+def reset_fulfillment_module_registry():
+    """ Discards the registry of fulfillment modules, so that it is rebuilt on its next use. """
+    global _fulfillment_module_registry  # pylint: disable=global-statement
+    _fulfillment_module_registry = None
+
+
 def get_fulfillment_modules_for_line(line):
     """
     Returns a list of fulfillment modules that can fulfill the given Line.
@@ -112,7 +252,7 @@ def get_fulfillment_modules_for_line(line):
     Arguments
         line (Line): Line to be considered for fulfillment.
     """
-    return [module for module in get_fulfillment_modules() if module().supports_line(line)]
+    return [type(module) for module in get_fulfillment_module_registry().get_modules_for_line(line)]
 
 
 def revoke_fulfillment_for_refund(refund):
@@ -131,14 +271,16 @@ def revoke_fulfillment_for_refund(refund):
         for refund_line in refund.lines.all():
             refund_line.set_status(REFUND_LINE.COMPLETE)
     else:
-        # TODO (CCB): As our list of product types and fulfillment modules grows, this may become slow,
-        # and should be updated. Runtime is O(n^2).
-        for refund_line in refund.lines.all():
+        registry = get_fulfillment_module_registry()
+        refund_lines = refund.lines.select_related(
+            'order_line__order__user',
+            *['order_line__{}'.format(relation) for relation in LINE_PRODUCT_CLASS_RELATIONS]
+        )
+        for refund_line in refund_lines:
             order_line = refund_line.order_line
-            modules = get_fulfillment_modules_for_line(order_line)
 
-            for module in modules:
-                if module().revoke_line(order_line):
+            for module in registry.get_modules_for_line(order_line):
+                if module.revoke_line(order_line):
                     refund_line.set_status(REFUND_LINE.COMPLETE)
                 else:
                     succeeded = False
@@ -10,3 +10,7 @@ class FulfillmentAppConfig(AppConfig):
 
         # noinspection PyUnresolvedReferences
         import ecommerce.extensions.fulfillment.signals  # pylint: disable=unused-variable
+        from ecommerce.extensions.fulfillment.api import get_fulfillment_module_registry
+
+        # Import the fulfillment modules once, rather than on every fulfillment.
+        get_fulfillment_module_registry()
@@ -7,6 +7,9 @@ import abc
 import datetime
 import json
 import logging
+from multiprocessing.pool import ThreadPool
+import threading
+import time
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
@@ -32,15 +35,49 @@ Range = get_model('offer', 'Range')
 Voucher = get_model('voucher', 'Voucher')
 logger = logging.getLogger(__name__)
 
+# Sessions used to call the Enrollment API, by the Enrollment API URL of each site configuration.
+_enrollment_api_sessions = {}
+_enrollment_api_sessions_lock = threading.Lock()
+
+
+def get_enrollment_api_session(enrollment_api_url):
+    """
+    Returns the requests Session used to call an Enrollment API.
+
+    Sessions are shared by every thread of the process, so that their connections are kept alive
+    between orders. A session holds up to ENROLLMENT_FULFILLMENT_MAX_WORKERS connections.
+
+    Args:
+        enrollment_api_url (str): URL of the Enrollment API of a site configuration.
+
+    Returns:
+        Session
+    """
+    with _enrollment_api_sessions_lock:
+        session = _enrollment_api_sessions.get(enrollment_api_url)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=settings.ENROLLMENT_FULFILLMENT_MAX_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _enrollment_api_sessions[enrollment_api_url] = session
+    return session
+
 
 class BaseFulfillmentModule(object):  # pragma: no cover
     """
     Base FulfillmentModule class for containing Product specific fulfillment logic.
 
     All modules should extend the FulfillmentModule and adhere to the defined contract.
+
+    Modules listing the names of the product classes they fulfill in product_class_names are handed
+    the lines of those product classes directly. Other modules are asked which lines they support
+    through get_supported_lines().
     """
     __metaclass__ = abc.ABCMeta
 
+    product_class_names = ()
+
     @abc.abstractmethod
     def supports_line(self, line):
         """
@@ -105,10 +142,9 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
 
     Allows the enrollment of a student via purchase of a 'seat'.
     """
+    product_class_names = ('Seat',)
 
-    def _post_to_enrollment_api(self, data, user):
-        enrollment_api_url = get_lms_enrollment_api_url()
-        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+    def _get_enrollment_api_headers(self, user):
         headers = {
             'Content-Type': 'application/json',
             'X-Edx-Api-Key': settings.EDX_API_KEY
@@ -122,10 +158,70 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
         if ip:
             headers['X-Forwarded-For'] = ip
 
-        return requests.post(enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout)
+        return headers
+
+    def _post_to_enrollment_api(self, data, user):
+        return self._send_to_enrollment_api(
+            get_lms_enrollment_api_url(), data, self._get_enrollment_api_headers(user)
+        )
+
+    def _send_to_enrollment_api(self, enrollment_api_url, data, headers):
+        """ POST data to the Enrollment API, retrying network errors, time outs and server errors with backoff.
+
+        This only makes HTTP requests, without touching the database or the current request, so that it
+        can be called from the threads fulfilling the lines of an order.
+
+        Returns:
+            The response to the last attempt.
+
+        Raises:
+            ConnectionError or Timeout, if the last attempt fails with one.
+        """
+        session = get_enrollment_api_session(enrollment_api_url)
+        for attempt in range(settings.ENROLLMENT_FULFILLMENT_RETRIES + 1):
+            if attempt:
+                time.sleep(settings.ENROLLMENT_FULFILLMENT_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+            is_last_attempt = attempt == settings.ENROLLMENT_FULFILLMENT_RETRIES
+            try:
+                response = session.post(
+                    enrollment_api_url,
+                    data=json.dumps(data),
+                    headers=headers,
+                    timeout=settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+                )
+            except (ConnectionError, Timeout):
+                if is_last_attempt:
+                    raise
+                continue
+
+            if response.status_code < 500 or is_last_attempt:
+                return response
+
+    def _send_all_to_enrollment_api(self, enrollment_api_url, requests_data):
+        """ POST each (data, headers) pair to the Enrollment API, up to ENROLLMENT_FULFILLMENT_MAX_WORKERS at a time.
+
+        Returns:
+            A list with a (response, exception) pair for each request, in the order of requests_data.
+        """
+        def send(request_data):
+            try:
+                return self._send_to_enrollment_api(enrollment_api_url, *request_data), None
+            except (ConnectionError, Timeout) as exception:
+                return None, exception
+
+        if len(requests_data) <= 1:
+            return [send(request_data) for request_data in requests_data]
+
+        pool = ThreadPool(min(len(requests_data), settings.ENROLLMENT_FULFILLMENT_MAX_WORKERS))
+        try:
+            return pool.map(send, requests_data)
+        finally:
+            pool.close()
+            pool.join()
 
     def supports_line(self, line):
-        return line.product.get_product_class().name == 'Seat'
+        return line.product.get_product_class().name in self.product_class_names
 
     def get_supported_lines(self, lines):
         """ Return a list of lines that can be fulfilled through enrollment.
@@ -171,6 +267,7 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
 
             return order, lines
 
+        enrollments = []
         for line in lines:
             try:
                 mode = mode_for_seat(line.product)
@@ -208,44 +305,55 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
                         'value': provider
                     }
                 )
-            try:
-                response = self._post_to_enrollment_api(data, user=order.user)
-
-                if response.status_code == status.HTTP_200_OK:
-                    line.set_status(LINE.COMPLETE)
-
-                    audit_log(
-                        'line_fulfilled',
-                        order_line_id=line.id,
-                        order_number=order.number,
-                        product_class=line.product.get_product_class().name,
-                        course_id=course_key,
-                        mode=mode,
-                        user_id=order.user.id,
-                        credit_provider=provider,
-                    )
-                else:
-                    try:
-                        data = response.json()
-                        reason = data.get('message')
-                    except Exception:  # pylint: disable=broad-except
-                        reason = '(No detail provided.)'
-
-                    logger.error(
-                        "Fulfillment of line [%d] on order [%s] failed with status code [%d]: %s",
-                        line.id, order.number, response.status_code, reason
-                    )
-                    line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
-            except ConnectionError:
+            enrollments.append((line, data, mode, course_key, provider))
+
+        if not enrollments:
+            logger.info("Finished fulfilling 'Seat' product types for order [%s]", order.number)
+            return order, lines
+
+        # The enrollment requests are sent concurrently. Line statuses and audit logs are only
+        # written afterwards, from this thread, since the database connection is not shared with the pool.
+        headers = self._get_enrollment_api_headers(order.user)
+        results = self._send_all_to_enrollment_api(
+            get_lms_enrollment_api_url(), [(data, headers) for __, data, __, __, __ in enrollments]
+        )
+
+        for (line, __, mode, course_key, provider), (response, exception) in zip(enrollments, results):
+            if isinstance(exception, ConnectionError):
                 logger.error(
                     "Unable to fulfill line [%d] of order [%s] due to a network problem", line.id, order.number
                 )
                 line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
-            except Timeout:
+            elif isinstance(exception, Timeout):
                 logger.error(
                     "Unable to fulfill line [%d] of order [%s] due to a request time out", line.id, order.number
                 )
                 line.set_status(LINE.FULFILLMENT_TIMEOUT_ERROR)
+            elif response.status_code == status.HTTP_200_OK:
+                line.set_status(LINE.COMPLETE)
+
+                audit_log(
+                    'line_fulfilled',
+                    order_line_id=line.id,
+                    order_number=order.number,
+                    product_class=line.product.get_product_class().name,
+                    course_id=course_key,
+                    mode=mode,
+                    user_id=order.user.id,
+                    credit_provider=provider,
+                )
+            else:
+                try:
+                    data = response.json()
+                    reason = data.get('message')
+                except Exception:  # pylint: disable=broad-except
+                    reason = '(No detail provided.)'
+
+                logger.error(
+                    "Fulfillment of line [%d] on order [%s] failed with status code [%d]: %s",
+                    line.id, order.number, response.status_code, reason
+                )
+                line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
         logger.info("Finished fulfilling 'Seat' product types for order [%s]", order.number)
         return order, lines
 
@@ -297,6 +405,7 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
 
 class CouponFulfillmentModule(BaseFulfillmentModule):
     """ Fulfillment Module for coupons. """
+    product_class_names = ('Coupon',)
 
     def supports_line(self, line):
         """
@@ -309,7 +418,7 @@ class CouponFulfillmentModule(BaseFulfillmentModule):
             True if the line contains product of product class Coupon.
             False otherwise.
         """
-        return line.product.get_product_class().name == 'Coupon'
+        return line.product.get_product_class().name in self.product_class_names
 
     def get_supported_lines(self, lines):
         """ Return a list of lines containing products with Coupon product class
@@ -353,6 +462,7 @@ class CouponFulfillmentModule(BaseFulfillmentModule):
 
 
 class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
+    product_class_names = (ENROLLMENT_CODE_PRODUCT_CLASS_NAME,)
 
     def supports_line(self, line):
         """
@@ -365,7 +475,7 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
             True if the line contains an Enrollment code.
             False otherwise.
         """
-        return line.product.get_product_class().name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME
+        return line.product.get_product_class().name in self.product_class_names
 
     def get_supported_lines(self, lines):
         """ Return a list of lines containing Enrollment code products that can be fulfilled.
@@ -396,20 +506,15 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
         logger.info(msg)
 
         for line in lines:
-            name = 'Enrollment Code Range for {}'.format(line.product.attr.course_key)
-            seat = Product.objects.filter(
-                attributes__name='course_key',
-                attribute_values__value_text=line.product.attr.course_key
-            ).get(
-                attributes__name='certificate_type',
-                attribute_values__value_text=line.product.attr.seat_type
-            )
+            enrollment_code = line.product
+            seat = self._get_seat(enrollment_code)
+            name = 'Enrollment Code Range for {}'.format(enrollment_code.attr.course_key)
             _range, created = Range.objects.get_or_create(name=name)
             if created:
                 _range.add_product(seat)
 
             vouchers = create_vouchers(
-                name='Enrollment code voucher [{}]'.format(line.product.title),
+                name='Enrollment code voucher [{}]'.format(enrollment_code.title),
                 benefit_type=Benefit.PERCENTAGE,
                 benefit_value=100,
                 catalog=None,
@@ -422,8 +527,10 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
             )
 
             line_vouchers = OrderLineVouchers.objects.create(line=line)
-            for voucher in vouchers:
-                line_vouchers.vouchers.add(voucher)
+            OrderLineVouchersVouchers = OrderLineVouchers.vouchers.through
+            OrderLineVouchersVouchers.objects.bulk_create([
+                OrderLineVouchersVouchers(orderlinevouchers=line_vouchers, voucher=voucher) for voucher in vouchers
+            ])
 
             line.set_status(LINE.COMPLETE)
 
@@ -431,6 +538,30 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
         logger.info("Finished fulfilling 'Enrollment code' product types for order [%s]", order.number)
         return order, lines
 
+    def _get_seat(self, enrollment_code):
+        """ Returns the seat an enrollment code enrolls in.
+
+        Enrollment codes created before they had an id_verification_required attribute use the requirement of
+        their seat type. Seats missing from the seat index and projections are matched by their attributes.
+        """
+        seat_type = enrollment_code.attr.seat_type
+        id_verification_required = getattr(
+            enrollment_code.attr, 'id_verification_required', Course.is_mode_verified(seat_type)
+        )
+        if enrollment_code.course:
+            try:
+                return enrollment_code.course.get_seat(seat_type, id_verification_required)
+            except Product.DoesNotExist:
+                pass
+
+        return Product.objects.filter(
+            attributes__name='course_key',
+            attribute_values__value_text=enrollment_code.attr.course_key
+        ).get(
+            attributes__name='certificate_type',
+            attribute_values__value_text=seat_type
+        )
+
     def revoke_line(self, line):
         """ Revokes the specified line.
 
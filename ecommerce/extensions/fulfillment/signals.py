@@ -1,6 +1,9 @@
+from django.core.signals import setting_changed
 from django.dispatch import receiver
 from oscar.core.loading import get_class, get_model
 
+from ecommerce.extensions.fulfillment.api import reset_fulfillment_module_registry
+
 ShippingEventType = get_model('order', 'ShippingEventType')
 EventHandler = get_class('order.processing', 'EventHandler')
 post_checkout = get_class('checkout.signals', 'post_checkout')
@@ -14,3 +17,9 @@ def post_checkout_callback(sender, order=None, **kwargs):  # pylint: disable=unu
 
     shipping_event, __ = ShippingEventType.objects.get_or_create(name=SHIPPING_EVENT_NAME)
     EventHandler().handle_shipping_event(order, shipping_event, order_lines, line_quantities)
+
+
+@receiver(setting_changed, dispatch_uid='fulfillment.reset_fulfillment_module_registry')
+def reset_fulfillment_modules(setting, **kwargs):  # pylint: disable=unused-argument
+    if setting == 'FULFILLMENT_MODULES':
+        reset_fulfillment_module_registry()
@@ -0,0 +1,113 @@
+"""Asynchronous tasks for fulfillment."""
+from collections import OrderedDict
+import datetime
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils.timezone import now
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.core.task_utils import site_request
+from ecommerce.extensions.fulfillment.api import RETRYABLE_LINE_STATUSES
+from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
+
+logger = logging.getLogger(__name__)
+
+EventHandler = get_class('order.processing', 'EventHandler')
+FulfillmentRetry = get_model('order', 'FulfillmentRetry')
+ShippingEventType = get_model('order', 'ShippingEventType')
+
+RETRY_FULFILLMENTS_LOCK_CACHE_KEY = 'retry_fulfillments_lock'
+# Time added to the lock timeout of a run, for the time spent outside of Enrollment API calls.
+RETRY_FULFILLMENTS_LOCK_MARGIN = 60 * 5  # Value is in seconds.
+
+
+def get_retry_fulfillments_lock_timeout():
+    """
+    Returns the number of seconds after which a run holding the lock is assumed to have died.
+
+    Lines of a batch are retried one after the other, and each Enrollment API call is attempted up to
+    ENROLLMENT_FULFILLMENT_RETRIES + 1 times, so the lock outlasts a batch whose calls all time out.
+    """
+    attempts = settings.ENROLLMENT_FULFILLMENT_RETRIES + 1
+    line_timeout = attempts * settings.ENROLLMENT_FULFILLMENT_TIMEOUT + sum(
+        settings.ENROLLMENT_FULFILLMENT_RETRY_BACKOFF * 2 ** attempt for attempt in range(attempts - 1)
+    )
+    return int(settings.FULFILLMENT_RETRY_BATCH_SIZE * line_timeout) + RETRY_FULFILLMENTS_LOCK_MARGIN
+
+
+def _retry_order_fulfillment(order, lines):
+    """
+    Fulfill again the given lines of an order, as the post_checkout receiver does, without its other
+    post_checkout side effects.
+
+    Only lines still failing with a transient error are fulfilled again, so that lines which have been
+    fulfilled since, e.g. enrollment codes, are not fulfilled twice.
+    """
+    if not order.is_fulfillable:
+        # The order has been fulfilled some other way since its retries were scheduled.
+        FulfillmentRetry.objects.filter(line__order=order).delete()
+        return
+
+    if order.site is None:
+        logger.error('Unable to retry the fulfillment of order [%s], which has no site.', order.number)
+        FulfillmentRetry.objects.filter(line__order=order).delete()
+        return
+
+    retryable_lines = [line for line in lines if line.status in RETRYABLE_LINE_STATUSES]
+    FulfillmentRetry.objects.filter(line__in=[line for line in lines if line not in retryable_lines]).delete()
+    if not retryable_lines:
+        return
+
+    # LMS URLs are built from the site of the current request.
+    with site_request(order.site):
+        line_quantities = [line.quantity for line in retryable_lines]
+        shipping_event, __ = ShippingEventType.objects.get_or_create(name=SHIPPING_EVENT_NAME)
+        EventHandler().handle_shipping_event(order, shipping_event, retryable_lines, line_quantities)
+
+
+@shared_task
+def retry_fulfillments():
+    """
+    Fulfill again the orders of up to FULFILLMENT_RETRY_BATCH_SIZE lines whose retry is due.
+
+    Runs never overlap, so that no more than a batch of lines is retried at once while the LMS recovers.
+    Lines failing again are rescheduled, with a longer delay, by the fulfillment API.
+    """
+    if not cache.add(RETRY_FULFILLMENTS_LOCK_CACHE_KEY, True, get_retry_fulfillments_lock_timeout()):
+        logger.info('Skipping fulfillment retries, since a previous run is still in progress.')
+        return
+
+    try:
+        # Retries are only left due at this point if retrying them raised an unexpected error.
+        FulfillmentRetry.objects.filter(attempts__gte=settings.FULFILLMENT_RETRY_MAX_ATTEMPTS).delete()
+
+        retries = list(
+            FulfillmentRetry.objects.filter(next_attempt__lte=now()).select_related(
+                'line__order__site__siteconfiguration'
+            ).order_by('next_attempt')[:settings.FULFILLMENT_RETRY_BATCH_SIZE]
+        )
+        if not retries:
+            return
+
+        # The fulfillment API reschedules the lines which fail again. Lines which cannot be fulfilled again
+        # because of an unexpected error are retried after the longest delay.
+        FulfillmentRetry.objects.filter(id__in=[retry.id for retry in retries]).update(
+            attempts=F('attempts') + 1,
+            next_attempt=now() + datetime.timedelta(seconds=settings.FULFILLMENT_RETRY_MAX_BACKOFF)
+        )
+
+        order_lines = OrderedDict()
+        for retry in retries:
+            order_lines.setdefault(retry.line.order, []).append(retry.line)
+        logger.info('Retrying the fulfillment of [%d] lines of [%d] orders.', len(retries), len(order_lines))
+        for order, lines in order_lines.items():
+            try:
+                _retry_order_fulfillment(order, lines)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Failed to retry the fulfillment of order [%s].', order.number)
+    finally:
+        cache.delete(RETRY_FULFILLMENTS_LOCK_CACHE_KEY)
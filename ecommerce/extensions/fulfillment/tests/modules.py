@@ -61,3 +61,12 @@ class RevocationFailureModule(MockFulfillmentModule):
     def revoke_line(self, line):
         """ Returns False to simulate a revocation failure."""
         return False
+
+
+class NetworkErrorFulfillmentModule(FakeFulfillmentModule):
+    """ This module supports all Lines, but fails to fulfill them with a network error. """
+
+    def fulfill_product(self, order, lines):
+        """ Mark all lines with a network error. """
+        for line in lines:
+            line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
@@ -1,13 +1,17 @@
 """Tests for the Fulfillment API"""
+import copy
+
 import ddt
 from django.test.utils import override_settings
+from django.utils.timezone import now
+from oscar.core.loading import get_model
 from mock import patch
 from nose.tools import raises
 from testfixtures import LogCapture
 
 from ecommerce.extensions.fulfillment import api, exceptions
 from ecommerce.extensions.fulfillment.api import get_fulfillment_modules, get_fulfillment_modules_for_line, \
-    revoke_fulfillment_for_refund
+    get_fulfillment_module_registry, revoke_fulfillment_for_refund, LINE_PRODUCT_CLASS_RELATIONS
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
 from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
 from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule
@@ -15,6 +19,8 @@ from ecommerce.extensions.refund.status import REFUND, REFUND_LINE
 from ecommerce.extensions.refund.tests.factories import RefundFactory
 from ecommerce.tests.testcases import TestCase
 
+FulfillmentRetry = get_model('order', 'FulfillmentRetry')
+
 
 @ddt.ddt
 class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
@@ -91,6 +97,84 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         actual = get_fulfillment_modules_for_line(line)
         self.assertEqual(actual, [FakeFulfillmentModule])
 
+    def test_fulfill_order_schedules_retries(self):
+        """
+        Verify lines failing with a transient error are scheduled for retry, until they are fulfilled.
+        """
+        network_error_module = 'ecommerce.extensions.fulfillment.tests.modules.NetworkErrorFulfillmentModule'
+        with override_settings(FULFILLMENT_MODULES=[network_error_module]):
+            api.fulfill_order(self.order, self.order.lines)
+
+        self.assertEqual(self.order.status, ORDER.FULFILLMENT_ERROR)
+        retry = FulfillmentRetry.objects.get(line=self.order.lines.get())
+        self.assertEqual(retry.attempts, 0)
+        self.assertGreater(retry.next_attempt, now())
+
+        fake_module = 'ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'
+        with override_settings(FULFILLMENT_MODULES=[fake_module]):
+            api.fulfill_order(self.order, self.order.lines)
+
+        self.assert_order_fulfilled(self.order)
+        self.assertFalse(FulfillmentRetry.objects.exists())
+
+    @override_settings(
+        FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.NetworkErrorFulfillmentModule'],
+        FULFILLMENT_RETRY_MAX_ATTEMPTS=3
+    )
+    def test_fulfill_order_gives_up_retries(self):
+        """
+        Verify lines are no longer retried once they have been retried FULFILLMENT_RETRY_MAX_ATTEMPTS times.
+        """
+        FulfillmentRetry.objects.create(line=self.order.lines.get(), attempts=3, next_attempt=now())
+        with patch('ecommerce.extensions.fulfillment.api.logger.error') as mock_logger:
+            api.fulfill_order(self.order, self.order.lines)
+            mock_logger.assert_any_call(
+                'Giving up on fulfilling line [%d] of order [%s] after [%d] retries.',
+                self.order.lines.get().id, self.order.number, 3
+            )
+
+        self.assertEqual(self.order.status, ORDER.FULFILLMENT_ERROR)
+        self.assertFalse(FulfillmentRetry.objects.exists())
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+    def test_fulfillment_module_registry_rebuilt(self):
+        """
+        Verify the registry is built once, and rebuilt when the configured modules change.
+        """
+        registry = get_fulfillment_module_registry()
+        self.assertIs(get_fulfillment_module_registry(), registry)
+        self.assertEqual([type(module) for module in registry.modules], [FakeFulfillmentModule])
+
+        with override_settings(FULFILLMENT_MODULES=[]):
+            self.assertEqual(get_fulfillment_module_registry().modules, [])
+
+    @override_settings(FULFILLMENT_MODULES=[
+        'ecommerce.extensions.fulfillment.modules.EnrollmentFulfillmentModule',
+        'ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule',
+    ])
+    @ddt.data(1, 10, 500)
+    def test_group_lines_query_count(self, num_lines):
+        """
+        Verify grouping the lines of an order by fulfillment module makes a single query, whatever the line count.
+        """
+        line = self.order.lines.get()
+        clones = []
+        for __ in range(num_lines - 1):
+            clone = copy.copy(line)
+            clone.id = None
+            clones.append(clone)
+        line.__class__.objects.bulk_create(clones)
+
+        registry = get_fulfillment_module_registry()
+        with self.assertNumQueries(1):
+            grouped_lines, remaining_lines = registry.group_lines(
+                self.order.lines.select_related(*LINE_PRODUCT_CLASS_RELATIONS)
+            )
+
+        self.assertEqual([(type(module), len(lines)) for module, lines in grouped_lines],
+                         [(FakeFulfillmentModule, num_lines)])
+        self.assertEqual(remaining_lines, [])
+
     @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
     def test_revoke_fulfillment_for_refund(self):
         """
@@ -5,7 +5,10 @@ import json
 import ddt
 import httpretty
 import mock
+from django.core.cache import cache
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_class, get_model
 from oscar.test import factories
 from oscar.test.newfactories import UserFactory, BasketFactory
@@ -37,7 +40,9 @@ Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
 Product = get_model('catalogue', 'Product')
 ProductAttribute = get_model('catalogue', 'ProductAttribute')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 ProductClass = get_model('catalogue', 'ProductClass')
+SeatProjection = get_model('catalogue', 'SeatProjection')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
@@ -156,18 +161,47 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=ConnectionError))
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=ConnectionError))
     def test_enrollment_module_network_error(self):
         """Test that lines receive a network error status if a fulfillment request experiences a network error."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_NETWORK_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=Timeout))
+    @mock.patch('requests.Session.post', mock.Mock(side_effect=Timeout))
     def test_enrollment_module_request_timeout(self):
         """Test that lines receive a timeout error status if a fulfillment request times out."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_TIMEOUT_ERROR, self.order.lines.all()[0].status)
 
+    @httpretty.activate
+    def test_enrollment_module_retries_server_error(self):
+        """Test that fulfillment requests failing with a server-side error are retried."""
+        httpretty.register_uri(httpretty.POST, get_lms_enrollment_api_url(), responses=[
+            httpretty.Response(body='{}', status=503, content_type=JSON),
+            httpretty.Response(body='{}', status=200, content_type=JSON),
+        ])
+        EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
+        self.assertEqual(LINE.COMPLETE, self.order.lines.all()[0].status)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
+    @httpretty.activate
+    def test_enrollment_module_fulfill_multiple_lines(self):
+        """Test that all lines of an order are fulfilled when their enrollment requests are sent concurrently."""
+        httpretty.register_uri(httpretty.POST, get_lms_enrollment_api_url(), status=200, body='{}', content_type=JSON)
+        basket = BasketFactory(owner=self.user)
+        for certificate_type in ('honor', 'verified', 'professional'):
+            basket.add_product(self.course.create_or_update_seat(certificate_type, False, 100, self.partner), 1)
+        order = factories.create_order(number=3, basket=basket, user=self.user)
+
+        with self.settings(ENROLLMENT_FULFILLMENT_MAX_WORKERS=2):
+            EnrollmentFulfillmentModule().fulfill_product(order, list(order.lines.all()))
+
+        self.assertEqual([line.status for line in order.lines.all()], [LINE.COMPLETE] * 3)
+        self.assertEqual(
+            sorted(json.loads(request.body)['mode'] for request in httpretty.httpretty.latest_requests),
+            ['honor', 'no-id-professional', 'verified']
+        )
+
     @httpretty.activate
     @ddt.data(None, '{"message": "Oops!"}')
     def test_enrollment_module_server_error(self, body):
@@ -478,6 +512,46 @@ class EnrollmentCodeFulfillmentModuleTests(CourseCatalogTestMixin, TestCase):
         self.assertEqual(OrderLineVouchers.objects.count(), 1)
         self.assertEqual(OrderLineVouchers.objects.first().vouchers.count(), self.QUANTITY)
 
+    def test_fulfill_product_without_id_verification_required(self):
+        """ Verify enrollment codes created before they had an id_verification_required value are fulfilled. """
+        ProductAttributeValue.objects.filter(
+            product__product_class__name=ENROLLMENT_CODE_PRODUCT_CLASS_NAME,
+            attribute__code='id_verification_required'
+        ).delete()
+
+        __, completed_lines = EnrollmentCodeFulfillmentModule().fulfill_product(self.order, self.order.lines.all())
+        self.assertEqual(completed_lines[0].status, LINE.COMPLETE)
+
+    def test_fulfill_product_without_seat_projection(self):
+        """ Verify enrollment codes are fulfilled when their seat is missing from the seat index and projections. """
+        SeatProjection.objects.all().delete()
+        cache.clear()
+
+        __, completed_lines = EnrollmentCodeFulfillmentModule().fulfill_product(self.order, self.order.lines.all())
+        self.assertEqual(completed_lines[0].status, LINE.COMPLETE)
+
+    def test_fulfill_product_query_count(self):
+        """ Verify the number of queries run to fulfill a line does not depend on its quantity. """
+        # Create the enrollment code range, which is shared by subsequent orders.
+        EnrollmentCodeFulfillmentModule().fulfill_product(self.order, self.order.lines.all())
+        enrollment_code = Product.objects.get(product_class__name=ENROLLMENT_CODE_PRODUCT_CLASS_NAME)
+
+        query_counts = []
+        for quantity in (1, 50):
+            basket = BasketFactory()
+            basket.add_product(enrollment_code, quantity)
+            order = factories.create_order(basket=basket, user=UserFactory())
+            lines = list(order.lines.all())
+
+            with CaptureQueriesContext(connection) as context:
+                __, completed_lines = EnrollmentCodeFulfillmentModule().fulfill_product(order, lines)
+            query_counts.append(len(context))
+
+            self.assertEqual(completed_lines[0].status, LINE.COMPLETE)
+            self.assertEqual(OrderLineVouchers.objects.get(line=lines[0]).vouchers.count(), quantity)
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
     def test_fulfill_product_with_lms_receipt_page(self):
         """Test disabling otto_receipt_page switch still results in successfully fulfilling Enrollment code product."""
         self.site.siteconfiguration.enable_otto_receipt_page = False
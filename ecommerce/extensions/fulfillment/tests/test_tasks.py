@@ -0,0 +1,93 @@
+"""Tests of the fulfillment's asynchronous tasks."""
+import datetime
+
+import mock
+from django.core.cache import cache
+from django.test.utils import override_settings
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.fulfillment.status import ORDER, LINE
+from ecommerce.extensions.fulfillment.tasks import (
+    RETRY_FULFILLMENTS_LOCK_CACHE_KEY, RETRY_FULFILLMENTS_LOCK_MARGIN, get_retry_fulfillments_lock_timeout,
+    retry_fulfillments
+)
+from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule
+from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
+from ecommerce.tests.testcases import TestCase
+
+FulfillmentRetry = get_model('order', 'FulfillmentRetry')
+
+
+@override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+class RetryFulfillmentsTests(FulfillmentTestMixin, TestCase):
+    """ Tests for the retry_fulfillments task. """
+
+    def create_failed_order(self, next_attempt):
+        """ Returns an order whose line failed with a network error, and is retried at next_attempt. """
+        order = self.generate_open_order()
+        order.site = self.site
+        order.set_status(ORDER.FULFILLMENT_ERROR)
+        line = order.lines.get()
+        line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
+        FulfillmentRetry.objects.create(line=line, next_attempt=next_attempt)
+        return order
+
+    def test_retry_due_lines(self):
+        """ Verify the orders of due lines are fulfilled again, and their retries deleted. """
+        due_order = self.create_failed_order(now() - datetime.timedelta(minutes=1))
+        later_order = self.create_failed_order(now() + datetime.timedelta(hours=1))
+
+        retry_fulfillments()
+
+        due_order.refresh_from_db()
+        self.assert_order_fulfilled(due_order)
+        self.assertEqual(
+            list(FulfillmentRetry.objects.values_list('line__order', flat=True)), [later_order.id]
+        )
+
+    @override_settings(FULFILLMENT_RETRY_BATCH_SIZE=1)
+    def test_retry_batch_size(self):
+        """ Verify no more than FULFILLMENT_RETRY_BATCH_SIZE lines are retried per run. """
+        first_order = self.create_failed_order(now() - datetime.timedelta(minutes=2))
+        second_order = self.create_failed_order(now() - datetime.timedelta(minutes=1))
+
+        retry_fulfillments()
+
+        first_order.refresh_from_db()
+        second_order.refresh_from_db()
+        self.assertEqual(first_order.status, ORDER.COMPLETE)
+        self.assertEqual(second_order.status, ORDER.FULFILLMENT_ERROR)
+
+    def test_retry_skipped_while_locked(self):
+        """ Verify runs do not overlap. """
+        order = self.create_failed_order(now() - datetime.timedelta(minutes=1))
+        cache.set(RETRY_FULFILLMENTS_LOCK_CACHE_KEY, True)
+
+        retry_fulfillments()
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, ORDER.FULFILLMENT_ERROR)
+        self.assertTrue(FulfillmentRetry.objects.exists())
+
+    def test_retry_skips_fulfilled_lines(self):
+        """ Verify lines fulfilled since their retry was scheduled are not fulfilled again. """
+        order = self.create_failed_order(now() - datetime.timedelta(minutes=1))
+        order.lines.get().set_status(LINE.COMPLETE)
+
+        with mock.patch.object(FakeFulfillmentModule, 'fulfill_product') as mock_fulfill_product:
+            retry_fulfillments()
+
+        self.assertFalse(mock_fulfill_product.called)
+        self.assertFalse(FulfillmentRetry.objects.exists())
+
+    @override_settings(
+        ENROLLMENT_FULFILLMENT_RETRIES=2,
+        ENROLLMENT_FULFILLMENT_RETRY_BACKOFF=0.5,
+        ENROLLMENT_FULFILLMENT_TIMEOUT=7,
+        FULFILLMENT_RETRY_BATCH_SIZE=50
+    )
+    def test_lock_timeout(self):
+        """ Verify the lock outlasts a batch of lines whose Enrollment API calls all time out. """
+        # Each line is attempted 3 times, for up to 7 seconds, waiting 0.5 and 1 second in between.
+        self.assertEqual(get_retry_fulfillments_lock_timeout(), 50 * 22 + 25 + RETRY_FULFILLMENTS_LOCK_MARGIN)
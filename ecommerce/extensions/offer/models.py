@@ -1,19 +1,88 @@
 # noinspection PyUnresolvedReferences
+from collections import namedtuple
+import functools
 import hashlib
+import itertools
 import logging
 import re
+import uuid
 
 from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import ugettext_lazy as _
 from oscar.apps.offer.abstract_models import AbstractBenefit, AbstractConditionalOffer, AbstractRange
+from oscar.core.loading import get_model
 from threadlocals.threadlocals import get_current_request
 
+from ecommerce.core.commit_hooks import on_request_commit
+
 logger = logging.getLogger(__name__)
 VALID_BENEFIT_TYPES = [AbstractBenefit.PERCENTAGE, AbstractBenefit.FIXED]
 
+RANGE_MEMBERSHIP_VERSION_CACHE_KEY = 'range_membership_version_{range_id}'
+RANGE_MEMBERSHIP_CACHE_KEY = 'range_membership_{range_id}_{version}'
+
+# product_ids holds the IDs of the range's catalog products, and of its included products and their
+# children, less its excluded products. requires_fallback is set for ranges whose membership also
+# depends on product classes, categories, a proxy class, or which include all products.
+RangeMembershipIndex = namedtuple('RangeMembershipIndex', ['product_ids', 'requires_fallback'])
+
+EMAIL_DOMAIN_REGEX = re.compile(r'^[\w.-]*$')
+EMAIL_DOMAIN_MATCHER_CACHE_SIZE = 1000
+# Email domain matchers held in process memory, by the comma-separated domains they match.
+_email_domain_matchers = {}
+
+# Membership indexes held in process memory, by range ID, along with the version they were built for.
+_range_membership_indexes = {}
+
+
+def _delete_membership_versions(range_ids):
+    cache.delete_many([RANGE_MEMBERSHIP_VERSION_CACHE_KEY.format(range_id=range_id) for range_id in range_ids])
+
+
+def _match_email_domains(patterns, email):
+    for pattern in patterns:
+        match = pattern.match(email)
+        if match and match.group(0) == email:
+            return True
+    return False
+
+
+def get_email_domain_matcher(email_domains):
+    """
+    Return a function checking whether an email belongs to one of a list of email domains.
+
+    Domains made up of word characters, dots and dashes, which are all that can be entered, are matched
+    with a single precompiled alternation anchored to the end of the email. Each of these domains matches
+    a fixed number of characters, so an email fully matching it at all is also fully matched by the first
+    match re.match() finds, as is_email_valid() has always required. Other domains are matched one by one.
+    Matchers are cached by email_domains, since the offers of a coupon share the same domains.
+
+    Arguments:
+        email_domains (str): Comma-separated email domains, as stored on ConditionalOffer.
+
+    Returns:
+        function: Function returning True for emails belonging to one of the domains, False otherwise.
+    """
+    matcher = _email_domain_matchers.get(email_domains)
+    if matcher is None:
+        domains = email_domains.split(',')
+        if all(EMAIL_DOMAIN_REGEX.match(domain) for domain in domains):
+            patterns = [re.compile(r'.+@(?:\w+\.)*(?:{domains})\Z'.format(domains='|'.join(domains)))]
+        else:
+            patterns = [
+                re.compile(r'(?P<username>.+)@(?P<subdomain>\w+\.)*{domain}'.format(domain=domain))
+                for domain in domains
+            ]
+        matcher = functools.partial(_match_email_domains, patterns)
+
+        if len(_email_domain_matchers) >= EMAIL_DOMAIN_MATCHER_CACHE_SIZE:
+            _email_domain_matchers.clear()
+        _email_domain_matchers[email_domains] = matcher
+    return matcher
+
 
 class Benefit(AbstractBenefit):
     def save(self, *args, **kwargs):
@@ -74,12 +143,7 @@ class ConditionalOffer(AbstractConditionalOffer):
             False otherwise.
         """
         if self.email_domains:
-            for domain in self.email_domains.split(','):
-                pattern = r'(?P<username>.+)@(?P<subdomain>\w+\.)*{domain}'.format(domain=domain)
-                match = re.match(pattern, email)
-                if match and match.group(0) == email:
-                    return True
-            return False
+            return get_email_domain_matcher(self.email_domains)(email)
         return True
 
     def is_condition_satisfied(self, basket):
@@ -91,6 +155,22 @@ class ConditionalOffer(AbstractConditionalOffer):
             return False
         return super(ConditionalOffer, self).is_condition_satisfied(basket)  # pylint: disable=bad-super-call
 
+    def record_usage(self, discount):
+        """
+        Record the usage of the offer on a fresh copy, locked until the order's transaction ends.
+
+        Offers applied to baskets are read from the cache (see ecommerce.extensions.offer.utils.Applicator),
+        so their usage counters may be stale. Saving them would lose the usage recorded by other orders,
+        and let the offer be applied more than max_global_applications times.
+        """
+        with transaction.atomic():
+            offer = ConditionalOffer.objects.select_for_update().get(pk=self.pk)
+            super(ConditionalOffer, offer).record_usage(discount)  # pylint: disable=bad-super-call
+
+        for field in ('num_applications', 'total_discount', 'num_orders', 'status'):
+            setattr(self, field, getattr(offer, field))
+    record_usage.alters_data = True
+
 
 def validate_credit_seat_type(value):
     if len(value.split(',')) > 1 and 'credit' in value:
@@ -111,26 +191,98 @@ class Range(AbstractRange):
         null=True
     )
 
+    def _get_catalog_query_cache_key(self, course_id):
+        cache_key = 'catalog_query_contains [{}] [{}]'.format(self.catalog_query, course_id)
+        return hashlib.md5(cache_key).hexdigest()
+
     def run_catalog_query(self, product):
         """
         Retrieve the results from running the query contained in catalog_query field.
         """
-        cache_key = 'catalog_query_contains [{}] [{}]'.format(self.catalog_query, product.course_id)
-        cache_key = hashlib.md5(cache_key).hexdigest()
-        response = cache.get(cache_key)
-        if not response:  # pragma: no cover
-            request = get_current_request()
+        return self.run_catalog_query_for_products([product])[product.course_id]
+
+    def run_catalog_query_for_products(self, products, site=None):
+        """
+        Retrieve the results from running the query contained in catalog_query field for several products.
+
+        Course runs whose results are not cached are looked up with a single call to the Course Catalog
+        Service per CATALOG_QUERY_BATCH_SIZE course runs, and their results are cached one by one.
+
+        Arguments:
+            products (Iterable[Product]): Products whose course runs are looked up.
+            site (Site): Site whose Course Catalog Service is called. Defaults to the current request's site.
+
+        Returns:
+            dict: Results in the format returned by run_catalog_query(), keyed by course ID.
+        """
+        course_ids = {product.course_id for product in products if product.course_id}
+        responses, missed = self.run_catalog_query_for_course_ids(course_ids, site=site)
+        if missed:
+            self._record_catalog_query_miss(site or get_current_request().site)
+        return responses
+
+    def run_catalog_query_for_course_ids(self, course_ids, site=None):
+        """
+        Retrieve the results from running the query contained in catalog_query field for several course runs.
+
+        Arguments:
+            course_ids (Iterable[str]): IDs of the course runs looked up.
+            site (Site): Site whose Course Catalog Service is called. Defaults to the current request's site.
+
+        Returns:
+            tuple: Results in the format returned by run_catalog_query(), keyed by course ID, and
+                whether any of them was missing from the cache.
+        """
+        course_ids = set(course_ids)
+        cache_keys = {self._get_catalog_query_cache_key(course_id): course_id for course_id in course_ids}
+        responses = {cache_keys[cache_key]: response for cache_key, response in cache.get_many(cache_keys).items()}
+
+        missing_course_ids = sorted(course_ids - set(responses))
+        if missing_course_ids:  # pragma: no cover
             try:
-                response = request.site.siteconfiguration.course_catalog_api_client.course_runs.contains.get(
-                    query=self.catalog_query,
-                    course_run_ids=product.course_id,
-                    partner=request.site.siteconfiguration.partner.short_code
-                )
-                cache.set(cache_key, response, settings.COURSES_API_CACHE_TIMEOUT)
+                site = site or get_current_request().site
+                for start in range(0, len(missing_course_ids), settings.CATALOG_QUERY_BATCH_SIZE):
+                    batch = missing_course_ids[start:start + settings.CATALOG_QUERY_BATCH_SIZE]
+                    contained_course_runs = site.siteconfiguration.course_catalog_api_client.course_runs.contains.get(
+                        query=self.catalog_query,
+                        course_run_ids=','.join(batch),
+                        partner=site.siteconfiguration.partner.short_code
+                    )['course_runs']
+                    batch_responses = {
+                        course_id: {'course_runs': {course_id: contained_course_runs.get(course_id, False)}}
+                        for course_id in batch
+                    }
+                    cache.set_many(
+                        {self._get_catalog_query_cache_key(course_id): response
+                         for course_id, response in batch_responses.items()},
+                        settings.COURSES_API_CACHE_TIMEOUT
+                    )
+                    responses.update(batch_responses)
             except:  # pylint: disable=bare-except
                 raise Exception('Could not contact Course Catalog Service.')
 
-        return response
+        return responses, bool(missing_course_ids)
+
+    def _record_catalog_query_miss(self, site):
+        """
+        Count the cache misses of the range's catalog query, and warm its cache in the background
+        once the range misses it CATALOG_QUERY_WARM_THRESHOLD times within CATALOG_QUERY_WARM_WINDOW.
+        """
+        if not self.id:
+            return
+
+        counter_cache_key = 'catalog_query_misses_{}'.format(self.id)
+        cache.add(counter_cache_key, 0, settings.CATALOG_QUERY_WARM_WINDOW)
+        try:
+            misses = cache.incr(counter_cache_key)
+        except ValueError:
+            # The counter expired between being added and incremented.
+            return
+
+        if misses == settings.CATALOG_QUERY_WARM_THRESHOLD:
+            # noinspection PyUnresolvedReferences
+            from ecommerce.extensions.offer.tasks import warm_catalog_query_range  # pylint: disable=cyclic-import
+            warm_catalog_query_range.delay(self.id, site.id)
 
     def contains_product(self, product):
         """
@@ -143,11 +295,12 @@ class Range(AbstractRange):
                 # therefor an OR is used to check for both possibilities.
                 return ((response['course_runs'][product.course_id]) or
                         super(Range, self).contains_product(product))  # pylint: disable=bad-super-call
-        elif self.catalog:
-            return (
-                product.id in self.catalog.stock_records.values_list('product', flat=True) or
-                super(Range, self).contains_product(product)  # pylint: disable=bad-super-call
-            )
+        elif self.id:
+            membership_index = self.get_membership_index()
+            if product.id in membership_index.product_ids:
+                return True
+            if not membership_index.requires_fallback:
+                return False
         return super(Range, self).contains_product(product)  # pylint: disable=bad-super-call
 
     contains = contains_product
@@ -160,9 +313,79 @@ class Range(AbstractRange):
             # Backbone calls the Voucher Offers API endpoint which gets the products from the Course Catalog Service
             return []
         if self.catalog:
-            catalog_products = [record.product for record in self.catalog.stock_records.all()]
+            Product = get_model('catalogue', 'Product')
+            catalog_products = list(Product.objects.filter(stockrecords__catalogs=self.catalog))
             return catalog_products + list(super(Range, self).all_products())  # pylint: disable=bad-super-call
         return super(Range, self).all_products()  # pylint: disable=bad-super-call
 
+    def get_membership_index(self):
+        """
+        Return the membership index of the range, which lists the IDs of the products it contains.
+
+        Indexes are kept in process memory and in the shared cache, under a version stored in the shared
+        cache. Invalidating an index changes its version, so every process rebuilds it on its next use.
+
+        Returns:
+            RangeMembershipIndex
+        """
+        version_cache_key = RANGE_MEMBERSHIP_VERSION_CACHE_KEY.format(range_id=self.id)
+        version = cache.get(version_cache_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(version_cache_key, version, settings.RANGE_MEMBERSHIP_CACHE_TIMEOUT)
+
+        local_version, membership_index = _range_membership_indexes.get(self.id, (None, None))
+        if local_version == version:
+            return membership_index
+
+        cache_key = RANGE_MEMBERSHIP_CACHE_KEY.format(range_id=self.id, version=version)
+        membership_index = cache.get(cache_key)
+        if membership_index is None:
+            membership_index = self._build_membership_index()
+            cache.set(cache_key, membership_index, settings.RANGE_MEMBERSHIP_CACHE_TIMEOUT)
+
+        if len(_range_membership_indexes) >= settings.RANGE_MEMBERSHIP_LOCAL_CACHE_SIZE:
+            _range_membership_indexes.clear()
+        _range_membership_indexes[self.id] = (version, membership_index)
+        return membership_index
+
+    def _build_membership_index(self):
+        def get_product_and_child_ids(queryset):
+            return set(itertools.chain.from_iterable(queryset.values_list('pk', 'children__pk'))) - {None}
+
+        # Oscar only excludes the excluded products themselves, not their children.
+        product_ids = get_product_and_child_ids(self.included_products) - set(
+            self.excluded_products.values_list('pk', flat=True)
+        )
+        if self.catalog_id:
+            CatalogStockRecords = get_model('catalogue', 'Catalog').stock_records.through
+            product_ids.update(
+                CatalogStockRecords.objects.filter(catalog_id=self.catalog_id).values_list(
+                    'stockrecord__product_id', flat=True
+                )
+            )
+
+        requires_fallback = bool(
+            self.proxy_class or
+            self.includes_all_products or
+            self.classes.exists() or
+            self.included_categories.exists()
+        )
+        return RangeMembershipIndex(frozenset(product_ids), requires_fallback)
+
+    @classmethod
+    def invalidate_membership_indexes(cls, range_ids):
+        """
+        Invalidate the membership indexes of ranges, in every process.
+
+        Arguments:
+            range_ids (Iterable[int]): IDs of the ranges whose indexes are invalidated.
+        """
+        range_ids = frozenset(range_ids)
+        _delete_membership_versions(range_ids)
+        # Other processes may rebuild the indexes before the change is committed, so invalidate them again
+        # once it is.
+        on_request_commit(_delete_membership_versions, range_ids)
+
 
 from oscar.apps.offer.models import *  # noqa pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position,wrong-import-order,ungrouped-imports
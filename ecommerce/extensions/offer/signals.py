@@ -0,0 +1,91 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.offer.utils import invalidate_cached_site_offers
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Product = get_model('catalogue', 'Product')
+Range = get_model('offer', 'Range')
+RangeProduct = get_model('offer', 'RangeProduct')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+def _get_changed_m2m_ids(sender, instance, action, reverse, pk_set, field_name):
+    """
+    Return the IDs of the objects, on the side of a many-to-many relation holding field_name, which a change
+    of the relation affects. The IDs are only returned once per change, for the actions when they are known.
+    """
+    if not reverse:
+        return [instance.id] if action.startswith('post_') else []
+    elif action == 'pre_clear':
+        # The objects losing their relation to the instance are only known before the relation is cleared.
+        model_name = instance._meta.model_name  # pylint: disable=protected-access
+        return sender.objects.filter(**{model_name: instance}).values_list('{}_id'.format(field_name), flat=True)
+    elif action in ('post_add', 'post_remove'):
+        return pk_set
+    return []
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through, dispatch_uid='offer.invalidate_catalog_ranges')
+def invalidate_catalog_range_membership(sender, instance, action, reverse, pk_set, **_kwargs):
+    """ Invalidate the membership indexes of a catalog's ranges when its stock records change. """
+    catalog_ids = _get_changed_m2m_ids(sender, instance, action, reverse, pk_set, 'catalog')
+    if catalog_ids:
+        Range.invalidate_membership_indexes(
+            Range.objects.filter(catalog_id__in=catalog_ids).values_list('id', flat=True)
+        )
+
+
+@receiver(pre_delete, sender=StockRecord, dispatch_uid='offer.invalidate_stock_record_ranges')
+def invalidate_stock_record_range_membership(instance, **_kwargs):
+    """ Invalidate the membership indexes of ranges whose catalogs hold a stock record about to be deleted. """
+    Range.invalidate_membership_indexes(
+        Range.objects.filter(catalog__stock_records=instance).values_list('id', flat=True)
+    )
+
+
+@receiver(m2m_changed, sender=Range.excluded_products.through, dispatch_uid='offer.invalidate_excluded_products')
+@receiver(m2m_changed, sender=Range.classes.through, dispatch_uid='offer.invalidate_range_classes')
+@receiver(m2m_changed, sender=Range.included_categories.through, dispatch_uid='offer.invalidate_range_categories')
+def invalidate_range_relation_membership(sender, instance, action, reverse, pk_set, **_kwargs):
+    """ Invalidate the membership indexes of ranges when their excluded products, classes or categories change. """
+    range_ids = _get_changed_m2m_ids(sender, instance, action, reverse, pk_set, 'range')
+    if range_ids:
+        Range.invalidate_membership_indexes(range_ids)
+
+
+@receiver(post_save, sender=RangeProduct, dispatch_uid='offer.invalidate_range_product')
+@receiver(post_delete, sender=RangeProduct, dispatch_uid='offer.invalidate_deleted_range_product')
+def invalidate_range_product_membership(instance, **_kwargs):
+    """ Invalidate the membership index of a range when a product is added to, or removed from, it. """
+    Range.invalidate_membership_indexes([instance.range_id])
+
+
+@receiver(post_save, sender=Range, dispatch_uid='offer.invalidate_range')
+@receiver(post_delete, sender=Range, dispatch_uid='offer.invalidate_deleted_range')
+def invalidate_saved_range_membership(instance, **_kwargs):
+    """ Invalidate the membership index of a range when it is saved, since its catalog may have changed. """
+    Range.invalidate_membership_indexes([instance.id])
+
+
+@receiver(post_save, sender=Product, dispatch_uid='offer.invalidate_child_product_ranges')
+def invalidate_child_product_membership(instance, created, **_kwargs):
+    """ Invalidate the membership indexes of ranges including the parent of a new child product. """
+    if created and instance.parent_id:
+        Range.invalidate_membership_indexes(
+            RangeProduct.objects.filter(product_id=instance.parent_id).values_list('range_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=ConditionalOffer, dispatch_uid='offer.invalidate_site_offers')
+@receiver(post_delete, sender=ConditionalOffer, dispatch_uid='offer.invalidate_deleted_site_offers')
+@receiver(post_save, sender=Benefit, dispatch_uid='offer.invalidate_site_offer_benefits')
+@receiver(post_save, sender=Condition, dispatch_uid='offer.invalidate_site_offer_conditions')
+@receiver(post_save, sender=Range, dispatch_uid='offer.invalidate_site_offer_ranges')
+def invalidate_site_offers(**_kwargs):
+    """ Invalidate the cached site offers when an offer, or its benefit, condition or range, changes. """
+    invalidate_cached_site_offers()
@@ -0,0 +1,36 @@
+"""Asynchronous tasks for offers."""
+import logging
+
+from celery import shared_task
+from django.contrib.sites.models import Site
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.utils import get_seat_course_ids
+
+logger = logging.getLogger(__name__)
+
+Range = get_model('offer', 'Range')
+
+
+@shared_task
+def warm_catalog_query_range(range_id, site_id):
+    """
+    Cache the results of a range's catalog query for every course run with seats of the range's seat types.
+
+    Args:
+        range_id (int): ID of the Range whose catalog query is run.
+        site_id (int): ID of the Site whose Course Catalog Service is called.
+    """
+    offer_range = Range.objects.get(id=range_id)
+    if not (offer_range.catalog_query and offer_range.course_seat_types):
+        return
+
+    course_ids = get_seat_course_ids(offer_range.course_seat_types.split(','))
+
+    try:
+        offer_range.run_catalog_query_for_course_ids(course_ids, site=Site.objects.get(id=site_id))
+    except Exception:  # pylint: disable=broad-except
+        logger.exception(u'Failed to warm the catalog query cache of range [%d].', range_id)
+        return
+
+    logger.info(u'Warmed the catalog query cache of range [%d].', range_id)
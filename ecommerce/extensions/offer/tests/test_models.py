@@ -1,4 +1,6 @@
 import hashlib
+import random
+import re
 
 import httpretty
 import mock
@@ -8,14 +10,28 @@ from django.test import RequestFactory
 from oscar.core.loading import get_model
 from oscar.test import factories
 
+from ecommerce.core.commit_hooks import run_request_callbacks, start_request_callbacks
 from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
-from ecommerce.extensions.offer.models import validate_credit_seat_type
+from ecommerce.extensions.offer.models import (
+    RangeMembershipIndex, get_email_domain_matcher, validate_credit_seat_type
+)
 from ecommerce.tests.testcases import TestCase
 
 Catalog = get_model('catalogue', 'Catalog')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Range = get_model('offer', 'Range')
+
+
+def is_email_valid_reference(email_domains, email):
+    """ The original implementation of ConditionalOffer.is_email_valid(), compiling a pattern per domain. """
+    for domain in email_domains.split(','):
+        pattern = r'(?P<username>.+)@(?P<subdomain>\w+\.)*{domain}'.format(domain=domain)
+        match = re.match(pattern, email)
+        if match and match.group(0) == email:
+            return True
+    return False
 
 
 class RangeTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMixin, TestCase):
@@ -61,6 +77,88 @@ class RangeTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMixin, Te
         self.assertIn(self.product, self.range_with_catalog.all_products())
         self.assertEqual(len(self.range_with_catalog.all_products()), 1)
 
+    def test_range_contains_product_query_count(self):
+        """
+        contains_product(product) should not query the database once the range's membership index is built.
+        """
+        self.range_with_catalog.save()
+        self.range_with_catalog.contains_product(self.product)
+
+        not_in_range_product = factories.create_product()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.range_with_catalog.contains_product(self.product))
+            self.assertFalse(self.range_with_catalog.contains_product(not_in_range_product))
+
+    def test_range_membership_index_invalidation(self):
+        """
+        contains_product(product) should reflect changes to the range's products and catalog stock records.
+        """
+        self.range_with_catalog.save()
+        product = factories.create_product()
+        self.assertFalse(self.range_with_catalog.contains_product(product))
+
+        stock_record = factories.create_stockrecord(product)
+        self.catalog.stock_records.add(stock_record)
+        self.assertTrue(self.range_with_catalog.contains_product(product))
+
+        self.catalog.stock_records.remove(stock_record)
+        self.assertFalse(self.range_with_catalog.contains_product(product))
+
+        stock_record.catalogs.add(self.catalog)
+        self.assertTrue(self.range_with_catalog.contains_product(product))
+
+        stock_record.delete()
+        self.assertFalse(self.range_with_catalog.contains_product(product))
+
+        self.range.add_product(product)
+        self.assertTrue(self.range.contains_product(product))
+
+        self.range.excluded_products.add(product)
+        self.assertFalse(self.range.contains_product(product))
+
+        self.range.excluded_products.remove(product)
+        self.range.remove_product(product)
+        self.assertFalse(self.range.contains_product(product))
+
+    def test_range_membership_index_excluded_parent(self):
+        """
+        contains_product(product) should, like Oscar, only exclude the excluded products, not their children.
+        """
+        parent = factories.create_product(structure='parent')
+        child = factories.create_product(parent=parent)
+        self.range.add_product(parent)
+        self.range.excluded_products.add(parent)
+
+        self.assertFalse(self.range.contains_product(parent))
+        self.assertTrue(self.range.contains_product(child))
+
+    def test_range_membership_index_invalidated_after_commit(self):
+        """
+        Changes to a range made while handling a request should invalidate its membership index again once
+        the request's changes are committed.
+        """
+        start_request_callbacks()
+        product = factories.create_product()
+        self.range.add_product(product)
+
+        # Simulate another process rebuilding the index from the rows committed before the change.
+        stale_index = RangeMembershipIndex(frozenset([self.product.id]), False)
+        with mock.patch.object(Range, '_build_membership_index', return_value=stale_index):
+            self.assertFalse(self.range.contains_product(product))
+
+        run_request_callbacks()
+        self.assertTrue(self.range.contains_product(product))
+
+    def test_range_membership_index_fallback(self):
+        """
+        contains_product(product) should fall back to Oscar's checks for ranges including product classes.
+        """
+        product = factories.create_product()
+        self.assertFalse(self.range.contains_product(product))
+
+        self.range.classes.add(product.get_product_class())
+        self.assertTrue(self.range.contains_product(product))
+
     def test_large_query(self):
         """Verify the range can store large queries."""
         large_query = """
@@ -106,6 +204,45 @@ class RangeTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMixin, Te
             cached_response = cache.get(cache_key)
             self.assertEqual(response, cached_response)
 
+    @httpretty.activate
+    @mock_course_catalog_api_client
+    def test_run_catalog_query_for_products(self):
+        """
+        run_catalog_query_for_products() should look up all uncached course runs with a single call,
+        and cache the result of each course run.
+        """
+        course, seat = self.create_course_and_seat()
+        __, other_seat = self.create_course_and_seat()
+        self.mock_dynamic_catalog_contains_api(query='key:*', course_run_ids=[course.id])
+        self.range.catalog_query = 'key:*'
+
+        responses = self.range.run_catalog_query_for_products([seat, other_seat], site=self.site)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+        self.assertEqual(
+            httpretty.last_request().querystring['course_run_ids'],
+            [','.join(sorted([seat.course_id, other_seat.course_id]))]
+        )
+        self.assertTrue(responses[seat.course_id]['course_runs'][seat.course_id])
+        self.assertFalse(responses[other_seat.course_id]['course_runs'][other_seat.course_id])
+
+        self.assertEqual(self.range.run_catalog_query_for_products([seat, other_seat], site=self.site), responses)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    @httpretty.activate
+    @mock_course_catalog_api_client
+    def test_run_catalog_query_warms_hot_range(self):
+        """
+        run_catalog_query_for_products() should warm the cache of ranges missing it too often in the background.
+        """
+        course, seat = self.create_course_and_seat()
+        self.mock_dynamic_catalog_contains_api(query='key:*', course_run_ids=[course.id])
+        self.range.catalog_query = 'key:*'
+
+        with self.settings(CATALOG_QUERY_WARM_THRESHOLD=1):
+            with mock.patch('ecommerce.extensions.offer.tasks.warm_catalog_query_range.delay') as mock_delay:
+                self.range.run_catalog_query_for_products([seat], site=self.site)
+                mock_delay.assert_called_once_with(self.range.id, self.site.id)
+
     @httpretty.activate
     @mock_course_catalog_api_client
     def test_query_range_contains_product(self):
@@ -210,3 +347,34 @@ class ConditionalOfferTests(TestCase):
 
         valid_email_2 = 'test@sub2.{domain}'.format(domain=self.valid_domain)
         self.assertTrue(self.offer.is_email_valid(valid_email_2))
+
+    def test_email_domain_matcher_matches_reference(self):
+        """ Verify the email domain matcher agrees with the original implementation on generated domains and emails. """
+        generator = random.Random(0)
+
+        def generate(alphabet, max_length):
+            return ''.join(generator.choice(alphabet) for __ in range(generator.randint(0, max_length)))
+
+        for __ in range(5000):
+            domains = [generate('ab.-x', 4) for __ in range(generator.randint(1, 3))]
+            email_domains = ','.join(domains)
+            if generator.random() < 0.5:
+                email = '{username}@{subdomain}{domain}{suffix}'.format(
+                    username=generate('ab', 2),
+                    subdomain=generate('ab.', 3),
+                    domain=generator.choice(domains),
+                    suffix=generate('ab.-@x1_', 1)
+                )
+            else:
+                email = generate('ab.-@x1_', 9)
+
+            self.assertEqual(
+                get_email_domain_matcher(email_domains)(email),
+                is_email_valid_reference(email_domains, email),
+                'Mismatch for email [{}] and domains [{}].'.format(email, email_domains)
+            )
+
+    def test_email_domain_matcher_with_other_characters(self):
+        """ Verify domains with characters other than word characters, dots and dashes are matched one by one. """
+        self.assertTrue(get_email_domain_matcher('example.com,exam+ple.com')('test@exammmple.com'))
+        self.assertFalse(get_email_domain_matcher('example.com,exam+ple.com')('test@exam+ple.com'))
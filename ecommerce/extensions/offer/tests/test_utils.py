@@ -1,5 +1,9 @@
 from decimal import Decimal
 import ddt
+import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from oscar.apps.offer.utils import Applicator as CoreApplicator
 
 from oscar.core.loading import get_model
 from oscar.test.factories import *  # pylint:disable=wildcard-import,unused-wildcard-import
@@ -7,10 +11,15 @@ from oscar.test.factories import *  # pylint:disable=wildcard-import,unused-wild
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.checkout.utils import add_currency
-from ecommerce.extensions.offer.utils import _remove_exponent_and_trailing_zeros, format_benefit_value
+from ecommerce.extensions.offer.utils import (
+    _remove_exponent_and_trailing_zeros, format_benefit_value, get_cached_site_offers, Applicator
+)
 from ecommerce.tests.testcases import TestCase
 
 Benefit = get_model('offer', 'Benefit')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Range = get_model('offer', 'Range')
 
 
 @ddt.ddt
@@ -50,3 +59,83 @@ class UtilTests(CourseCatalogTestMixin, TestCase):
         """
         decimal = _remove_exponent_and_trailing_zeros(Decimal(value))
         self.assertEqual(decimal, Decimal(expected))
+
+    def test_applicator_runs_catalog_queries_for_basket(self):
+        """ The Applicator should run the catalog queries of the offers' ranges for all basket seats at once. """
+        catalog_query_range = RangeFactory(catalog_query='key:*', course_seat_types='verified')
+        offer = ConditionalOfferFactory(
+            condition=ConditionFactory(range=catalog_query_range),
+            benefit=BenefitFactory(range=catalog_query_range)
+        )
+        basket = BasketFactory()
+        basket.add_product(self.verified_seat)
+        basket.add_product(self.course.create_or_update_seat('honor', False, 0, self.partner))
+
+        with mock.patch.object(Range, 'run_catalog_query_for_products') as mock_run_catalog_query:
+            Applicator().run_catalog_queries(basket, [offer])
+            mock_run_catalog_query.assert_called_once_with([self.verified_seat])
+
+    def test_get_cached_site_offers(self):
+        """ get_cached_site_offers() should cache the active site offers until an offer is saved. """
+        offer = ConditionalOfferFactory(offer_type=ConditionalOffer.SITE, benefit=self.percentage_benefit)
+        self.assertEqual(get_cached_site_offers(), [offer])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_site_offers(), [offer])
+
+        offer.status = ConditionalOffer.SUSPENDED
+        offer.save()
+        self.assertEqual(get_cached_site_offers(), [])
+
+    def test_applicator_query_count(self):
+        """ The Applicator should issue fewer queries than Oscar's for a basket without vouchers. """
+        basket = BasketFactory(owner=self.create_user())
+        basket.add_product(self.verified_seat)
+        ConditionalOfferFactory(
+            offer_type=ConditionalOffer.SITE,
+            condition=ConditionFactory(range=self._range, type=Condition.COUNT, value=1),
+            benefit=self.percentage_benefit
+        )
+
+        Applicator().apply(basket, basket.owner)
+        with CaptureQueriesContext(connection) as applicator_queries:
+            Applicator().apply(basket, basket.owner)
+        basket.reset_offer_applications()
+        with CaptureQueriesContext(connection) as core_applicator_queries:
+            CoreApplicator().apply(basket, basket.owner)
+
+        self.assertLess(len(applicator_queries), len(core_applicator_queries))
+        self.assertEqual(len(basket.offer_applications), 1)
+
+    def test_applicator_cached_offer_usage(self):
+        """ The usage of cached offers applied to several baskets should be recorded for every order placed. """
+        offer = ConditionalOfferFactory(
+            offer_type=ConditionalOffer.SITE,
+            condition=ConditionFactory(range=self._range, type=Condition.COUNT, value=1),
+            benefit=self.percentage_benefit,
+            max_global_applications=2
+        )
+        baskets = []
+        for __ in range(2):
+            basket = BasketFactory(owner=self.create_user())
+            basket.add_product(self.verified_seat)
+            Applicator().apply(basket, basket.owner)
+            baskets.append(basket)
+
+        for basket in baskets:
+            create_order(basket=basket, user=basket.owner)
+
+        offer = ConditionalOffer.objects.get(pk=offer.pk)
+        self.assertEqual(offer.num_applications, 2)
+        self.assertEqual(offer.num_orders, 2)
+        self.assertEqual(offer.status, ConditionalOffer.CONSUMED)
+
+    def test_applicator_without_offers(self):
+        """ The Applicator should not apply offers when the basket has no vouchers and there are no site offers. """
+        basket = BasketFactory(owner=self.create_user())
+        basket.add_product(self.verified_seat)
+        get_cached_site_offers()
+
+        with mock.patch.object(Applicator, 'apply_offers') as mock_apply_offers:
+            Applicator().apply(basket, basket.owner)
+            self.assertFalse(mock_apply_offers.called)
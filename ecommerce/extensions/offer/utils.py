@@ -1,12 +1,21 @@
 """Offer Utility Methods. """
 from decimal import Decimal
+from itertools import chain
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
+from oscar.apps.offer.utils import Applicator as CoreApplicator
 from oscar.core.loading import get_model
 
 from ecommerce.extensions.checkout.utils import add_currency
 
 Benefit = get_model('offer', 'Benefit')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+
+SITE_OFFERS_CACHE_KEY = 'site_offers'
 
 
 def _remove_exponent_and_trailing_zeros(decimal):
@@ -63,3 +72,103 @@ def format_benefit_value(benefit):
         converted_benefit = add_currency(Decimal(benefit.value))
         benefit_value = _('${benefit_value}'.format(benefit_value=converted_benefit))
     return benefit_value
+
+
+def get_cached_site_offers():
+    """
+    Returns the active site offers, together with their benefits, conditions and ranges.
+
+    Open site offers which have not ended are cached in the shared Django cache until any offer, benefit,
+    condition or range is saved (see ecommerce.extensions.offer.signals). Offers which have not started
+    yet are filtered out on every call, so that the cached list does not depend on the time it was built.
+
+    Returns:
+        list: Active site offers.
+    """
+    offers = cache.get(SITE_OFFERS_CACHE_KEY)
+    if offers is None:
+        offers = list(
+            ConditionalOffer.objects.filter(
+                Q(end_datetime__gte=now()) | Q(end_datetime=None),
+                offer_type=ConditionalOffer.SITE,
+                status=ConditionalOffer.OPEN
+            ).select_related('benefit__range', 'condition__range')
+        )
+        cache.set(SITE_OFFERS_CACHE_KEY, offers, settings.SITE_OFFERS_CACHE_TIMEOUT)
+
+    current_datetime = now()
+    return [
+        offer for offer in offers
+        if (offer.start_datetime is None or offer.start_datetime <= current_datetime) and
+        (offer.end_datetime is None or offer.end_datetime >= current_datetime)
+    ]
+
+
+def invalidate_cached_site_offers():
+    """ Remove the active site offers from the cache. """
+    cache.delete(SITE_OFFERS_CACHE_KEY)
+
+
+class Applicator(CoreApplicator):
+    """
+    Applicator which reads site and voucher offers from the cache, and skips applying offers
+    altogether when the basket has no vouchers and there are no active site offers.
+    """
+
+    def apply(self, basket, user=None, request=None):
+        offers = self.get_offers(basket, user, request)
+        if offers:
+            self.apply_offers(basket, offers)
+
+    def get_offers(self, basket, user=None, request=None):
+        # Oscar's user and session offers are always empty, and are left out.
+        offers = chain(self.get_basket_offers(basket, user), self.get_site_offers())
+        return sorted(offers, key=lambda offer: offer.priority, reverse=True)
+
+    def get_site_offers(self):
+        return get_cached_site_offers()
+
+    def get_basket_offers(self, basket, user):
+        # noinspection PyUnresolvedReferences
+        from ecommerce.extensions.voucher.utils import get_cached_voucher  # pylint: disable=cyclic-import
+
+        offers = []
+        if not basket.id or not user:
+            return offers
+
+        for voucher in basket.vouchers.all():
+            available_to_user, __ = voucher.is_available_to_user(user=user)
+            if voucher.is_active() and available_to_user:
+                voucher_offers = list(get_cached_voucher(voucher.code).offers.all())
+                for offer in voucher_offers:
+                    offer.set_voucher(voucher)
+                offers.extend(voucher_offers)
+        return offers
+
+    def apply_offers(self, basket, offers):
+        self.run_catalog_queries(basket, offers)
+        super(Applicator, self).apply_offers(basket, offers)
+
+    def run_catalog_queries(self, basket, offers):
+        """
+        Run the catalog queries of the offers' ranges for all of the basket's seats at once, so that
+        checking each line against the ranges reads the results from the cache.
+
+        Arguments:
+            basket (Basket): Basket the offers are applied to.
+            offers (list): Offers applied to the basket.
+        """
+        offer_ranges = set()
+        for offer in offers:
+            offer_ranges.update(offer_range for offer_range in (offer.condition.range, offer.benefit.range)
+                                if offer_range and offer_range.catalog_query and offer_range.course_seat_types)
+
+        products = [line.product for line in basket.all_lines()]
+        for offer_range in offer_ranges:
+            seat_types = offer_range.course_seat_types.split(',')
+            seats = [
+                product for product in products
+                if getattr(product.attr, 'certificate_type', '').lower() in seat_types
+            ]
+            if seats:
+                offer_range.run_catalog_query_for_products(seats)
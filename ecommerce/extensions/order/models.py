@@ -1,6 +1,7 @@
 # noinspection PyUnresolvedReferences
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 from oscar.apps.order.abstract_models import AbstractOrder, AbstractPaymentEvent, AbstractLine
 from simple_history.models import HistoricalRecords
 
@@ -30,6 +31,14 @@ class Line(AbstractLine):
     history = HistoricalRecords()
 
 
+class FulfillmentRetry(TimeStampedModel):
+    """ Order line whose fulfillment failed with a transient error, and is fulfilled again once it is due. """
+    line = models.OneToOneField('order.Line', related_name='fulfillment_retry')
+    # Number of times the line's fulfillment has been retried.
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(db_index=True)
+
+
 # If two models with the same name are declared within an app, Django will only use the first one.
 # noinspection PyUnresolvedReferences
 from oscar.apps.order.models import *  # noqa pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position,wrong-import-order,ungrouped-imports
@@ -0,0 +1,305 @@
+"""
+Buffered writing of payment processor responses.
+
+When PAYMENT_PROCESSOR_RESPONSE_BUFFERING is enabled, deferred processor responses are appended to spool files
+on local disk, and written to the database in batches by a background thread of each process. Responses are
+synced to disk as they are spooled, so that the responses spooled by a process which dies are written by another
+process of the same host.
+
+Spool files are named after their state:
+
+    *.open: being appended to by the process which created it.
+    *.ready: waiting to be written to the database.
+    *.writing: being written to the database.
+"""
+from __future__ import unicode_literals
+
+import atexit
+import fcntl
+import glob
+import io
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.dateparse import parse_datetime
+from jsonfield.encoder import JSONEncoder
+from oscar.core.loading import get_model
+
+logger = logging.getLogger(__name__)
+
+Basket = get_model('basket', 'Basket')
+PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
+
+OPEN_SUFFIX = '.open'
+READY_SUFFIX = '.ready'
+WRITING_SUFFIX = '.writing'
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_spool_dir():
+    """ Returns the directory of the spool files of the current host. """
+    return settings.PAYMENT_PROCESSOR_RESPONSE_SPOOL_DIR or os.path.join(
+        tempfile.gettempdir(), 'payment_processor_responses'
+    )
+
+
+def _rename_suffix(path, old_suffix, new_suffix):
+    return path[:-len(old_suffix)] + new_suffix
+
+
+def _is_current(path, segment):
+    """ Returns whether the given path still names the given open spool file. """
+    try:
+        return os.stat(path).st_ino == os.fstat(segment.fileno()).st_ino
+    except OSError:
+        return False
+
+
+def _serialize(entry):
+    return json.dumps({
+        'processor_name': entry.processor_name,
+        'transaction_id': entry.transaction_id,
+        'basket_id': entry.basket_id,
+        'response': entry.response,
+        'created': entry.created.isoformat(),
+    }, cls=JSONEncoder) + '\n'
+
+
+def _deserialize(line):
+    data = json.loads(line.decode('utf-8'))
+    return PaymentProcessorResponse(
+        processor_name=data['processor_name'],
+        transaction_id=data['transaction_id'],
+        basket_id=data['basket_id'],
+        response=data['response'],
+        created=parse_datetime(data['created'])
+    )
+
+
+def _take_over_abandoned_file(path, old_suffix, stale_before):
+    """ Mark a spool file as ready to be written, if its process has not touched it since the given time. """
+    try:
+        with io.open(path, 'rb') as spool_file:
+            try:
+                fcntl.flock(spool_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError:
+                # The spool file is in use.
+                return
+
+            if _is_current(path, spool_file) and os.path.getmtime(path) < stale_before:
+                logger.warning('Taking over abandoned payment processor response spool file [%s].', path)
+                os.rename(path, _rename_suffix(path, old_suffix, READY_SUFFIX))
+    except (IOError, OSError):
+        # The spool file has been taken over, or written, by another process.
+        pass
+
+
+def _write_spool_file(path):
+    """ Write the responses of a spool file claimed by the current process, and delete it. """
+    try:
+        spool_file = io.open(path, 'rb')
+    except IOError:
+        # The spool file has been taken over by another process.
+        return 0
+
+    with spool_file:
+        try:
+            fcntl.flock(spool_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except IOError:
+            return 0
+
+        if not _is_current(path, spool_file):
+            return 0
+
+        # Other processes only take the spool file over if writing it fails for long enough.
+        os.utime(path, None)
+
+        entries = []
+        for number, line in enumerate(spool_file, 1):
+            try:
+                entries.append(_deserialize(line))
+            except (KeyError, ValueError):
+                # The process appending the line died before completing it.
+                logger.warning('Skipping malformed line [%d] of payment processor response spool file [%s].',
+                               number, path)
+
+        # Baskets may have been deleted since their responses were spooled.
+        basket_ids = set(entry.basket_id for entry in entries if entry.basket_id)
+        existing_basket_ids = set(Basket.objects.filter(id__in=basket_ids).values_list('id', flat=True))
+        for entry in entries:
+            if entry.basket_id not in existing_basket_ids:
+                entry.basket_id = None
+
+        PaymentProcessorResponse.objects.bulk_create(entries,
+                                                     batch_size=settings.PAYMENT_PROCESSOR_RESPONSE_BATCH_SIZE)
+        os.remove(path)
+
+    return len(entries)
+
+
+def write_spooled_processor_responses(spool_dir=None):
+    """
+    Write the spooled processor responses waiting to be written, including those abandoned by processes which died.
+
+    Responses are written at least once: if a process dies after writing the responses of a spool file, but
+    before deleting it, the responses are written again.
+
+    Arguments:
+        spool_dir (str): Directory of the spool files. Defaults to the directory of the current host.
+
+    Returns:
+        int: Number of responses written.
+    """
+    spool_dir = spool_dir or get_spool_dir()
+    stale_before = time.time() - settings.PAYMENT_PROCESSOR_RESPONSE_SPOOL_STALE_AGE
+
+    for suffix in (OPEN_SUFFIX, WRITING_SUFFIX):
+        for path in glob.glob(os.path.join(spool_dir, '*' + suffix)):
+            _take_over_abandoned_file(path, suffix, stale_before)
+
+    written = 0
+    for path in sorted(glob.glob(os.path.join(spool_dir, '*' + READY_SUFFIX))):
+        writing_path = _rename_suffix(path, READY_SUFFIX, WRITING_SUFFIX)
+        try:
+            os.rename(path, writing_path)
+        except OSError:
+            # Another process has claimed the spool file.
+            continue
+
+        written += _write_spool_file(writing_path)
+
+    return written
+
+
+class ProcessorResponseWriter(object):
+    """ Spools the deferred processor responses of the current process, and writes them to the database. """
+
+    def __init__(self, spool_dir):
+        self.spool_dir = spool_dir
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.segment = None
+        self.segment_path = None
+        self.segment_length = 0
+
+    def start(self):
+        """ Start writing spooled responses in a background thread. """
+        thread = threading.Thread(target=self._run, name='payment-processor-response-writer')
+        thread.daemon = True
+        thread.start()
+
+    def append(self, entry):
+        """ Spool an unsaved PaymentProcessorResponse. """
+        line = _serialize(entry).encode('utf-8')
+
+        with self.lock:
+            self._lock_segment()
+            try:
+                self.segment.write(line)
+                self.segment.flush()
+                os.fsync(self.segment.fileno())
+                self.segment_length += 1
+            finally:
+                fcntl.flock(self.segment, fcntl.LOCK_UN)
+
+            if self.segment_length >= settings.PAYMENT_PROCESSOR_RESPONSE_BATCH_SIZE:
+                self._seal_segment()
+                self.wakeup.set()
+
+    def flush(self):
+        """ Write the responses spooled on the current host, including those being appended to by this process. """
+        with self.lock:
+            self._seal_segment()
+
+        return write_spooled_processor_responses(self.spool_dir)
+
+    def _lock_segment(self):
+        """ Lock the spool file being appended to, creating it if needed. """
+        if self.segment is not None:
+            fcntl.flock(self.segment, fcntl.LOCK_EX)
+            if _is_current(self.segment_path, self.segment):
+                return
+
+            # Another process took the spool file over, assuming this one had died.
+            fcntl.flock(self.segment, fcntl.LOCK_UN)
+            self.segment.close()
+            self.segment = None
+
+        if not os.path.isdir(self.spool_dir):
+            try:
+                os.makedirs(self.spool_dir)
+            except OSError:
+                # Another process created the directory.
+                pass
+
+        name = '{host}-{pid}-{uuid}{suffix}'.format(
+            host=socket.gethostname(), pid=os.getpid(), uuid=uuid.uuid4().hex, suffix=OPEN_SUFFIX
+        )
+        self.segment_path = os.path.join(self.spool_dir, name)
+        self.segment = io.open(self.segment_path, 'ab')
+        self.segment_length = 0
+        fcntl.flock(self.segment, fcntl.LOCK_EX)
+
+    def _seal_segment(self):
+        """ Mark the spool file being appended to as ready to be written. """
+        if self.segment is None:
+            return
+
+        fcntl.flock(self.segment, fcntl.LOCK_EX)
+        try:
+            if _is_current(self.segment_path, self.segment):
+                os.rename(self.segment_path, _rename_suffix(self.segment_path, OPEN_SUFFIX, READY_SUFFIX))
+        finally:
+            fcntl.flock(self.segment, fcntl.LOCK_UN)
+            self.segment.close()
+            self.segment = None
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(settings.PAYMENT_PROCESSOR_RESPONSE_FLUSH_INTERVAL)
+            self.wakeup.clear()
+
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Failed to write spooled payment processor responses.')
+            finally:
+                close_old_connections()
+
+
+def get_processor_response_writer():
+    """ Returns the processor response writer of the current process, starting it if needed. """
+    global _writer, _writer_pid  # pylint: disable=global-statement
+
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                # Writers inherited from a parent process have no background thread.
+                writer = ProcessorResponseWriter(get_spool_dir())
+                writer.start()
+                _writer, _writer_pid = writer, os.getpid()
+
+    return _writer
+
+
+@atexit.register
+def flush_processor_response_writer():
+    """ Write the responses spooled by the current process before it exits. """
+    if _writer is not None and _writer_pid == os.getpid():
+        try:
+            _writer.flush()
+        except Exception:  # pylint: disable=broad-except
+            # The responses will be written by another process.
+            logger.exception('Failed to write spooled payment processor responses before exiting.')
@@ -8,3 +8,7 @@ class PaymentConfig(config.PaymentConfig):
         # Register signal handlers
         # noinspection PyUnresolvedReferences
         import ecommerce.extensions.payment.signals  # pylint: disable=unused-variable
+
+        # Import the payment processor classes once, at startup, rather than on the first request.
+        from ecommerce.extensions.payment.helpers import get_processor_classes
+        get_processor_classes()
@@ -0,0 +1,48 @@
+from __future__ import unicode_literals
+
+import base64
+import zlib
+
+from django.utils import six
+from jsonfield import JSONField
+
+
+class CompressedJSONField(JSONField):
+    """
+    JSONField storing its large values compressed.
+
+    Values whose JSON representation is at least `compress_min_length` characters long are stored zlib-compressed,
+    base64-encoded and prefixed with COMPRESSED_PREFIX. Shorter values, and values stored before the field was
+    compressed, are plain JSON.
+    """
+    COMPRESSED_PREFIX = 'zlib:'
+    DEFAULT_COMPRESS_MIN_LENGTH = 1024
+
+    def __init__(self, *args, **kwargs):
+        self.compress_min_length = kwargs.pop('compress_min_length', self.DEFAULT_COMPRESS_MIN_LENGTH)
+        super(CompressedJSONField, self).__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(CompressedJSONField, self).deconstruct()
+        if self.compress_min_length != self.DEFAULT_COMPRESS_MIN_LENGTH:
+            kwargs['compress_min_length'] = self.compress_min_length
+        return name, path, args, kwargs
+
+    def pre_init(self, value, obj):
+        # Values are only decompressed as they are loaded from the database, as JSONField only deserializes them then.
+        loading = getattr(getattr(obj, '_state', None), 'adding', False) and getattr(obj, 'pk', None) is not None
+        if loading:
+            value = self.decompress(value)
+        return super(CompressedJSONField, self).pre_init(value, obj)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super(CompressedJSONField, self).get_db_prep_value(value, connection, prepared=prepared)
+        if value is not None and len(value) >= self.compress_min_length:
+            value = self.COMPRESSED_PREFIX + base64.b64encode(zlib.compress(value.encode('utf-8'))).decode('ascii')
+        return value
+
+    def decompress(self, value):
+        """ Returns the JSON representation of a value, as stored in the database. """
+        if isinstance(value, six.string_types) and value.startswith(self.COMPRESSED_PREFIX):
+            value = zlib.decompress(base64.b64decode(value[len(self.COMPRESSED_PREFIX):])).decode('utf-8')
+        return value
@@ -1,13 +1,27 @@
 """Helper functions for working with payment processor classes."""
+from collections import OrderedDict, namedtuple
 import hmac
 import base64
 import hashlib
+import uuid
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import importlib
 
+from ecommerce.core.commit_hooks import on_request_commit
 from ecommerce.extensions.payment import exceptions
 
+ENABLED_PROCESSORS_VERSION_CACHE_KEY = 'enabled_payment_processors_version'
+
+ResolvedProcessorClasses = namedtuple('ResolvedProcessorClasses', ['enabled', 'unknown_names'])
+
+# Payment processor classes declared in the PAYMENT_PROCESSORS setting, by name.
+_processor_classes = None
+# Enabled payment processor classes, by comma-separated list of processor names, with the version
+# of the processors' switches they were resolved with.
+_enabled_processor_classes = {}
+
 
 def get_processor_class(path):
     """Return the payment processor class at the specified path.
@@ -39,9 +53,82 @@ def get_default_processor_class():
     Raises:
         IndexError: If the PAYMENT_PROCESSORS setting is empty.
     """
-    processor_class = get_processor_class(settings.PAYMENT_PROCESSORS[0])
+    return get_processor_classes().values()[0]
 
-    return processor_class
+
+def get_processor_classes():
+    """Return the payment processor classes declared in the PAYMENT_PROCESSORS setting.
+
+    The classes are imported once per process, in the order they are declared.
+
+    Returns:
+        OrderedDict: Payment processor classes, by name.
+    """
+    global _processor_classes  # pylint: disable=global-statement
+
+    if _processor_classes is None:
+        _processor_classes = OrderedDict(
+            (processor_class.NAME, processor_class)
+            for processor_class in (get_processor_class(path) for path in settings.PAYMENT_PROCESSORS)
+        )
+
+    return _processor_classes
+
+
+def reset_processor_classes():
+    """Forget the imported payment processor classes, and the processors enabled for each site."""
+    global _processor_classes  # pylint: disable=global-statement
+
+    _processor_classes = None
+    _enabled_processor_classes.clear()
+
+
+def resolve_processor_classes(payment_processors):
+    """Return the classes of the given payment processors whose Waffle switches are active.
+
+    Results are kept in process memory until the switch of a payment processor changes.
+
+    Arguments:
+        payment_processors (string): Comma-separated list of payment processor names.
+
+    Returns:
+        ResolvedProcessorClasses: Enabled payment processor classes, in the order of the PAYMENT_PROCESSORS
+            setting, and the names which match no payment processor class.
+    """
+    version = cache.get(ENABLED_PROCESSORS_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(ENABLED_PROCESSORS_VERSION_CACHE_KEY, version, None)
+
+    local_version, resolved = _enabled_processor_classes.get(payment_processors, (None, None))
+    if local_version == version:
+        return resolved
+
+    processor_classes = get_processor_classes()
+    names = {name.strip() for name in payment_processors.split(',')}
+    resolved = ResolvedProcessorClasses(
+        enabled=[
+            processor_class for name, processor_class in processor_classes.items()
+            if name in names and processor_class.is_enabled()
+        ],
+        unknown_names=names - set(processor_classes)
+    )
+    _enabled_processor_classes[payment_processors] = (version, resolved)
+    return resolved
+
+
+def invalidate_enabled_processor_classes():
+    """Make every process resolve again the payment processors enabled for each site.
+
+    The processors are resolved again once the current request's changes are committed too, since other
+    processes may resolve them from the switches committed before the change.
+    """
+    _delete_enabled_processors_version()
+    on_request_commit(_delete_enabled_processors_version)
+
+
+def _delete_enabled_processors_version():
+    cache.delete(ENABLED_PROCESSORS_VERSION_CACHE_KEY)
 
 
 def get_processor_class_by_name(name):
@@ -56,15 +143,12 @@ def get_processor_class_by_name(name):
     Raises:
         ProcessorNotFoundError: If no payment processor with the given name exists.
     """
-    for path in settings.PAYMENT_PROCESSORS:
-        processor_class = get_processor_class(path)
-
-        if name == processor_class.NAME:
-            return processor_class
-
-    raise exceptions.ProcessorNotFoundError(
-        exceptions.PROCESSOR_NOT_FOUND_DEVELOPER_MESSAGE.format(name=name)
-    )
+    try:
+        return get_processor_classes()[name]
+    except KeyError:
+        raise exceptions.ProcessorNotFoundError(
+            exceptions.PROCESSOR_NOT_FOUND_DEVELOPER_MESSAGE.format(name=name)
+        )
 
 
 def sign(message, secret):
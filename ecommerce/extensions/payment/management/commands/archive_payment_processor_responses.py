@@ -0,0 +1,121 @@
+"""
+Management command that moves old payment processor responses to compressed files.
+
+Responses are only needed for auditing once their payments are complete, and make up one of the largest tables.
+"""
+from __future__ import unicode_literals
+
+import datetime
+import gzip
+import io
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import now
+from jsonfield.encoder import JSONEncoder
+from oscar.core.loading import get_model
+
+PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
+
+
+class Command(BaseCommand):
+    help = 'Move payment processor responses older than the retention period to gzipped JSON lines files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-o', '--output-dir',
+                            action='store',
+                            dest='output_dir',
+                            help='Directory in which archive files are created.')
+        parser.add_argument('-d', '--retention-days',
+                            action='store',
+                            dest='retention_days',
+                            default=settings.PAYMENT_PROCESSOR_RESPONSE_RETENTION_DAYS,
+                            type=int,
+                            help='Age, in days, of the oldest responses which are kept.')
+        # Batched deletion prevents the entire table from locking up as the command executes.
+        parser.add_argument('-b', '--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            default=1000,
+                            type=int,
+                            help='Number of responses archived in each file.')
+        # Sleeping between each batch deletion gives MySQL time to process other connections.
+        parser.add_argument('-s', '--sleep-seconds',
+                            action='store',
+                            dest='sleep_seconds',
+                            default=3,
+                            type=int,
+                            help='Seconds to sleep between each batch.')
+        parser.add_argument('--commit',
+                            action='store_true',
+                            dest='commit',
+                            default=False,
+                            help='Actually archive the responses.')
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        if not (output_dir and os.path.isdir(output_dir)):
+            raise CommandError('Output directory [{}] does not exist.'.format(output_dir))
+
+        cutoff = now() - datetime.timedelta(days=options['retention_days'])
+        queryset = PaymentProcessorResponse.objects.filter(created__lt=cutoff)
+
+        if not options['commit']:
+            msg = 'This has been an example operation. If the --commit flag had been included, the command ' \
+                  'would have archived [{}] responses.'.format(queryset.count())
+            self.stderr.write(msg)
+            return
+
+        batch_size = options['batch_size']
+        sleep_seconds = options['sleep_seconds']
+        archived = 0
+
+        # Batches are paginated by ID, rather than offset, so that each batch query only reads its own rows.
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                responses = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+                if not responses:
+                    break
+
+                path = self._archive(output_dir, responses)
+                PaymentProcessorResponse.objects.filter(id__in=[response.id for response in responses]).delete()
+
+            last_id = responses[-1].id
+            archived += len(responses)
+            self.stderr.write('Archived [{count}] responses in [{path}]. Sleeping.'.format(
+                count=len(responses), path=path
+            ))
+            time.sleep(sleep_seconds)
+
+        self.stderr.write('Archived [{}] responses.'.format(archived))
+
+    def _archive(self, output_dir, responses):
+        """ Write responses to a new archive file, and return its path. """
+        path = os.path.join(output_dir, 'payment_processor_responses_{first}_{last}.jsonl.gz'.format(
+            first=responses[0].id, last=responses[-1].id
+        ))
+
+        # The archive only appears under its name once it is complete.
+        partial_path = path + '.partial'
+        with io.open(partial_path, 'wb') as archive_file:
+            with gzip.GzipFile(fileobj=archive_file, mode='wb') as archive:
+                for response in responses:
+                    line = json.dumps({
+                        'id': response.id,
+                        'processor_name': response.processor_name,
+                        'transaction_id': response.transaction_id,
+                        'basket_id': response.basket_id,
+                        'response': response.response,
+                        'created': response.created.isoformat(),
+                    }, cls=JSONEncoder)
+                    archive.write(line.encode('utf-8') + b'\n')
+            archive_file.flush()
+            os.fsync(archive_file.fileno())
+
+        os.rename(partial_path, path)
+        return path
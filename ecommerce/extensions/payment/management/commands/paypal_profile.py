@@ -8,6 +8,7 @@ import paypalrestsdk
 from paypalrestsdk import WebProfile
 
 from ecommerce.extensions.payment.models import PaypalWebProfile
+from ecommerce.extensions.payment.utils import invalidate_paypal_web_profile_id
 
 log = logging.getLogger(__name__)
 
@@ -112,6 +113,7 @@ class Command(BaseCommand):
         """
         try:
             __, created = PaypalWebProfile.objects.get_or_create(id=profile_id, name=profile_name)
+            invalidate_paypal_web_profile_id(profile_name)
             if created:
                 log.info("Enabled profile `%s` (id=%s)", profile_name, profile_id)
             else:
@@ -194,7 +196,9 @@ class Command(BaseCommand):
         """
         profile_id = self._get_argument(args, 'profile_id', 'disable')
         try:
-            PaypalWebProfile.objects.get(id=profile_id).delete()
+            profile = PaypalWebProfile.objects.get(id=profile_id)
+            profile.delete()
+            invalidate_paypal_web_profile_id(profile.name)
             log.info("Disabled profile %s.", profile_id)
         except PaypalWebProfile.DoesNotExist:
             log.info("Did not find an enabled web profile with id %s to disable.", profile_id)
@@ -0,0 +1,67 @@
+from __future__ import unicode_literals
+
+import datetime
+import glob
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+
+from ecommerce.tests.testcases import TestCase
+
+PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
+
+
+class ArchivePaymentProcessorResponsesTests(TestCase):
+    def setUp(self):
+        super(ArchivePaymentProcessorResponsesTests, self).setUp()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+        old = now() - datetime.timedelta(days=31)
+        self.old_responses = [
+            PaymentProcessorResponse.objects.create(processor_name='foo', transaction_id=str(i),
+                                                    response={'index': i}, created=old)
+            for i in range(5)
+        ]
+        self.recent_response = PaymentProcessorResponse.objects.create(processor_name='foo', response={})
+
+    def call_command(self, *args):
+        call_command('archive_payment_processor_responses', '--output-dir', self.output_dir, '--retention-days', '30',
+                     '--batch-size', '2', '--sleep-seconds', '0', *args)
+
+    def test_archive(self):
+        """ Verify old responses are moved to archive files, in batches. """
+        self.call_command('--commit')
+
+        self.assertEqual(list(PaymentProcessorResponse.objects.all()), [self.recent_response])
+
+        paths = sorted(glob.glob(os.path.join(self.output_dir, '*.jsonl.gz')))
+        self.assertEqual(len(paths), 3)
+
+        archived = []
+        for path in paths:
+            with gzip.open(path, 'rb') as archive:
+                archived += [json.loads(line.decode('utf-8')) for line in archive]
+
+        self.assertEqual(
+            sorted((response['id'], response['response']) for response in archived),
+            [(response.id, response.response) for response in self.old_responses]
+        )
+
+    def test_dry_run(self):
+        """ Verify nothing is archived without the commit flag. """
+        self.call_command()
+        self.assertEqual(PaymentProcessorResponse.objects.count(), 6)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_missing_output_dir(self):
+        """ Verify the command fails if the output directory does not exist. """
+        with self.assertRaises(CommandError):
+            call_command('archive_payment_processor_responses', '--output-dir', os.path.join(self.output_dir, 'foo'))
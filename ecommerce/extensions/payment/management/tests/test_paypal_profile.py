@@ -2,6 +2,7 @@ from cStringIO import StringIO
 import json
 
 import ddt
+from django.core.cache import cache
 from django.core.management import call_command
 from django.core.management.base import CommandError
 from django.test import override_settings
@@ -9,6 +10,7 @@ import mock
 
 from ecommerce.extensions.payment.management.commands.paypal_profile import Command as PaypalProfileCommand
 from ecommerce.extensions.payment.models import PaypalWebProfile
+from ecommerce.extensions.payment.utils import get_paypal_web_profile_id
 from ecommerce.tests.testcases import TestCase
 
 
@@ -105,6 +107,18 @@ class TestPaypalProfileCommand(TestCase):
         self.call_command_action("disable", self.TEST_ID)
         self.check_enabled(False)
 
+    def test_enable_disable_invalidate_cached_profile_id(self, mock_profile):
+        """ Verify enabling and disabling a profile invalidates the profile ID cached for its name. """
+        cache.clear()
+        mock_profile.find.return_value = self.mock_profile_instance
+        self.assertIsNone(get_paypal_web_profile_id(self.TEST_NAME))
+
+        self.call_command_action("enable", self.TEST_ID)
+        self.assertEqual(get_paypal_web_profile_id(self.TEST_NAME), self.TEST_ID)
+
+        self.call_command_action("disable", self.TEST_ID)
+        self.assertIsNone(get_paypal_web_profile_id(self.TEST_NAME))
+
     @override_settings(PAYMENT_PROCESSOR_CONFIG={
         'edx': {'paypal': {}, 'cybersource': {}},
         'no_paypal': {'cybersource': {}}
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import ecommerce.extensions.payment.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0012_auto_20161109_1456'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='paymentprocessorresponse',
+            name='response',
+            field=ecommerce.extensions.payment.fields.CompressedJSONField(),
+        ),
+        migrations.AlterField(
+            model_name='paymentprocessorresponse',
+            name='created',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, db_index=True),
+        ),
+    ]
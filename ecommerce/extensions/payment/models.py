@@ -1,10 +1,11 @@
 from django.db import models
+from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
-from jsonfield import JSONField
 from oscar.apps.payment.abstract_models import AbstractSource
 from solo.models import SingletonModel
 
 from ecommerce.extensions.payment.constants import CARD_TYPE_CHOICES
+from ecommerce.extensions.payment.fields import CompressedJSONField
 
 
 class PaymentProcessorResponse(models.Model):
@@ -14,8 +15,9 @@ class PaymentProcessorResponse(models.Model):
     transaction_id = models.CharField(max_length=255, verbose_name=_('Transaction ID'), null=True, blank=True)
     basket = models.ForeignKey('basket.Basket', verbose_name=_('Basket'), null=True, blank=True,
                                on_delete=models.SET_NULL)
-    response = JSONField()
-    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    response = CompressedJSONField()
+    # Responses written in batches by the audit writer keep the time at which they were received.
+    created = models.DateTimeField(default=now, editable=False, db_index=True)
 
     class Meta(object):
         get_latest_by = 'created'
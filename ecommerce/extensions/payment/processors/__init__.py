@@ -7,6 +7,8 @@ import waffle
 from django.conf import settings
 from oscar.core.loading import get_model
 
+from ecommerce.extensions.payment.audit import get_processor_response_writer
+
 PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
 
 HandledProcessorResponse = namedtuple('HandledProcessorResponse',
@@ -92,7 +94,7 @@ class BasePaymentProcessor(object):  # pragma: no cover
         """
         return None
 
-    def record_processor_response(self, response, transaction_id=None, basket=None):
+    def record_processor_response(self, response, transaction_id=None, basket=None, defer=False):
         """
         Save the processor's response to the database for auditing.
 
@@ -102,12 +104,20 @@ class BasePaymentProcessor(object):  # pragma: no cover
         Keyword Arguments:
             transaction_id (string): Identifier for the transaction on the payment processor's servers
             basket (Basket): Basket associated with the payment event (e.g., being purchased)
+            defer (bool): Whether the response may be written later, in a batch, if
+                PAYMENT_PROCESSOR_RESPONSE_BUFFERING is enabled. Deferred responses are returned unsaved, so they
+                must not be looked up, or referred to by ID, afterwards.
 
         Return
             PaymentProcessorResponse
         """
-        return PaymentProcessorResponse.objects.create(processor_name=self.NAME, transaction_id=transaction_id,
-                                                       response=response, basket=basket)
+        entry = PaymentProcessorResponse(processor_name=self.NAME, transaction_id=transaction_id, response=response,
+                                         basket=basket)
+        if defer and settings.PAYMENT_PROCESSOR_RESPONSE_BUFFERING:
+            get_processor_response_writer().append(entry)
+        else:
+            entry.save()
+        return entry
 
     @abc.abstractmethod
     def issue_credit(self, order, reference_number, amount, currency):
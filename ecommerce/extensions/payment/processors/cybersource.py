@@ -3,12 +3,14 @@ from __future__ import unicode_literals
 
 import datetime
 import logging
+import threading
 import uuid
 from decimal import Decimal
 
 from django.conf import settings
 from oscar.apps.payment.exceptions import UserCancelled, GatewayError, TransactionDeclined
 from oscar.core.loading import get_model
+from suds.cache import ObjectCache
 from suds.client import Client
 from suds.sudsobject import asdict
 from suds.wsse import Security, UsernameToken
@@ -34,6 +36,34 @@ ProductClass = get_model('catalogue', 'ProductClass')
 Source = get_model('payment', 'Source')
 SourceType = get_model('payment', 'SourceType')
 
+# SOAP clients of the current process, by SOAP API URL and merchant ID. Parsing a WSDL document is slow,
+# so each client is created once and cloned for each use.
+_soap_clients = {}
+_soap_clients_lock = threading.Lock()
+
+
+def get_soap_client(soap_api_url, merchant_id):
+    """
+    Returns a SOAP client for the given API and merchant.
+
+    Clients share the parsed WSDL document and type factory of the first client created for the API and
+    merchant, but not its options, so that they can be used concurrently by different threads.
+    """
+    key = (soap_api_url, merchant_id)
+    client = _soap_clients.get(key)
+    if client is None:
+        with _soap_clients_lock:
+            client = _soap_clients.get(key)
+            if client is None:
+                client = Client(
+                    soap_api_url,
+                    transport=RequestsTransport(),
+                    cache=ObjectCache(location=settings.SOAP_WSDL_CACHE_DIR, days=settings.SOAP_WSDL_CACHE_DAYS)
+                )
+                _soap_clients[key] = client
+
+    return client.clone()
+
 
 class Cybersource(BasePaymentProcessor):
     """
@@ -299,7 +329,7 @@ class Cybersource(BasePaymentProcessor):
             token = UsernameToken(self.merchant_id, self.transaction_key)
             security.tokens.append(token)
 
-            client = Client(self.soap_api_url, transport=RequestsTransport())
+            client = get_soap_client(self.soap_api_url, self.merchant_id)
             client.set_options(wsse=security)
 
             credit_service = client.factory.create('ns0:CCCreditService')
@@ -315,8 +345,9 @@ class Cybersource(BasePaymentProcessor):
                                                      ccCreditService=credit_service,
                                                      purchaseTotals=purchase_totals)
             request_id = response.requestID
+            # Declined credits are referred to by the ID of their response.
             ppr = self.record_processor_response(suds_response_to_dict(response), transaction_id=request_id,
-                                                 basket=order.basket)
+                                                 basket=order.basket, defer=response.decision == 'ACCEPT')
         except:
             msg = 'An error occurred while attempting to issue a credit (via CyberSource) for order [{}].'.format(
                 order.number)
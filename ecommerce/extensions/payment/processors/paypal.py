@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 
 import logging
+import threading
 from decimal import Decimal
 from urlparse import urljoin
 
@@ -12,12 +13,46 @@ from django.utils.functional import cached_property
 from oscar.apps.payment.exceptions import GatewayError
 
 from ecommerce.core.url_utils import get_ecommerce_url
-from ecommerce.extensions.payment.models import PaypalWebProfile, PaypalProcessorConfiguration
+from ecommerce.extensions.payment.models import PaypalProcessorConfiguration
 from ecommerce.extensions.payment.processors import BasePaymentProcessor, HandledProcessorResponse
-from ecommerce.extensions.payment.utils import middle_truncate
+from ecommerce.extensions.payment.transport import get_session
+from ecommerce.extensions.payment.utils import get_paypal_web_profile_id, middle_truncate
 
 logger = logging.getLogger(__name__)
 
+# PayPal API handles of the current process, by mode and credentials. A handle keeps its OAuth access token
+# until the token expires, so reusing handles saves fetching a token before every call to PayPal.
+_paypal_apis = {}
+_paypal_apis_lock = threading.Lock()
+
+
+class PaypalApi(paypalrestsdk.Api):
+    """ PayPal API handle which sends its requests through the session shared by the payment processors. """
+
+    def http_call(self, url, method, **kwargs):
+        logger.debug('Request[%s]: %s', method, url)
+        response = get_session().request(method, url, proxies=self.proxies, **kwargs)
+        logger.debug('Response[%d]: %s, Duration: %s.', response.status_code, response.reason, response.elapsed)
+        return self.handle_response(response, response.content.decode('utf-8'))
+
+
+def get_paypal_api(mode, client_id, client_secret):
+    """ Returns the PayPal API handle of the current process for the given mode and credentials. """
+    key = (mode, client_id, client_secret)
+    api = _paypal_apis.get(key)
+    if api is None:
+        with _paypal_apis_lock:
+            api = _paypal_apis.get(key)
+            if api is None:
+                api = PaypalApi({
+                    'mode': mode,
+                    'client_id': client_id,
+                    'client_secret': client_secret
+                })
+                _paypal_apis[key] = api
+
+    return api
+
 
 class Paypal(BasePaymentProcessor):
     """
@@ -47,11 +82,11 @@ class Paypal(BasePaymentProcessor):
         Returns Paypal API instance with appropriate configuration
         Returns: Paypal API instance
         """
-        return paypalrestsdk.Api({
-            'mode': self.configuration['mode'],
-            'client_id': self.configuration['client_id'],
-            'client_secret': self.configuration['client_secret']
-        })
+        return get_paypal_api(
+            self.configuration['mode'],
+            self.configuration['client_id'],
+            self.configuration['client_secret']
+        )
 
     @property
     def cancel_url(self):
@@ -112,11 +147,9 @@ class Paypal(BasePaymentProcessor):
             }],
         }
 
-        try:
-            web_profile = PaypalWebProfile.objects.get(name=self.DEFAULT_PROFILE_NAME)
-            data['experience_profile_id'] = web_profile.id
-        except PaypalWebProfile.DoesNotExist:
-            pass
+        web_profile_id = get_paypal_web_profile_id(self.DEFAULT_PROFILE_NAME)
+        if web_profile_id:
+            data['experience_profile_id'] = web_profile_id
 
         available_attempts = 1
         if waffle.switch_is_active('PAYPAL_RETRY_ATTEMPTS'):
@@ -250,7 +283,7 @@ class Paypal(BasePaymentProcessor):
                 )
                 raise GatewayError
 
-        self.record_processor_response(payment.to_dict(), transaction_id=payment.id, basket=basket)
+        self.record_processor_response(payment.to_dict(), transaction_id=payment.id, basket=basket, defer=True)
         logger.info("Successfully executed PayPal payment [%s] for basket [%d].", payment.id, basket.id)
 
         currency = payment.transactions[0].amount.currency
@@ -318,7 +351,8 @@ class Paypal(BasePaymentProcessor):
         basket = order.basket
         if refund.success():
             transaction_id = refund.id
-            self.record_processor_response(refund.to_dict(), transaction_id=transaction_id, basket=basket)
+            self.record_processor_response(refund.to_dict(), transaction_id=transaction_id, basket=basket,
+                                           defer=True)
             return transaction_id
         else:
             error = refund.error
@@ -2,21 +2,25 @@ import logging
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models.signals import post_save
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from waffle.models import Switch
 
 from ecommerce.extensions.api.v2.views.payments import PAYMENT_PROCESSOR_CACHE_KEY
+from ecommerce.extensions.payment.helpers import invalidate_enabled_processor_classes, reset_processor_classes
 
 
 logger = logging.getLogger(__name__)
 
 
 @receiver(post_save, sender=Switch)
+@receiver(post_delete, sender=Switch)
 def invalidate_processor_cache(*_args, **kwargs):
     """
     When Waffle switches for payment processors are toggled, the
-    payment processor list view cache must be invalidated.
+    payment processor list view cache, and the payment processors
+    enabled for each site, must be invalidated.
     """
     switch = kwargs['instance']
     parts = switch.name.split(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX)
@@ -24,4 +28,11 @@ def invalidate_processor_cache(*_args, **kwargs):
         processor = parts[1]
         logger.info('Switched payment processor [%s] %s.', processor, 'on' if switch.active else 'off')
         cache.delete(PAYMENT_PROCESSOR_CACHE_KEY)
+        invalidate_enabled_processor_classes()
         logger.info('Invalidated payment processor cache after toggling [%s].', switch.name)
+
+
+@receiver(setting_changed, dispatch_uid='payment.reset_processor_classes')
+def reset_processors(setting, **kwargs):  # pylint: disable=unused-argument
+    if setting == 'PAYMENT_PROCESSORS':
+        reset_processor_classes()
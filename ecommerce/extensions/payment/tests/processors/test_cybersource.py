@@ -17,7 +17,10 @@ from ecommerce.extensions.payment.exceptions import (
     InvalidSignatureError, InvalidCybersourceDecision, PartialAuthorizationError, PCIViolation,
     ProcessorMisconfiguredError
 )
-from ecommerce.extensions.payment.processors.cybersource import Cybersource, suds_response_to_dict
+from ecommerce.extensions.payment.processors import cybersource
+from ecommerce.extensions.payment.processors.cybersource import (
+    Cybersource, get_soap_client, suds_response_to_dict
+)
 from ecommerce.extensions.payment.tests.mixins import CybersourceMixin
 from ecommerce.extensions.payment.tests.processors.mixins import PaymentProcessorTestCaseMixin
 from ecommerce.tests.testcases import TestCase
@@ -232,6 +235,27 @@ class CybersourceTests(CybersourceMixin, PaymentProcessorTestCaseMixin, TestCase
                                                     basket)
             self.assertEqual(source.amount_refunded, 0)
 
+    @httpretty.activate
+    def test_get_soap_client(self):
+        """ Verify SOAP clients share the WSDL document of the API and merchant, but not their options. """
+        self.mock_cybersource_wsdl()
+        soap_api_url = settings.PAYMENT_PROCESSOR_CONFIG['edx']['cybersource']['soap_api_url']
+
+        with mock.patch.dict(cybersource._soap_clients, clear=True):  # pylint: disable=protected-access
+            client = get_soap_client(soap_api_url, 'merchant')
+            wsdl_requests = len(httpretty.httpretty.latest_requests)
+            other_client = get_soap_client(soap_api_url, 'merchant')
+
+            # The WSDL document is only retrieved and parsed once.
+            self.assertEqual(len(httpretty.httpretty.latest_requests), wsdl_requests)
+            self.assertIs(client.wsdl, other_client.wsdl)
+            self.assertIs(client.factory, other_client.factory)
+
+            client.set_options(wsse='security')
+            self.assertIsNone(other_client.options.wsse)
+
+            self.assertIsNot(get_soap_client(soap_api_url, 'other-merchant').wsdl, client.wsdl)
+
     def test_client_side_payment_url(self):
         """ Verify the property returns the Silent Order POST URL. """
         processor_config = settings.PAYMENT_PROCESSOR_CONFIG[self.partner.name.lower()][self.processor.NAME.lower()]
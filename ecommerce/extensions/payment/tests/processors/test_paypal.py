@@ -181,6 +181,25 @@ class PaypalTests(PaypalMixin, PaymentProcessorTestCaseMixin, TestCase):
         self.site.siteconfiguration.enable_otto_receipt_page = False
         assert self._get_receipt_url() == self.site.siteconfiguration.build_lms_url('/commerce/checkout/receipt')
 
+    def test_paypal_api_shared(self):
+        """ Verify processors share the PayPal API handle, and so the access token, of their configuration. """
+        self.assertIs(self.processor.paypal_api, self.processor_class(self.site).paypal_api)
+
+    @httpretty.activate
+    def test_access_token_reused(self):
+        """ Verify an access token is only fetched once for several payments. """
+        self.mock_oauth2_response()
+        self.processor.paypal_api.token_hash = None
+
+        self.mock_payment_creation_response(self.basket)
+        self.processor.get_transaction_parameters(self.basket, request=self.request)
+        self.processor_class(self.site).get_transaction_parameters(self.basket, request=self.request)
+
+        token_requests = [
+            request for request in httpretty.httpretty.latest_requests if request.path == '/v1/oauth2/token'
+        ]
+        self.assertEqual(len(token_requests), 1)
+
     @httpretty.activate
     @mock.patch('ecommerce.extensions.payment.processors.paypal.paypalrestsdk.Payment')
     @ddt.data(None, Paypal.DEFAULT_PROFILE_NAME, "some-other-name")
@@ -0,0 +1,116 @@
+from __future__ import unicode_literals
+
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+from django.test import override_settings
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.payment.audit import (
+    OPEN_SUFFIX, READY_SUFFIX, ProcessorResponseWriter, write_spooled_processor_responses
+)
+from ecommerce.extensions.payment.processors.paypal import Paypal
+from ecommerce.tests.testcases import TestCase
+
+PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
+
+
+@override_settings(PAYMENT_PROCESSOR_RESPONSE_BATCH_SIZE=3)
+class ProcessorResponseWriterTests(TestCase):
+    def setUp(self):
+        super(ProcessorResponseWriterTests, self).setUp()
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+        self.writer = ProcessorResponseWriter(self.spool_dir)
+        self.basket = factories.create_basket()
+
+    def create_entry(self, transaction_id='abc'):
+        return PaymentProcessorResponse(processor_name=Paypal.NAME, transaction_id=transaction_id,
+                                        response={'foo': 'bar'}, basket=self.basket)
+
+    def get_spool_files(self, suffix):
+        return glob.glob(os.path.join(self.spool_dir, '*' + suffix))
+
+    def test_flush(self):
+        """ Verify spooled responses are written, as they were received, when the writer is flushed. """
+        entry = self.create_entry()
+        self.writer.append(entry)
+        self.assertFalse(PaymentProcessorResponse.objects.exists())
+
+        self.assertEqual(self.writer.flush(), 1)
+        written = PaymentProcessorResponse.objects.get()
+        self.assertEqual(written.processor_name, entry.processor_name)
+        self.assertEqual(written.transaction_id, entry.transaction_id)
+        self.assertEqual(written.basket, self.basket)
+        self.assertEqual(written.response, entry.response)
+        self.assertEqual(written.created, entry.created)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_batches(self):
+        """ Verify spool files are ready to be written once they contain a batch of responses. """
+        for __ in range(3):
+            self.writer.append(self.create_entry())
+        self.writer.append(self.create_entry())
+
+        self.assertEqual(len(self.get_spool_files(READY_SUFFIX)), 1)
+        self.assertEqual(len(self.get_spool_files(OPEN_SUFFIX)), 1)
+        self.assertEqual(write_spooled_processor_responses(self.spool_dir), 3)
+        self.assertEqual(self.writer.flush(), 1)
+
+    def test_abandoned_spool_file(self):
+        """ Verify spool files abandoned by processes which died are written by other processes. """
+        self.writer.append(self.create_entry())
+        path = self.get_spool_files(OPEN_SUFFIX)[0]
+
+        # Spool files are only taken over once they are stale.
+        self.assertEqual(write_spooled_processor_responses(self.spool_dir), 0)
+
+        stale_time = time.time() - 3600
+        os.utime(path, (stale_time, stale_time))
+        self.assertEqual(write_spooled_processor_responses(self.spool_dir), 1)
+
+        # The writer whose spool file was taken over, although it was alive, spools to a new file.
+        self.writer.append(self.create_entry('def'))
+        self.assertEqual(self.writer.flush(), 1)
+        self.assertEqual(
+            sorted(PaymentProcessorResponse.objects.values_list('transaction_id', flat=True)),
+            ['abc', 'def']
+        )
+
+    def test_malformed_line(self):
+        """ Verify lines left incomplete by processes which died are skipped. """
+        self.writer.append(self.create_entry())
+        with open(self.get_spool_files(OPEN_SUFFIX)[0], 'ab') as spool_file:
+            spool_file.write(b'{"processor_name": "pay')
+
+        self.assertEqual(self.writer.flush(), 1)
+
+    def test_deleted_basket(self):
+        """ Verify responses of baskets deleted since they were spooled are written without a basket. """
+        self.writer.append(self.create_entry())
+        self.basket.delete()
+
+        self.writer.flush()
+        self.assertIsNone(PaymentProcessorResponse.objects.get().basket)
+
+    def test_record_processor_response(self):
+        """ Verify processors only spool deferred responses when buffering is enabled. """
+        processor = Paypal(self.site)
+        patch = mock.patch('ecommerce.extensions.payment.processors.get_processor_response_writer',
+                           return_value=self.writer)
+
+        with patch:
+            self.assertIsNotNone(processor.record_processor_response({}, basket=self.basket, defer=True).id)
+
+            with override_settings(PAYMENT_PROCESSOR_RESPONSE_BUFFERING=True):
+                self.assertIsNotNone(processor.record_processor_response({}, basket=self.basket).id)
+                self.assertIsNone(processor.record_processor_response({}, basket=self.basket, defer=True).id)
+
+        self.assertEqual(PaymentProcessorResponse.objects.count(), 2)
+        self.assertEqual(self.writer.flush(), 1)
+        self.assertEqual(PaymentProcessorResponse.objects.count(), 3)
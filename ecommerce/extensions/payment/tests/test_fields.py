@@ -0,0 +1,34 @@
+from __future__ import unicode_literals
+
+from django.db import connection
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.payment.fields import CompressedJSONField
+from ecommerce.tests.testcases import TestCase
+
+PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
+
+
+class CompressedJSONFieldTests(TestCase):
+    def get_stored_response(self, entry):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT response FROM payment_paymentprocessorresponse WHERE id = %s', [entry.id])
+            return cursor.fetchone()[0]
+
+    def test_large_value_compressed(self):
+        """ Verify large values are stored compressed, and loaded decompressed. """
+        response = {'message': 'x' * CompressedJSONField.DEFAULT_COMPRESS_MIN_LENGTH}
+        entry = PaymentProcessorResponse.objects.create(processor_name='foo', response=response)
+
+        stored = self.get_stored_response(entry)
+        self.assertTrue(stored.startswith(CompressedJSONField.COMPRESSED_PREFIX))
+        self.assertLess(len(stored), CompressedJSONField.DEFAULT_COMPRESS_MIN_LENGTH)
+        self.assertEqual(PaymentProcessorResponse.objects.get(id=entry.id).response, response)
+
+    def test_small_value_not_compressed(self):
+        """ Verify small values are stored as plain JSON. """
+        response = {'message': 'x'}
+        entry = PaymentProcessorResponse.objects.create(processor_name='foo', response=response)
+
+        self.assertEqual(self.get_stored_response(entry), '{"message":"x"}')
+        self.assertEqual(PaymentProcessorResponse.objects.get(id=entry.id).response, response)
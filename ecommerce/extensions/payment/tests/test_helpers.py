@@ -1,6 +1,9 @@
 import ddt
+from django.conf import settings
 from django.test import override_settings
+import mock
 
+from ecommerce.core.tests import toggle_switch
 from ecommerce.extensions.payment import helpers
 from ecommerce.extensions.payment.exceptions import ProcessorNotFoundError
 from ecommerce.extensions.payment.tests.processors import DummyProcessor, AnotherDummyProcessor
@@ -34,6 +37,38 @@ class HelperTests(TestCase):
         """
         self.assertRaises(ProcessorNotFoundError, helpers.get_processor_class_by_name, 'foo')
 
+    def test_get_processor_classes(self):
+        """ Verify processor classes are imported once, and imported again when the setting changes. """
+        self.assertEqual(helpers.get_processor_classes().values(), [DummyProcessor, AnotherDummyProcessor])
+
+        with mock.patch('ecommerce.extensions.payment.helpers.get_processor_class') as mock_get_processor_class:
+            helpers.get_processor_classes()
+            self.assertFalse(mock_get_processor_class.called)
+
+        with self.settings(PAYMENT_PROCESSORS=['ecommerce.extensions.payment.tests.processors.AnotherDummyProcessor']):
+            self.assertEqual(helpers.get_processor_classes().values(), [AnotherDummyProcessor])
+            self.assertRaises(ProcessorNotFoundError, helpers.get_processor_class_by_name, DummyProcessor.NAME)
+
+    def test_resolve_processor_classes(self):
+        """ Verify enabled processors are resolved again when a processor's switch changes. """
+        toggle_switch(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX + DummyProcessor.NAME, True)
+        toggle_switch(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX + AnotherDummyProcessor.NAME, False)
+        payment_processors = '{}, {},foo'.format(AnotherDummyProcessor.NAME, DummyProcessor.NAME)
+
+        resolved = helpers.resolve_processor_classes(payment_processors)
+        self.assertEqual(resolved.enabled, [DummyProcessor])
+        self.assertEqual(resolved.unknown_names, {'foo'})
+
+        with mock.patch.object(DummyProcessor, 'is_enabled') as mock_is_enabled:
+            self.assertEqual(helpers.resolve_processor_classes(payment_processors), resolved)
+            self.assertFalse(mock_is_enabled.called)
+
+        toggle_switch(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX + AnotherDummyProcessor.NAME, True)
+        self.assertEqual(
+            helpers.resolve_processor_classes(payment_processors).enabled,
+            [DummyProcessor, AnotherDummyProcessor]
+        )
+
     def test_sign(self):
         """ Verify the function returns a valid HMAC SHA-256 signature. """
         message = "This is a super-secret message!"
@@ -1,8 +1,9 @@
 import uuid
 
+from django.conf import settings
 from suds.transport import Request
 
-from ecommerce.extensions.payment.transport import RequestsTransport
+from ecommerce.extensions.payment.transport import RequestsTransport, get_session
 from ecommerce.core.tests.patched_httpretty import httpretty
 from ecommerce.tests.testcases import TestCase
 
@@ -42,3 +43,9 @@ class RequestsTransportTests(TestCase):
             'content-type': CONTENT_TYPE
         })
         self.assertEqual(response.message, body)
+
+    def test_session_shared(self):
+        """ Verify all transports share a session, so that connections are pooled. """
+        self.assertIs(get_session(), get_session())
+        self.assertEqual(get_session().get_adapter(API_URL).poolmanager.connection_pool_kw['maxsize'],
+                         settings.PAYMENT_PROCESSOR_POOL_MAXSIZE)
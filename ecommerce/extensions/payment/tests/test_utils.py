@@ -1,4 +1,7 @@
-from ecommerce.extensions.payment.utils import middle_truncate
+from ecommerce.extensions.payment.models import PaypalWebProfile
+from ecommerce.extensions.payment.utils import (
+    get_paypal_web_profile_id, invalidate_paypal_web_profile_id, middle_truncate
+)
 from ecommerce.tests.testcases import TestCase
 
 
@@ -17,3 +20,17 @@ class UtilsTests(TestCase):
         self.assertEqual('xx...xx', middle_truncate(string, length - 2))
 
         self.assertRaises(ValueError, middle_truncate, string, 0)
+
+    def test_get_paypal_web_profile_id(self):
+        """Verify the ID of an enabled PayPal web profile is cached until it is invalidated."""
+        name = 'default'
+        self.assertIsNone(get_paypal_web_profile_id(name))
+
+        PaypalWebProfile.objects.create(name=name, id='test-profile-id')
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_paypal_web_profile_id(name))
+
+        invalidate_paypal_web_profile_id(name)
+        self.assertEqual(get_paypal_web_profile_id(name), 'test-profile-id')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_paypal_web_profile_id(name), 'test-profile-id')
@@ -6,7 +6,9 @@ import json
 import ddt
 import mock
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.test import override_settings
 from django.test.client import RequestFactory
 from factory.django import mute_signals
 from freezegun import freeze_time
@@ -23,6 +25,7 @@ from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.extensions.payment.processors.cybersource import Cybersource
 from ecommerce.extensions.payment.processors.paypal import Paypal
 from ecommerce.extensions.payment.tests.mixins import PaymentEventsMixin, CybersourceMixin, PaypalMixin
+from ecommerce.extensions.payment.utils import get_duplicate_payment_notification_count, payment_notification_lock
 from ecommerce.extensions.payment.views import CybersourceNotifyView, PaypalPaymentExecutionView
 from ecommerce.tests.testcases import TestCase
 
@@ -290,6 +293,53 @@ class CybersourceNotifyViewTests(CybersourceMixin, PaymentEventsMixin, TestCase)
         self.assert_processor_response_recorded(self.processor_name, notification[u'transaction_id'], notification,
                                                 basket=self.basket)
 
+    @mute_signals(post_checkout)
+    def test_duplicate_notification(self):
+        """
+        Verify repeated notifications of a transaction whose order has been placed are acknowledged, and ignored.
+        """
+        notification = self.generate_notification(self.basket, billing_address=self.billing_address)
+        self.assertEqual(self.client.post(reverse('cybersource_notify'), notification).status_code, 200)
+        self.assertEqual(get_duplicate_payment_notification_count(self.processor_name), 0)
+
+        with mock.patch.object(CybersourceNotifyView, '_get_basket') as mock_get_basket:
+            self.assertEqual(self.client.post(reverse('cybersource_notify'), notification).status_code, 200)
+            self.assertEqual(get_duplicate_payment_notification_count(self.processor_name), 1)
+
+            # Notifications are also recognized as duplicates once their transaction has left the cache.
+            cache.clear()
+            self.assertEqual(self.client.post(reverse('cybersource_notify'), notification).status_code, 200)
+            self.assertEqual(get_duplicate_payment_notification_count(self.processor_name), 1)
+
+        self.assertFalse(mock_get_basket.called)
+        self.assertEqual(Order.objects.filter(basket=self.basket).count(), 1)
+        self.assertEqual(
+            PaymentProcessorResponse.objects.filter(transaction_id=notification['transaction_id']).count(), 1
+        )
+
+    @mute_signals(post_checkout)
+    @override_settings(PAYMENT_PROCESSOR_RESPONSE_BUFFERING=True)
+    def test_notification_recorded_with_buffering(self):
+        """ Verify notifications of accepted payments are written to the database even when buffering responses. """
+        notification = self.generate_notification(self.basket, billing_address=self.billing_address)
+        self.assertEqual(self.client.post(reverse('cybersource_notify'), notification).status_code, 200)
+
+        self.assertTrue(Order.objects.filter(basket=self.basket).exists())
+        self.assert_processor_response_recorded(self.processor_name, notification[u'transaction_id'], notification,
+                                                basket=self.basket)
+
+    @override_settings(PAYMENT_NOTIFICATION_LOCK_WAIT=0)
+    def test_concurrent_notification(self):
+        """ Verify a notification is deferred while another notification for the same order is being handled. """
+        notification = self.generate_notification(self.basket, billing_address=self.billing_address)
+
+        with payment_notification_lock(notification['req_reference_number']) as acquired:
+            self.assertTrue(acquired)
+            response = self.client.post(reverse('cybersource_notify'), notification)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(PaymentProcessorResponse.objects.filter(transaction_id=notification['transaction_id']))
+
 
 @ddt.ddt
 class PaypalPaymentExecutionViewTests(PaypalMixin, PaymentEventsMixin, TestCase):
@@ -1,9 +1,38 @@
+import cookielib
 import io
+import threading
 
+from django.conf import settings
 import requests
+from requests.adapters import HTTPAdapter
 from suds.transport import Reply
 from suds.transport.http import HttpAuthenticated
 
+# Session shared by the payment processor API clients of the process, so that connections are reused.
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the requests session shared by the payment processor API clients of the current process.
+
+    The session serves several sites and merchants, so it never keeps cookies.
+    """
+    global _session  # pylint: disable=global-statement
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.cookies.set_policy(cookielib.DefaultCookiePolicy(allowed_domains=[]))
+                adapter = HTTPAdapter(pool_maxsize=settings.PAYMENT_PROCESSOR_POOL_MAXSIZE)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+
+    return _session
+
 
 class RequestsTransport(HttpAuthenticated):
     """
@@ -12,17 +41,19 @@ class RequestsTransport(HttpAuthenticated):
     This class uses requests, instead of urllib2, to make HTTP requests. This allows us to properly
     verify SSL certificates. This has been adapted from
     http://stackoverflow.com/questions/6277027/suds-over-https-with-cert.
+
+    Requests are made with a session shared by all instances, which pools connections.
     """
     def open(self, request):
         """ Fetch the WSDL using requests. """
         self.addcredentials(request)
-        resp = requests.get(request.url, data=request.message, headers=request.headers)
+        resp = get_session().get(request.url, data=request.message, headers=request.headers)
         result = io.StringIO(resp.content.decode('utf-8'))
         return result
 
     def send(self, request):
         """ POST to the service using requests. """
         self.addcredentials(request)
-        resp = requests.post(request.url, data=request.message, headers=request.headers)
+        resp = get_session().post(request.url, data=request.message, headers=request.headers)
         result = Reply(resp.status_code, resp.headers, resp.content)
         return result
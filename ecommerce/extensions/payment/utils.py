@@ -1,4 +1,19 @@
+from contextlib import contextmanager
+import time
+
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
+from oscar.core.loading import get_model
+
+Basket = get_model('basket', 'Basket')
+PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
+PaypalWebProfile = get_model('payment', 'PaypalWebProfile')
+
+PAYMENT_NOTIFICATION_HANDLED_CACHE_KEY = 'payment_notification_handled_{processor_name}_{transaction_id}'
+PAYMENT_NOTIFICATION_LOCK_CACHE_KEY = 'payment_notification_lock_{order_number}'
+DUPLICATE_PAYMENT_NOTIFICATIONS_CACHE_KEY = 'duplicate_payment_notifications_{processor_name}'
+PAYPAL_WEB_PROFILE_CACHE_KEY = 'paypal_web_profile_{name}'
 
 
 def middle_truncate(string, chars):
@@ -37,3 +52,107 @@ def middle_truncate(string, chars):
     truncated = u'{start}{indicator}{end}'.format(start=start, indicator=indicator, end=end)
 
     return truncated
+
+
+def is_payment_notification_handled(processor_name, transaction_id):
+    """Return whether an order has already been placed for the given payment processor transaction.
+
+    The answer is read from the cache, or else from the recorded responses of the payment processor.
+
+    Arguments:
+        processor_name (str): Name of the payment processor.
+        transaction_id (str): Identifier of the transaction on the payment processor's servers.
+
+    Returns:
+        bool
+    """
+    if not transaction_id:
+        return False
+
+    cache_key = PAYMENT_NOTIFICATION_HANDLED_CACHE_KEY.format(
+        processor_name=processor_name,
+        transaction_id=transaction_id
+    )
+    if cache.get(cache_key):
+        return True
+
+    handled = PaymentProcessorResponse.objects.filter(
+        processor_name=processor_name,
+        transaction_id=transaction_id,
+        basket__status=Basket.SUBMITTED
+    ).exists()
+    if handled:
+        cache.set(cache_key, True, settings.PAYMENT_NOTIFICATION_CACHE_TIMEOUT)
+
+    return handled
+
+
+def mark_payment_notification_handled(processor_name, transaction_id):
+    """Remember that an order has been placed for the given payment processor transaction."""
+    if transaction_id:
+        cache_key = PAYMENT_NOTIFICATION_HANDLED_CACHE_KEY.format(
+            processor_name=processor_name,
+            transaction_id=transaction_id
+        )
+        cache.set(cache_key, True, settings.PAYMENT_NOTIFICATION_CACHE_TIMEOUT)
+
+
+def record_duplicate_payment_notification(processor_name):
+    """Count a repeated notification of a transaction which has already been handled."""
+    cache_key = DUPLICATE_PAYMENT_NOTIFICATIONS_CACHE_KEY.format(processor_name=processor_name)
+    cache.add(cache_key, 0, None)
+    try:
+        cache.incr(cache_key)
+    except ValueError:
+        # The counter was evicted since it was added.
+        cache.add(cache_key, 1, None)
+
+
+def get_duplicate_payment_notification_count(processor_name):
+    """Return the number of repeated notifications of handled transactions received from a payment processor."""
+    return cache.get(DUPLICATE_PAYMENT_NOTIFICATIONS_CACHE_KEY.format(processor_name=processor_name), 0)
+
+
+@contextmanager
+def payment_notification_lock(order_number):
+    """Hold the lock of an order's payment notifications, waiting up to PAYMENT_NOTIFICATION_LOCK_WAIT seconds for it.
+
+    Arguments:
+        order_number (str): Number of the order being paid for, which identifies its basket.
+
+    Yields:
+        bool: Whether the lock was acquired. If not, the order's notifications are still being handled elsewhere.
+    """
+    cache_key = PAYMENT_NOTIFICATION_LOCK_CACHE_KEY.format(order_number=order_number)
+    deadline = time.time() + settings.PAYMENT_NOTIFICATION_LOCK_WAIT
+
+    acquired = cache.add(cache_key, True, settings.PAYMENT_NOTIFICATION_LOCK_TIMEOUT)
+    while not acquired and time.time() < deadline:
+        time.sleep(0.1)
+        acquired = cache.add(cache_key, True, settings.PAYMENT_NOTIFICATION_LOCK_TIMEOUT)
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            cache.delete(cache_key)
+
+
+def get_paypal_web_profile_id(name):
+    """Return the ID of the enabled PayPal web profile with the given name, or None if there is none.
+
+    The ID is cached until the profile is enabled or disabled with the paypal_profile management command.
+    """
+    cache_key = PAYPAL_WEB_PROFILE_CACHE_KEY.format(name=name)
+    profile_id = cache.get(cache_key)
+    if profile_id is None:
+        # An empty ID is cached for names without an enabled profile.
+        profile_id = PaypalWebProfile.objects.filter(name=name).values_list('id', flat=True).first() or ''
+        cache.set(cache_key, profile_id, settings.PAYPAL_WEB_PROFILE_CACHE_TIMEOUT)
+
+    return profile_id or None
+
+
+def invalidate_paypal_web_profile_id(name):
+    """Forget the cached ID of the enabled PayPal web profile with the given name."""
+    cache.delete(PAYPAL_WEB_PROFILE_CACHE_KEY.format(name=name))
@@ -28,6 +28,10 @@ from ecommerce.extensions.payment.exceptions import InvalidSignatureError
 from ecommerce.extensions.payment.forms import PaymentForm
 from ecommerce.extensions.payment.processors.cybersource import Cybersource
 from ecommerce.extensions.payment.processors.paypal import Paypal
+from ecommerce.extensions.payment.utils import (
+    is_payment_notification_handled, mark_payment_notification_handled, payment_notification_lock,
+    record_duplicate_payment_notification
+)
 
 logger = logging.getLogger(__name__)
 
@@ -179,12 +183,50 @@ class CybersourceNotifyView(EdxOrderPlacementMixin, View):
             return None
 
     def post(self, request):
-        """Process a CyberSource merchant notification and place an order for paid products as appropriate."""
+        """Process a CyberSource merchant notification and place an order for paid products as appropriate.
 
+        Notifications of transactions for which an order has already been placed are acknowledged without
+        being handled again, and notifications for the same order are handled one at a time.
+        """
+        cybersource_response = request.POST.dict()
+        transaction_id = cybersource_response.get('transaction_id')
+        order_number = cybersource_response.get('req_reference_number')
+
+        if self._is_duplicate_notification(transaction_id):
+            return HttpResponse()
+
+        with payment_notification_lock(order_number) as acquired:
+            if not acquired:
+                # CyberSource delivers the notification again later, once the other notification has been handled.
+                logger.warning(
+                    'Deferring CyberSource merchant notification for transaction [%s], since another notification '
+                    'for order [%s] is being handled.',
+                    transaction_id,
+                    order_number
+                )
+                return HttpResponse(status=503)
+
+            if self._is_duplicate_notification(transaction_id):
+                return HttpResponse()
+
+            return self._handle_notification(request, cybersource_response)
+
+    def _is_duplicate_notification(self, transaction_id):
+        if not is_payment_notification_handled(Cybersource.NAME, transaction_id):
+            return False
+
+        logger.info(
+            'Ignoring repeated CyberSource merchant notification for transaction [%s], for which an order '
+            'has already been placed.',
+            transaction_id
+        )
+        record_duplicate_payment_notification(Cybersource.NAME)
+        return True
+
+    def _handle_notification(self, request, cybersource_response):
         # Note (CCB): Orders should not be created until the payment processor has validated the response's signature.
         # This validation is performed in the handle_payment method. After that method succeeds, the response can be
         # safely assumed to have originated from CyberSource.
-        cybersource_response = request.POST.dict()
         basket = None
         transaction_id = None
 
@@ -205,7 +247,8 @@ class CybersourceNotifyView(EdxOrderPlacementMixin, View):
                 logger.error('Received payment for non-existent basket [%s].', basket_id)
                 return HttpResponse(status=400)
         finally:
-            # Store the response in the database regardless of its authenticity.
+            # Store the response in the database regardless of its authenticity. The response is not deferred: its
+            # signature has not been checked yet, and repeated notifications are recognized by its transaction ID.
             ppr = self.payment_processor.record_processor_response(cybersource_response, transaction_id=transaction_id,
                                                                    basket=basket)
 
@@ -265,6 +308,7 @@ class CybersourceNotifyView(EdxOrderPlacementMixin, View):
                 order_total,
                 request=request
             )
+            mark_payment_notification_handled(Cybersource.NAME, transaction_id)
 
             return HttpResponse()
         except:  # pylint: disable=bare-except
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0020_auto_20161025_1446'),
+        ('voucher', '0004_auto_20160517_0930'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponReport',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', django_extensions.db.fields.CreationDateTimeField(default=django.utils.timezone.now, verbose_name='created', editable=False, blank=True)),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(default=django.utils.timezone.now, verbose_name='modified', editable=False, blank=True)),
+                ('watermark', models.CharField(max_length=32)),
+                ('status', models.CharField(default=b'Pending', max_length=32, choices=[(b'Pending', 'Pending'), (b'In Progress', 'In Progress'), (b'Complete', 'Complete'), (b'Failed', 'Failed')])),
+                ('report_file', models.FileField(null=True, upload_to=b'coupon_reports', blank=True)),
+                ('coupon', models.ForeignKey(related_name='coupon_reports', to='catalogue.Product')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='couponreport',
+            unique_together=set([('coupon', 'watermark')]),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('voucher', '0005_couponreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='couponreport',
+            name='started',
+            field=models.DateTimeField(null=True, blank=True),
+        ),
+    ]
@@ -1,5 +1,11 @@
 # noinspection PyUnresolvedReferences
+import datetime
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 
 
 class CouponVouchers(models.Model):
@@ -16,5 +22,41 @@ class OrderLineVouchers(models.Model):
     line = models.ForeignKey('order.Line', related_name='order_line_vouchers')
     vouchers = models.ManyToManyField('voucher.Voucher', related_name='order_line_vouchers')
 
+
+class CouponReport(TimeStampedModel):
+    """ CSV report of a coupon's vouchers, generated asynchronously and kept until the coupon changes. """
+    PENDING, IN_PROGRESS, COMPLETE, FAILED = ('Pending', 'In Progress', 'Complete', 'Failed')
+    STATUS_CHOICES = (
+        (PENDING, _('Pending')),
+        (IN_PROGRESS, _('In Progress')),
+        (COMPLETE, _('Complete')),
+        (FAILED, _('Failed')),
+    )
+    coupon = models.ForeignKey('catalogue.Product', related_name='coupon_reports')
+    # Identifies the state of the coupon's vouchers the report was generated from.
+    watermark = models.CharField(max_length=32)
+    status = models.CharField(max_length=32, choices=STATUS_CHOICES, default=PENDING)
+    # When the report was last queued, or its generation last began.
+    started = models.DateTimeField(null=True, blank=True)
+    report_file = models.FileField(upload_to='coupon_reports', blank=True, null=True)
+
+    class Meta(object):
+        unique_together = ('coupon', 'watermark')
+
+    @classmethod
+    def get_timeout_cutoff(cls):
+        """ Returns the time before which reports still pending, or in progress, are considered failed. """
+        return timezone.now() - datetime.timedelta(seconds=settings.COUPON_REPORT_TIMEOUT)
+
+    def has_timed_out(self):
+        """
+        Whether the report has been pending, or in progress, for longer than COUPON_REPORT_TIMEOUT, e.g. because
+        its task was lost or its worker died. Such reports are considered failed, and can be generated again.
+        """
+        if self.status not in (self.PENDING, self.IN_PROGRESS):
+            return False
+
+        return (self.started or self.created) < self.get_timeout_cutoff()
+
 # noinspection PyUnresolvedReferences
 from oscar.apps.voucher.models import *  # noqa pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position
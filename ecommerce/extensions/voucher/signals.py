@@ -0,0 +1,65 @@
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import invalidate_cached_voucher_offers, invalidate_cached_vouchers
+
+Benefit = get_model('offer', 'Benefit')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Range = get_model('offer', 'Range')
+Voucher = get_model('voucher', 'Voucher')
+
+
+@receiver(post_save, sender=Voucher, dispatch_uid='voucher.invalidate_cached_voucher')
+@receiver(post_delete, sender=Voucher, dispatch_uid='voucher.invalidate_deleted_cached_voucher')
+def invalidate_cached_voucher(instance, **_kwargs):
+    """ Invalidate the cached copy of a voucher when it is saved or deleted. """
+    invalidate_cached_vouchers([instance.code])
+
+
+@receiver(m2m_changed, sender=Voucher.offers.through, dispatch_uid='voucher.invalidate_cached_voucher_offers')
+def invalidate_cached_voucher_offer_links(instance, action, reverse, pk_set, **_kwargs):
+    """ Invalidate cached vouchers when offers are added to, or removed from, them. """
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_cached_vouchers([instance.code])
+    elif action == 'pre_clear':
+        # The vouchers losing the offer are only known before the relation is cleared.
+        invalidate_cached_vouchers(instance.vouchers.values_list('code', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        invalidate_cached_vouchers(Voucher.objects.filter(id__in=pk_set).values_list('code', flat=True))
+
+
+@receiver(post_save, sender=ConditionalOffer, dispatch_uid='voucher.invalidate_cached_offer')
+@receiver(post_delete, sender=ConditionalOffer, dispatch_uid='voucher.invalidate_deleted_cached_offer')
+def invalidate_cached_offer(instance, **_kwargs):
+    """ Invalidate the cached copy of an offer when it is saved or deleted. """
+    invalidate_cached_voucher_offers([instance.id])
+
+
+@receiver(post_save, sender=Benefit, dispatch_uid='voucher.invalidate_cached_benefit')
+def invalidate_cached_benefit(instance, **_kwargs):
+    """ Invalidate cached offers which reference a benefit when it is saved. """
+    invalidate_cached_voucher_offers(
+        ConditionalOffer.objects.filter(benefit=instance).values_list('id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Condition, dispatch_uid='voucher.invalidate_cached_condition')
+def invalidate_cached_condition(instance, **_kwargs):
+    """ Invalidate cached offers which reference a condition when it is saved. """
+    invalidate_cached_voucher_offers(
+        ConditionalOffer.objects.filter(condition=instance).values_list('id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Range, dispatch_uid='voucher.invalidate_cached_range')
+def invalidate_cached_range(instance, **_kwargs):
+    """ Invalidate cached offers whose benefit or condition references a range when it is saved. """
+    invalidate_cached_voucher_offers(
+        ConditionalOffer.objects.filter(
+            Q(benefit__range=instance) | Q(condition__range=instance)
+        ).values_list('id', flat=True)
+    )
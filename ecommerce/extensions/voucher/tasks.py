@@ -0,0 +1,68 @@
+"""Asynchronous tasks for vouchers."""
+import logging
+import tempfile
+
+from celery import shared_task
+from django.contrib.sites.models import Site
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import generate_coupon_report_csv_lines, stream_coupon_report
+
+logger = logging.getLogger(__name__)
+
+CouponReport = get_model('voucher', 'CouponReport')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
+
+
+@shared_task
+def generate_coupon_report_file(coupon_report_id, site_id):
+    """
+    Generate the CSV file of a coupon report, and delete the coupon's outdated reports.
+
+    Args:
+        coupon_report_id (int): ID of the CouponReport to generate.
+        site_id (int): ID of the Site whose URLs the report links to.
+    """
+    coupon_report = CouponReport.objects.select_related('coupon').get(id=coupon_report_id)
+    coupon = coupon_report.coupon
+    coupon_report.status = CouponReport.IN_PROGRESS
+    coupon_report.started = timezone.now()
+    coupon_report.save()
+
+    try:
+        field_names, rows = stream_coupon_report(
+            CouponVouchers.objects.filter(coupon=coupon), site=Site.objects.get(id=site_id)
+        )
+        # The report is written to a temporary file first, so that it is never held in memory as a whole.
+        with tempfile.TemporaryFile() as report_file:
+            for line in generate_coupon_report_csv_lines(field_names, rows):
+                report_file.write(line)
+
+            file_name = '{}-{}.csv'.format(slugify(u'Coupon Report for {}'.format(coupon)), coupon_report.watermark)
+            coupon_report.report_file.save(file_name, File(report_file), save=False)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception(u'Failed to generate report [%d] for coupon [%d].', coupon_report.id, coupon.id)
+        coupon_report.status = CouponReport.FAILED
+        coupon_report.save()
+        return
+
+    coupon_report.status = CouponReport.COMPLETE
+    coupon_report.save()
+    logger.info(u'Generated report [%d] for coupon [%d].', coupon_report.id, coupon.id)
+
+    # Reports still being generated are left alone, their tasks will clean up after themselves. Reports which
+    # have timed out have no task left to do so.
+    timeout_cutoff = CouponReport.get_timeout_cutoff()
+    outdated_reports = CouponReport.objects.filter(coupon=coupon, created__lt=coupon_report.created).filter(
+        Q(status__in=(CouponReport.COMPLETE, CouponReport.FAILED)) |
+        Q(started__lt=timeout_cutoff) |
+        Q(started__isnull=True, created__lt=timeout_cutoff)
+    )
+    for outdated_report in outdated_reports:
+        if outdated_report.report_file:
+            outdated_report.report_file.delete(save=False)
+        outdated_report.delete()
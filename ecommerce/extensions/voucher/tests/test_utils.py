@@ -2,8 +2,9 @@
 from __future__ import unicode_literals
 
 import httpretty
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import ugettext_lazy as _
 from oscar.templatetags.currency_filters import currency
 from oscar.test.factories import *  # pylint:disable=wildcard-import,unused-wildcard-import
@@ -16,7 +17,8 @@ from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.modules import CouponFulfillmentModule
 from ecommerce.extensions.fulfillment.status import LINE
 from ecommerce.extensions.voucher.utils import (
-    create_vouchers, generate_coupon_report, get_voucher_discount_info, update_voucher_offer
+    create_vouchers, generate_coupon_report, get_cached_voucher, get_voucher_discount_info, stream_coupon_report,
+    update_voucher_offer, voucher_cache
 )
 from ecommerce.tests.mixins import LmsApiMockMixin
 from ecommerce.tests.testcases import TestCase
@@ -24,6 +26,7 @@ from ecommerce.tests.testcases import TestCase
 Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -182,6 +185,96 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertEqual(voucher.start_datetime, datetime.date(2015, 10, 1))
         self.assertEqual(voucher.usage, Voucher.SINGLE_USE)
 
+    def create_single_use_vouchers(self, quantity):
+        """ Create the given number of single-use vouchers for the test coupon. """
+        return create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Test voucher",
+            quantity=quantity,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE
+        )
+
+    def test_create_vouchers_query_count(self):
+        """ Verify the number of queries needed to create vouchers does not depend on the quantity. """
+        # The first call creates the range, offer and coupon vouchers shared by all later calls.
+        self.create_single_use_vouchers(1)
+
+        with CaptureQueriesContext(connection) as single_voucher_queries:
+            self.create_single_use_vouchers(1)
+
+        with CaptureQueriesContext(connection) as many_vouchers_queries:
+            self.create_single_use_vouchers(100)
+
+        self.assertEqual(len(single_voucher_queries), len(many_vouchers_queries))
+
+    @override_settings(VOUCHER_BULK_CREATE_BATCH_SIZE=3)
+    def test_create_vouchers_in_batches(self):
+        """ Verify vouchers created over several batches are unique and linked to their offer and coupon. """
+        vouchers = self.create_single_use_vouchers(10)
+
+        self.assertEqual(len(vouchers), 10)
+        self.assertEqual(len(set(voucher.code for voucher in vouchers)), 10)
+
+        coupon_voucher = CouponVouchers.objects.get(coupon=self.coupon)
+        coupon_voucher_ids = set(coupon_voucher.vouchers.values_list('id', flat=True))
+        offer = vouchers[0].offers.get()
+        for voucher in vouchers:
+            self.assertIn(voucher.id, coupon_voucher_ids)
+            self.assertEqual(list(voucher.offers.all()), [offer])
+
+    def create_multi_use_vouchers(self, quantity):
+        """ Create the given number of multi-use vouchers for the test coupon. """
+        return create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2015, 10, 30),
+            name="Test voucher",
+            quantity=quantity,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.MULTI_USE,
+            max_uses=5
+        )
+
+    @override_settings(VOUCHER_BULK_CREATE_BATCH_SIZE=3)
+    def test_create_multi_use_vouchers(self):
+        """ Verify each multi-use voucher gets an offer of its own, and all offers share a condition and benefit. """
+        vouchers = self.create_multi_use_vouchers(10)
+
+        offers = [voucher.offers.get() for voucher in vouchers]
+        self.assertEqual(len(set(offers)), 10)
+        self.assertEqual(len(set(offer.slug for offer in offers)), 10)
+        self.assertEqual(len(set(offer.condition_id for offer in offers)), 1)
+        self.assertEqual(len(set(offer.benefit_id for offer in offers)), 1)
+
+        base_name = 'Coupon [{}]-{}-{}'.format(self.coupon.id, offers[0].benefit.type, offers[0].benefit.value)
+        self.assertEqual(offers[0].name, base_name)
+        for offer_number, offer in enumerate(offers[1:], start=1):
+            self.assertEqual(offer.name, '{} [{}]'.format(base_name, offer_number))
+            self.assertEqual(offer.max_global_applications, 5)
+            self.assertEqual(offer.status, ConditionalOffer.OPEN)
+
+    def test_create_multi_use_vouchers_query_count(self):
+        """ Verify the number of queries needed to create multi-use vouchers does not depend on the quantity. """
+        # Offers are named after their coupon, so each call needs a coupon of its own.
+        coupons = [self.create_coupon(catalog=self.catalog) for __ in range(2)]
+
+        self.coupon = coupons[0]
+        with CaptureQueriesContext(connection) as single_voucher_queries:
+            self.create_multi_use_vouchers(1)
+
+        self.coupon = coupons[1]
+        with CaptureQueriesContext(connection) as many_vouchers_queries:
+            self.create_multi_use_vouchers(30)
+
+        self.assertEqual(len(single_voucher_queries), len(many_vouchers_queries))
+
     @override_settings(VOUCHER_CODE_LENGTH=VOUCHER_CODE_LENGTH)
     def test_regenerate_voucher_code(self):
         """
@@ -382,6 +475,36 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertNotIn('Course Seat Types', field_names)
         self.assertNotIn('Redeemed For Course ID', field_names)
 
+    def create_redeemed_coupon(self, quantity):
+        """ Create a coupon with the given number of single-use vouchers, and redeem all of them. """
+        coupon = self.create_coupon(title='Tešt coupon {}'.format(quantity), catalog=self.catalog, quantity=quantity)
+        coupon.history.all().update(history_user=self.user)
+        for index, voucher in enumerate(coupon.attr.coupon_vouchers.vouchers.all()):
+            self.use_voucher('TESTORDER-{}-{}'.format(quantity, index), voucher, self.user)
+        return coupon
+
+    def test_generate_coupon_report_query_count(self):
+        """ Verify the number of queries needed to generate a report does not depend on the number of vouchers. """
+        query_counts = []
+        for quantity in (2, 6):
+            coupon = self.create_redeemed_coupon(quantity)
+            with CaptureQueriesContext(connection) as queries:
+                __, rows = generate_coupon_report([coupon.attr.coupon_vouchers])
+
+            self.assertEqual(len(rows), 1 + 2 * quantity)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_stream_coupon_report_in_batches(self):
+        """ Verify the report rows are the same no matter how many vouchers are loaded at a time. """
+        coupon = self.create_redeemed_coupon(5)
+        __, rows = generate_coupon_report([coupon.attr.coupon_vouchers])
+
+        with override_settings(COUPON_REPORT_BATCH_SIZE=2):
+            __, streamed_rows = stream_coupon_report([coupon.attr.coupon_vouchers])
+            self.assertEqual(list(streamed_rows), rows)
+
     def test_report_for_dynamic_coupon_with_fixed_benefit_type(self):
         """ Verify the coupon report contains correct data for coupon with fixed benefit type. """
         dynamic_coupon = self.create_coupon(
@@ -574,3 +697,98 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertEqual(new_offer.benefit.value, 50.00)
         self.assertEqual(new_offer.benefit.range.catalog, self.catalog)
         self.assertEqual(new_offer.email_domains, new_email_domains)
+
+    def create_cached_voucher(self):
+        """ Create a voucher, and resolve it once so that it is stored in the voucher caches. """
+        voucher = create_vouchers(
+            benefit_type=Benefit.PERCENTAGE,
+            benefit_value=100.00,
+            catalog=self.catalog,
+            coupon=self.coupon,
+            end_datetime=datetime.date(2099, 10, 30),
+            name='Cached voucher',
+            quantity=1,
+            start_datetime=datetime.date(2015, 10, 1),
+            voucher_type=Voucher.SINGLE_USE,
+            code=VOUCHER_CODE
+        )[0]
+        get_cached_voucher(voucher.code)
+        return voucher
+
+    def assert_cached_voucher_without_queries(self, code):
+        """ Assert the voucher, its offer, benefit, condition and range are resolved without database queries. """
+        with self.assertNumQueries(0):
+            voucher = get_cached_voucher(code)
+            offer = voucher.offers.first()
+            self.assertEqual(voucher.code, code)
+            self.assertEqual(offer.benefit.range.catalog_id, self.catalog.id)
+            self.assertEqual(offer.condition.range.catalog_id, self.catalog.id)
+        return voucher
+
+    def test_get_cached_voucher(self):
+        """ Verify vouchers are resolved from the per-process cache, and then from the shared cache. """
+        voucher = self.create_cached_voucher()
+        stats = voucher_cache.stats.copy()
+
+        self.assert_cached_voucher_without_queries(voucher.code)
+        self.assertEqual(voucher_cache.stats['local_hits'], stats['local_hits'] + 1)
+
+        voucher_cache.clear()
+        self.assert_cached_voucher_without_queries(voucher.code)
+        self.assertEqual(voucher_cache.stats['shared_hits'], stats['shared_hits'] + 1)
+        self.assertEqual(voucher_cache.stats['misses'], stats['misses'])
+
+    def test_get_cached_voucher_returns_copies(self):
+        """ Verify modifying a resolved voucher does not modify the cached one. """
+        voucher = self.create_cached_voucher()
+        get_cached_voucher(voucher.code).name = 'Modified'
+        self.assertEqual(get_cached_voucher(voucher.code).name, 'Cached voucher')
+
+    def test_get_cached_voucher_does_not_exist(self):
+        """ Verify a missing voucher raises DoesNotExist, and is counted as a miss. """
+        misses = voucher_cache.stats['misses']
+        with self.assertRaises(Voucher.DoesNotExist):
+            get_cached_voucher('DOESNOTEXIST')
+        self.assertEqual(voucher_cache.stats['misses'], misses + 1)
+
+    def test_get_cached_voucher_case_insensitive(self):
+        """ Verify vouchers looked up with a differently cased code are invalidated when saved. """
+        voucher = self.create_cached_voucher()
+        self.assertEqual(get_cached_voucher(voucher.code.lower()).id, voucher.id)
+
+        voucher.name = 'Renamed voucher'
+        voucher.save()
+        self.assertEqual(get_cached_voucher(voucher.code.lower()).name, 'Renamed voucher')
+
+    def test_get_cached_voucher_invalidation(self):
+        """ Verify saving a voucher, its offer, benefit or range invalidates the cached voucher. """
+        voucher = self.create_cached_voucher()
+
+        voucher.name = 'Renamed voucher'
+        voucher.save()
+        self.assertEqual(get_cached_voucher(voucher.code).name, 'Renamed voucher')
+
+        offer = voucher.offers.first()
+        offer.email_domains = 'example.com'
+        offer.save()
+        self.assertEqual(get_cached_voucher(voucher.code).offers.first().email_domains, 'example.com')
+
+        benefit = offer.benefit
+        benefit.value = 50
+        benefit.save()
+        self.assertEqual(get_cached_voucher(voucher.code).offers.first().benefit.value, 50)
+
+        product_range = benefit.range
+        product_range.course_seat_types = 'verified'
+        product_range.save()
+        self.assertEqual(get_cached_voucher(voucher.code).offers.first().benefit.range.course_seat_types, 'verified')
+
+        other_offer = ConditionalOfferFactory()
+        voucher.offers.add(other_offer)
+        self.assertEqual(get_cached_voucher(voucher.code).offers.count(), 2)
+
+        self.assert_cached_voucher_without_queries(voucher.code)
+
+        voucher.delete()
+        with self.assertRaises(Voucher.DoesNotExist):
+            get_cached_voucher(voucher.code)
@@ -1,6 +1,7 @@
 """Voucher Utility Methods. """
 from decimal import Decimal, DecimalException
 import base64
+import csv
 import datetime
 import hashlib
 import logging
@@ -10,12 +11,15 @@ from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.urlresolvers import reverse
+from django.db.models import Count, Max, Sum
 from django.utils.translation import ugettext_lazy as _
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_model
+from oscar.core.utils import slugify
 from oscar.templatetags.currency_filters import currency
 import pytz
 
+from ecommerce.core.local_cache import LocalCache
 from ecommerce.core.url_utils import get_ecommerce_url
 from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.offer.utils import get_discount_percentage, get_discount_value
@@ -143,11 +147,11 @@ def _get_info_for_coupon_report(coupon, voucher):
     return coupon_data
 
 
-def _get_voucher_info_for_coupon_report(voucher):
-    offer = voucher.offers.first()
+def _get_voucher_info_for_coupon_report(voucher, offer_url):
+    # The offers are prefetched, and unlike first(), indexing all() does not bypass the prefetch cache.
+    offer = voucher.offers.all()[0]
     status = _get_voucher_status(voucher, offer)
-    path = '{path}?code={code}'.format(path=reverse('coupons:offer'), code=voucher.code)
-    url = get_ecommerce_url(path)
+    url = '{url}?code={code}'.format(url=offer_url, code=voucher.code)
 
     # Set the max_uses_count for single-use vouchers to 1,
     # for other usage limitations (once per customer and multi-use)
@@ -174,16 +178,103 @@ def _get_voucher_info_for_coupon_report(voucher):
     return coupon_data
 
 
-def generate_coupon_report(coupon_vouchers):
+def _get_coupon_row_for_coupon_report(coupon_voucher):
+    coupon = coupon_voucher.coupon
+    row = _get_info_for_coupon_report(coupon, coupon_voucher.vouchers.first())
+    row['Client'] = Invoice.objects.get(order__lines__product=coupon).business_client.name
+    return row
+
+
+def _get_voucher_batches_for_coupon_report(coupon_voucher):
     """
-    Generate coupon report data
+    Yield the vouchers of a coupon, with their offers, in batches of COUPON_REPORT_BATCH_SIZE.
+
+    Batches are paginated on the voucher ID rather than with offsets, so that each
+    batch costs the same number of queries no matter how far into the coupon it is.
+    """
+    last_voucher_id = 0
+    while True:
+        vouchers = list(
+            coupon_voucher.vouchers.filter(id__gt=last_voucher_id).order_by('id').prefetch_related('offers')[
+                :settings.COUPON_REPORT_BATCH_SIZE
+            ]
+        )
+        if not vouchers:
+            return
+
+        yield vouchers
+        last_voucher_id = vouchers[-1].id
+
+
+def _get_voucher_applications_for_coupon_report(vouchers):
+    """
+    Return the redemptions of the given vouchers, as a dict of lists keyed by voucher ID.
+
+    The users, orders, order lines and products of all redemptions are loaded with a fixed number of queries.
+    """
+    redeemed_vouchers = [voucher for voucher in vouchers if voucher.num_orders > 0]
+    if not redeemed_vouchers:
+        return {}
+
+    voucher_applications = VoucherApplication.objects.filter(
+        voucher__in=redeemed_vouchers
+    ).select_related('user', 'order').prefetch_related('order__lines__product').order_by('id')
+
+    applications_by_voucher = {}
+    for application in voucher_applications:
+        applications_by_voucher.setdefault(application.voucher_id, []).append(application)
+
+    return applications_by_voucher
+
+
+def _generate_coupon_report_rows(coupon_vouchers, first_coupon_row, is_query_coupon_report, offer_url):
+    for index, coupon_voucher in enumerate(coupon_vouchers):
+        yield first_coupon_row if index == 0 else _get_coupon_row_for_coupon_report(coupon_voucher)
+
+        for vouchers in _get_voucher_batches_for_coupon_report(coupon_voucher):
+            applications_by_voucher = _get_voucher_applications_for_coupon_report(vouchers)
+
+            for voucher in vouchers:
+                row = _get_voucher_info_for_coupon_report(voucher, offer_url)
+
+                for item in ('Order Number', 'Redeemed By Username',):
+                    row[item] = ''
+
+                yield row
+                for application in applications_by_voucher.get(voucher.id, []):
+                    new_row = row.copy()
+
+                    if is_query_coupon_report:
+                        new_row['Redeemed For Course ID'] = application.order.lines.all()[0].product.course_id
+
+                    new_row.update({
+                        'Status': _('Redeemed'),
+                        'Order Number': application.order.number,
+                        'Redeemed By Username': application.user.username,
+                        'Maximum Coupon Usage': 1,
+                        'Redemption Count': 1,
+                    })
+
+                    yield new_row
+
+
+def stream_coupon_report(coupon_vouchers, site=None):
+    """
+    Generate coupon report data, one row at a time.
+
+    The first row of each coupon contains the data shared by all of its vouchers. It is
+    followed by a row per voucher, and a row per redemption of that voucher. Vouchers are
+    loaded in batches of COUPON_REPORT_BATCH_SIZE, along with everything needed for their
+    rows, so both memory use and the number of queries per batch stay constant no matter
+    how many vouchers and redemptions a coupon has.
 
     Args:
         coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
+        site (Site): Site whose URLs the report links to. Defaults to the site of the current request.
 
     Returns:
         List[str]
-        List[dict]
+        Iterator[dict]
     """
 
     field_names = [
@@ -214,44 +305,16 @@ def generate_coupon_report(coupon_vouchers):
         _('Coupon Expiry Date'),
         _('Email Domains'),
     ]
-    rows = []
-
-    for coupon_voucher in coupon_vouchers:
-        coupon = coupon_voucher.coupon
-        client = Invoice.objects.get(order__lines__product=coupon).business_client.name
-        rows.append(_get_info_for_coupon_report(coupon, coupon_voucher.vouchers.first()))
-        rows[0]['Client'] = client
-
-        for voucher in coupon_voucher.vouchers.all().prefetch_related('offers'):
-            row = _get_voucher_info_for_coupon_report(voucher)
-
-            for item in ('Order Number', 'Redeemed By Username',):
-                row[item] = ''
-
-            rows.append(row)
-            if voucher.num_orders > 0:
-                voucher_applications = VoucherApplication.objects.filter(
-                    voucher=voucher).prefetch_related('user', 'order__lines')
-                for application in voucher_applications:
-                    redemption_user_username = application.user.username
-                    redemption_course_id = application.order.lines.first().product.course_id
-
-                    new_row = row.copy()
-
-                    if 'Catalog Query' in rows[0]:
-                        new_row['Redeemed For Course ID'] = redemption_course_id
-
-                    new_row.update({
-                        'Status': _('Redeemed'),
-                        'Order Number': application.order.number,
-                        'Redeemed By Username': redemption_user_username,
-                        'Maximum Coupon Usage': 1,
-                        'Redemption Count': 1,
-                    })
 
-                    rows.append(new_row)
+    # The fields of the report depend on the first coupon, so its first row is generated upfront.
+    # So is the offer URL, which may need the current request to still be around.
+    offer_path = reverse('coupons:offer')
+    offer_url = site.siteconfiguration.build_ecommerce_url(offer_path) if site else get_ecommerce_url(offer_path)
+    coupon_vouchers = list(coupon_vouchers)
+    first_coupon_row = _get_coupon_row_for_coupon_report(coupon_vouchers[0])
+    is_query_coupon_report = 'Catalog Query' in first_coupon_row
 
-    if 'Catalog Query' in rows[0]:
+    if is_query_coupon_report:
         field_names.remove('Course ID')
         field_names.remove('Organization')
     else:
@@ -259,33 +322,89 @@ def generate_coupon_report(coupon_vouchers):
         field_names.remove('Course Seat Types')
         field_names.remove('Redeemed For Course ID')
 
+    rows = _generate_coupon_report_rows(coupon_vouchers, first_coupon_row, is_query_coupon_report, offer_url)
     return field_names, rows
 
 
-def _get_or_create_offer(
-        product_range, benefit_type, benefit_value, coupon_id=None,
-        max_uses=None, offer_number=None, email_domains=None
-):
+def generate_coupon_report(coupon_vouchers):
     """
-    Return an offer for a catalog with condition and benefit.
+    Generate coupon report data
 
-    If offer doesn't exist, new offer will be created and associated with
-    provided Offer condition and benefit.
+    Args:
+        coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
+
+    Returns:
+        List[str]
+        List[dict]
+    """
+    field_names, rows = stream_coupon_report(coupon_vouchers)
+    return field_names, list(rows)
+
+
+def get_coupon_report_watermark(coupon):
+    """
+    Return a value that identifies the current state of a coupon's report.
+
+    The value changes when the coupon is edited (which saves the coupon product),
+    when vouchers are added to or removed from it, and when one of its vouchers is redeemed.
+
+    Args:
+        coupon (Product): Coupon product.
+
+    Returns:
+        str
+    """
+    vouchers = Voucher.objects.filter(coupon_vouchers__coupon=coupon)
+    voucher_aggregates = vouchers.aggregate(count=Count('id'), last_id=Max('id'), num_orders=Sum('num_orders'))
+    last_application_id = VoucherApplication.objects.filter(voucher__in=vouchers).aggregate(last_id=Max('id'))
+
+    watermark = '{date_updated}-{count}-{last_id}-{num_orders}-{last_application_id}'.format(
+        date_updated=coupon.date_updated.isoformat(),
+        last_application_id=last_application_id['last_id'],
+        **voucher_aggregates
+    )
+    return hashlib.md5(watermark).hexdigest()
+
+
+class _Echo(object):
+    """ File-like object that returns what is written to it, so a CSV writer produces lines instead of writing them. """
+
+    def write(self, value):
+        return value
+
+
+def generate_coupon_report_csv_lines(field_names, rows):
+    """
+    Generate the lines of a coupon report CSV file, one at a time.
+
+    Args:
+        field_names (List[str]): Report fields, as returned by stream_coupon_report.
+        rows (Iterable[dict]): Report rows, as returned by stream_coupon_report.
+
+    Returns:
+        Iterator[str]
+    """
+    writer = csv.DictWriter(_Echo(), fieldnames=field_names)
+    yield writer.writerow(dict(zip(field_names, field_names)))
+    for row in rows:
+        for key, value in row.items():
+            if isinstance(value, unicode):
+                row[key] = value.encode('utf-8')
+        yield writer.writerow(row)
+
+
+def _get_or_create_condition_and_benefit(product_range, benefit_type, benefit_value):
+    """
+    Return the condition and benefit shared by the offers of a coupon.
 
     Args:
         product_range (Range): Range of products associated with condition
         benefit_type (str): Type of benefit associated with the offer
         benefit_value (Decimal): Value of benefit associated with the offer
-    Kwargs:
-        coupon_id (int): ID of the coupon
-        max_uses (int): number of maximum global application number an offer can have
-        offer_number (int): number of the consecutive offer - used in case of a multiple
-                            multi-use coupon
-        email_domains (str): a comma-separated string of email domains allowed to apply
-                            this offer
 
     Returns:
-        Offer
+        Condition
+        Benefit
     """
     offer_condition, __ = Condition.objects.get_or_create(
         range=product_range,
@@ -303,12 +422,45 @@ def _get_or_create_offer(
         logger.exception('Failed to create Benefit. Benefit value may not be empty or a string.')
         raise ValidationError(_('Benefit value must be a positive number or 0.'))
 
+    return offer_condition, offer_benefit
+
+
+def _get_offer_name(coupon_id, offer_benefit, offer_number=None):
     offer_name = "Coupon [{}]-{}-{}".format(coupon_id, offer_benefit.type, offer_benefit.value)
     if offer_number:
         offer_name = "{} [{}]".format(offer_name, offer_number)
+    return offer_name
+
+
+def _get_or_create_offer(
+        product_range, benefit_type, benefit_value, coupon_id=None,
+        max_uses=None, offer_number=None, email_domains=None
+):
+    """
+    Return an offer for a catalog with condition and benefit.
+
+    If offer doesn't exist, new offer will be created and associated with
+    provided Offer condition and benefit.
+
+    Args:
+        product_range (Range): Range of products associated with condition
+        benefit_type (str): Type of benefit associated with the offer
+        benefit_value (Decimal): Value of benefit associated with the offer
+    Kwargs:
+        coupon_id (int): ID of the coupon
+        max_uses (int): number of maximum global application number an offer can have
+        offer_number (int): number of the consecutive offer - used in case of a multiple
+                            multi-use coupon
+        email_domains (str): a comma-separated string of email domains allowed to apply
+                            this offer
+
+    Returns:
+        Offer
+    """
+    offer_condition, offer_benefit = _get_or_create_condition_and_benefit(product_range, benefit_type, benefit_value)
 
     offer, __ = ConditionalOffer.objects.get_or_create(
-        name=offer_name,
+        name=_get_offer_name(coupon_id, offer_benefit, offer_number),
         offer_type=ConditionalOffer.VOUCHER,
         condition=offer_condition,
         benefit=offer_benefit,
@@ -319,64 +471,190 @@ def _get_or_create_offer(
     return offer
 
 
-def _generate_code_string(length):
+def _get_or_create_offers(
+        product_range, benefit_type, benefit_value, quantity, coupon_id=None, max_uses=None, email_domains=None
+):
     """
-    Create a string of random characters of specified length
+    Return a list of consecutive offers that share the same condition and benefit.
+
+    Used for multi-use coupons, where each voucher needs an offer of its own. The condition
+    and benefit are fetched or created once, and the offers that don't exist yet are created
+    with bulk inserts of VOUCHER_BULK_CREATE_BATCH_SIZE offers at a time.
 
     Args:
-        length (int): Defines the length of randomly generated string.
+        product_range (Range): Range of products associated with condition
+        benefit_type (str): Type of benefit associated with the offers
+        benefit_value (Decimal): Value of benefit associated with the offers
+        quantity (int): Number of offers to return
+    Kwargs:
+        coupon_id (int): ID of the coupon
+        max_uses (int): number of maximum global application number each offer can have
+        email_domains (str): a comma-separated string of email domains allowed to apply
+                            the offers
+
+    Returns:
+        List[Offer], ordered by offer number.
+    """
+    offer_condition, offer_benefit = _get_or_create_condition_and_benefit(product_range, benefit_type, benefit_value)
+    offer_names = [_get_offer_name(coupon_id, offer_benefit, offer_number) for offer_number in range(quantity)]
+
+    offers_by_name = {}
+    batch_size = settings.VOUCHER_BULK_CREATE_BATCH_SIZE
+    for batch_start in range(0, quantity, batch_size):
+        offers_by_name.update(_bulk_get_or_create_offers(
+            offer_names[batch_start:batch_start + batch_size],
+            offer_type=ConditionalOffer.VOUCHER,
+            condition=offer_condition,
+            benefit=offer_benefit,
+            max_global_applications=max_uses,
+            email_domains=email_domains
+        ))
+
+    return [offers_by_name[name] for name in offer_names]
+
+
+def _bulk_get_or_create_offers(names, **offer_attributes):
+    """
+    Return a dict of offers keyed by name, creating the offers that don't exist yet.
+
+    Args:
+        names (List[str]): Names of the offers.
+        **offer_attributes: Values of the remaining offer fields, shared by all offers.
+
+    Returns:
+        dict
+    """
+    offers_by_name = {
+        offer.name: offer for offer in ConditionalOffer.objects.filter(name__in=names, **offer_attributes)
+    }
+    new_offers = [ConditionalOffer(name=name, **offer_attributes) for name in names if name not in offers_by_name]
+    if not new_offers:
+        return offers_by_name
+
+    # bulk_create() does not call ConditionalOffer.save(), which sets the offer status,
+    # and the slug field would otherwise look up every generated slug with a query of its own.
+    slug_max_length = ConditionalOffer._meta.get_field('slug').max_length
+    slugs = [slugify(offer.name)[:slug_max_length].strip('-') for offer in new_offers]
+    taken_slugs = set(ConditionalOffer.objects.filter(slug__in=slugs).values_list('slug', flat=True))
+    bulk_offers = []
+    conflicting_offers = []
+    for offer, slug in zip(new_offers, slugs):
+        if not slug or slug in taken_slugs:
+            conflicting_offers.append(offer)
+            continue
+
+        taken_slugs.add(slug)
+        offer.slug = slug
+        offer.status = ConditionalOffer.CONSUMED if offer.get_max_applications() == 0 else ConditionalOffer.OPEN
+        bulk_offers.append(offer)
+
+    ConditionalOffer.objects.bulk_create(bulk_offers)
+
+    # Not every database backend sets primary keys on objects saved with bulk_create(),
+    # so the IDs of the new rows are read back using their (unique) names.
+    offer_ids = dict(
+        ConditionalOffer.objects.filter(name__in=[offer.name for offer in bulk_offers]).values_list('name', 'id')
+    )
+    for offer in bulk_offers:
+        offer.id = offer_ids[offer.name]
+
+    # Offers whose slug is already taken are rare, and are saved one by one so the slug field
+    # can find them a unique slug.
+    for offer in conflicting_offers:
+        offer.save()
+
+    offers_by_name.update((offer.name, offer) for offer in new_offers)
+    return offers_by_name
+
+
+def _generate_code_strings(length, quantity):
+    """
+    Create a list of unique strings of random characters of specified length.
+
+    Candidate codes are generated in batches and checked against existing vouchers
+    with one query per batch. Candidates that collide are discarded and regenerated.
+
+    Args:
+        length (int): Defines the length of randomly generated strings.
+        quantity (int): Number of unique strings to generate.
 
     Raises:
         ValueError raised if length is less than one.
 
     Returns:
-        str
+        List[str]
     """
     if length < 1:
         raise ValueError("Voucher code length must be a positive number.")
 
-    h = hashlib.sha256()
-    h.update(uuid.uuid4().get_bytes())
-    voucher_code = base64.b32encode(h.digest())[0:length]
-    if Voucher.objects.filter(code__iexact=voucher_code).exists():
-        return _generate_code_string(length)
+    codes = []
+    seen = set()
+    batch_size = settings.VOUCHER_BULK_CREATE_BATCH_SIZE
+    while len(codes) < quantity:
+        candidates = set()
+        for __ in range(min(quantity - len(codes), batch_size)):
+            h = hashlib.sha256()
+            h.update(uuid.uuid4().get_bytes())
+            candidate = base64.b32encode(h.digest())[0:length]
+            if candidate not in seen:
+                candidates.add(candidate)
 
-    return voucher_code
+        seen.update(candidates)
+        existing = set(Voucher.objects.filter(code__in=candidates).values_list('code', flat=True))
+        codes.extend(candidates - existing)
 
+    return codes[:quantity]
 
-def _create_new_voucher(code, coupon, end_datetime, name, offer, start_datetime, voucher_type):
-    """
-    Creates a voucher.
 
-    If randomly generated voucher code already exists, new code will be generated and reverified.
+def _bulk_create_vouchers(codes, coupon_voucher, end_datetime, name, offers, start_datetime, voucher_type):
+    """
+    Create vouchers, and link them to their offers and coupon, with bulk inserts.
 
     Args:
-        code (str): Code associated with vouchers. If not provided, one will be generated.
-        coupon (Product): Coupon product associated with voucher.
+        codes (List[str]): Codes of the vouchers to create.
+        coupon_voucher (CouponVouchers): Coupon vouchers entity the new vouchers are added to.
         end_datetime (datetime): Voucher end date.
         name (str): Voucher name.
-        offer (Offer): Offer associated with voucher.
+        offers (List[Offer]): Offers associated with the vouchers, one per code.
         start_datetime (datetime): Voucher start date.
         voucher_type (str): Voucher usage.
 
     Returns:
-        Voucher
+        List[Voucher]
     """
-    voucher_code = code or _generate_code_string(settings.VOUCHER_CODE_LENGTH)
+    # Voucher.save() normally upper-cases the code, but bulk_create() does not call save().
+    codes = [code.upper() for code in codes]
+    vouchers = [
+        Voucher(
+            name=name,
+            code=code,
+            usage=voucher_type,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime
+        ) for code in codes
+    ]
+    Voucher.objects.bulk_create(vouchers)
 
-    voucher = Voucher.objects.create(
-        name=name,
-        code=voucher_code,
-        usage=voucher_type,
-        start_datetime=start_datetime,
-        end_datetime=end_datetime
-    )
-    voucher.offers.add(offer)
+    # Not every database backend sets primary keys on objects saved with bulk_create(),
+    # so the IDs of the new rows are read back using their (unique) codes.
+    voucher_ids = dict(Voucher.objects.filter(code__in=codes).values_list('code', 'id'))
+    for voucher in vouchers:
+        voucher.id = voucher_ids[voucher.code]
 
-    coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
-    coupon_voucher.vouchers.add(voucher)
+    # bulk_create() does not send post_save signals, which would otherwise invalidate cached vouchers.
+    invalidate_cached_vouchers(codes)
 
-    return voucher
+    VoucherOffers = Voucher.offers.through
+    VoucherOffers.objects.bulk_create([
+        VoucherOffers(voucher=voucher, conditionaloffer=offer) for voucher, offer in zip(vouchers, offers)
+    ])
+
+    CouponVouchersVouchers = CouponVouchers.vouchers.through
+    CouponVouchersVouchers.objects.bulk_create([
+        CouponVouchersVouchers(couponvouchers=coupon_voucher, voucher=voucher) for voucher in vouchers
+    ])
+
+    return vouchers
 
 
 def create_vouchers(
@@ -417,7 +695,6 @@ def create_vouchers(
     """
     logger.info("Creating [%d] vouchers product [%s]", quantity, coupon.id)
     vouchers = []
-    offers = []
 
     if _range:
         # Enrollment codes use a custom range.
@@ -440,30 +717,42 @@ def create_vouchers(
     multi_offer = True if (
         voucher_type == Voucher.MULTI_USE or voucher_type == Voucher.ONCE_PER_CUSTOMER
     ) else False
-    num_of_offers = quantity if multi_offer else 1
-    for num in range(num_of_offers):
+    if multi_offer:
+        offers = _get_or_create_offers(
+            product_range=product_range,
+            benefit_type=benefit_type,
+            benefit_value=benefit_value,
+            quantity=quantity,
+            coupon_id=coupon.id,
+            max_uses=max_uses,
+            email_domains=email_domains
+        )
+    else:
         offer = _get_or_create_offer(
             product_range=product_range,
             benefit_type=benefit_type,
             benefit_value=benefit_value,
             max_uses=max_uses,
             coupon_id=coupon.id,
-            offer_number=num,
             email_domains=email_domains
         )
-        offers.append(offer)
+        offers = [offer] * quantity
 
-    for i in range(quantity):
-        voucher = _create_new_voucher(
-            coupon=coupon,
+    codes = [code] * quantity if code else _generate_code_strings(settings.VOUCHER_CODE_LENGTH, quantity)
+    coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
+
+    batch_size = settings.VOUCHER_BULK_CREATE_BATCH_SIZE
+    for batch_start in range(0, quantity, batch_size):
+        batch_end = batch_start + batch_size
+        vouchers.extend(_bulk_create_vouchers(
+            codes=codes[batch_start:batch_end],
+            coupon_voucher=coupon_voucher,
             end_datetime=end_datetime,
-            offer=offers[i] if multi_offer else offers[0],
+            name=name,
+            offers=offers[batch_start:batch_end],
             start_datetime=start_datetime,
-            voucher_type=voucher_type,
-            code=code,
-            name=name
-        )
-        vouchers.append(voucher)
+            voucher_type=voucher_type
+        ))
 
     return vouchers
 
@@ -538,10 +827,83 @@ def update_voucher_offer(offer, benefit_value, benefit_type, coupon, max_uses=No
     )
 
 
+# Resolved vouchers, by code, kept in front of the shared Django cache.
+voucher_cache = LocalCache('VOUCHER_LOCAL_CACHE_TIMEOUT', 'VOUCHER_LOCAL_CACHE_SIZE')
+
+
+def _normalize_voucher_code(code):
+    # Voucher.save() upper-cases codes.
+    return code.upper()
+
+
+def _get_voucher_cache_key(code):
+    cache_key = u'voucher_{code}'.format(code=code)
+    return hashlib.md5(cache_key.encode('utf-8')).hexdigest()
+
+
+def _get_voucher_offer_cache_key(offer_id):
+    return 'voucher_offer_{offer_id}'.format(offer_id=offer_id)
+
+
+def _get_shared_cached_voucher(code):
+    """
+    Assemble a voucher and its offers from the shared cache, populating it from the database on a miss.
+
+    Vouchers and offers are cached under separate keys, since a single offer is shared by every voucher
+    of a coupon. Recording the usage of an offer then only invalidates one cache entry, not one per voucher.
+
+    Returns:
+        voucher (Voucher): The Voucher for the passed code, with its offers prefetched.
+        hit (bool): Whether the voucher and all of its offers were found in the shared cache.
+
+    Raises:
+        Voucher.DoesNotExist: When no vouchers with provided code exist.
+    """
+    voucher_cache_key = _get_voucher_cache_key(code)
+    cached_voucher = cache.get(voucher_cache_key)
+    hit = cached_voucher is not None
+    if hit:
+        voucher, offer_ids = cached_voucher
+    else:
+        voucher = Voucher.objects.get(code=code)
+        offer_ids = list(voucher.offers.values_list('id', flat=True))
+        cache.set(voucher_cache_key, (voucher, offer_ids), settings.VOUCHER_CACHE_TIMEOUT)
+
+    offer_cache_keys = {offer_id: _get_voucher_offer_cache_key(offer_id) for offer_id in offer_ids}
+    cached_offers = cache.get_many(offer_cache_keys.values())
+    offers = {offer_id: cached_offers.get(cache_key) for offer_id, cache_key in offer_cache_keys.items()}
+
+    missing_offer_ids = [offer_id for offer_id, offer in offers.items() if offer is None]
+    if missing_offer_ids:
+        hit = False
+        fetched_offers = ConditionalOffer.objects.filter(id__in=missing_offer_ids).select_related(
+            'benefit__range', 'condition__range'
+        )
+        for offer in fetched_offers:
+            offers[offer.id] = offer
+        cache.set_many(
+            {offer_cache_keys[offer.id]: offer for offer in fetched_offers}, settings.VOUCHER_CACHE_TIMEOUT
+        )
+
+    # Mimic prefetch_related(), so that voucher.offers.all() and voucher.offers.first() do not query the database.
+    # The offer IDs are stored in the default ordering of the offers relation.
+    # pylint: disable=protected-access
+    offers_queryset = voucher.offers.all()
+    offers_queryset._result_cache = [offers[offer_id] for offer_id in offer_ids if offers[offer_id] is not None]
+    offers_queryset._prefetch_done = True
+    voucher._prefetched_objects_cache = {'offers': offers_queryset}
+
+    return voucher, hit
+
+
 def get_cached_voucher(code):
     """
-    Returns a voucher from cache if one is stored to cache, if not the voucher
-    is retrieved from database and stored to cache.
+    Returns the voucher for a code, together with its offers, their benefits, conditions and ranges.
+
+    Vouchers are looked up in a per-process LRU cache first, then in the shared Django cache, and
+    only then in the database. Cache entries are invalidated when a voucher, or any of its offers,
+    benefits, conditions or ranges, is saved (see ecommerce.extensions.voucher.signals).
+    Lookups are counted in voucher_cache.stats, under local_hits, shared_hits and misses.
 
     Arguments:
         code (str): The code of a coupon voucher.
@@ -552,15 +914,51 @@ def get_cached_voucher(code):
     Raises:
         Voucher.DoesNotExist: When no vouchers with provided code exist.
     """
-    cache_key = 'voucher_{code}'.format(code=code)
-    cache_key = hashlib.md5(cache_key).hexdigest()
-    voucher = cache.get(cache_key)
-    if not voucher:
-        voucher = Voucher.objects.get(code=code)
-        cache.set(cache_key, voucher, settings.VOUCHER_CACHE_TIMEOUT)
+    # Codes are stored upper-cased, and matched case-insensitively by MySQL. Normalizing them keeps the
+    # entries of a voucher under a single key, which invalidate_cached_vouchers() can find.
+    code = _normalize_voucher_code(code)
+    voucher = voucher_cache.get(code)
+    if voucher is not None:
+        voucher_cache.stats['local_hits'] += 1
+        return voucher
+
+    try:
+        voucher, hit = _get_shared_cached_voucher(code)
+    except Voucher.DoesNotExist:
+        voucher_cache.stats['misses'] += 1
+        raise
+
+    voucher_cache.stats['shared_hits' if hit else 'misses'] += 1
+    voucher_cache.set(code, voucher)
     return voucher
 
 
+def invalidate_cached_vouchers(codes):
+    """
+    Remove vouchers from the voucher caches.
+
+    Arguments:
+        codes (Iterable[str]): Codes of the vouchers to invalidate.
+    """
+    codes = [_normalize_voucher_code(code) for code in codes]
+    for code in codes:
+        voucher_cache.delete(code)
+    cache.delete_many([_get_voucher_cache_key(code) for code in codes])
+
+
+def invalidate_cached_voucher_offers(offer_ids):
+    """
+    Remove offers from the voucher caches.
+
+    Entries of the per-process cache are not indexed by offer, so it is cleared completely.
+
+    Arguments:
+        offer_ids (Iterable[int]): IDs of the offers to invalidate.
+    """
+    voucher_cache.clear()
+    cache.delete_many([_get_voucher_offer_cache_key(offer_id) for offer_id in offer_ids])
+
+
 def get_voucher_and_products_from_code(code):
     """
     Returns a voucher and product for a given code.
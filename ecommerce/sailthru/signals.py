@@ -9,21 +9,21 @@ from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.extensions.analytics.utils import silence_exceptions
+from ecommerce.extensions.checkout.utils import is_post_checkout_effect_delivered, record_post_checkout_effect_delivery
 
 logger = logging.getLogger(__name__)
-post_checkout = get_class('checkout.signals', 'post_checkout')
 basket_addition = get_class('basket.signals', 'basket_addition')
 BasketAttribute = get_model('basket', 'BasketAttribute')
 BasketAttributeType = get_model('basket', 'BasketAttributeType')
 SAILTHRU_CAMPAIGN = 'sailthru_bid'
 
 
-@receiver(post_checkout)
-@silence_exceptions("Failed to call Sailthru upon order completion.")
 def process_checkout_complete(sender, order=None, user=None, request=None,  # pylint: disable=unused-argument
-                              response=None, **kwargs):  # pylint: disable=unused-argument
+                              response=None, idempotency_key=None, **kwargs):  # pylint: disable=unused-argument
     """Tell Sailthru when payment done.
 
+    Lines already sent to Sailthru for the idempotency key of the effect are not sent again.
+
     Arguments:
             Parameters described at http://django-oscar.readthedocs.io/en/releases-1.1/ref/signals.html
     """
@@ -61,6 +61,11 @@ def process_checkout_complete(sender, order=None, user=None, request=None,  # py
         product_class_name = product.get_product_class().name
 
         if product_class_name == SEAT_PRODUCT_CLASS_NAME:
+            line_idempotency_key = '{}:{}'.format(idempotency_key, line.id) if idempotency_key else None
+            if line_idempotency_key and is_post_checkout_effect_delivered(line_idempotency_key):
+                logger.info('Ignoring repeated delivery [%s] of a Sailthru purchase.', line_idempotency_key)
+                continue
+
             price = line.line_price_excl_tax
             course_id = product.course_id
 
@@ -70,6 +75,8 @@ def process_checkout_complete(sender, order=None, user=None, request=None,  # py
                                            unit_cost=price, course_id=course_id, currency=order.currency,
                                            site_code=partner.short_code,
                                            message_id=message_id)
+            if line_idempotency_key:
+                record_post_checkout_effect_delivery(line_idempotency_key)
 
 
 @receiver(basket_addition)
@@ -101,13 +108,7 @@ def process_basket_addition(sender, product=None, user=None, request=None, baske
             currency = stock_record.price_currency
 
         # save Sailthru campaign ID, if there is one
-        message_id = request.COOKIES.get('sailthru_bid')
-        if message_id and basket:
-            BasketAttribute.objects.update_or_create(
-                basket=basket,
-                attribute_type=get_basket_attribute_type(),
-                defaults={'value_text': message_id}
-            )
+        message_id = save_campaign_id(basket, request)
 
         # inform sailthru if there is a price.  The purpose of this call is to tell Sailthru when
         # an item has been added to the shopping cart so that an abandoned cart message can be sent
@@ -132,3 +133,23 @@ def get_basket_attribute_type():
         BasketAttributeType
     """
     return BasketAttributeType.objects.get(name=SAILTHRU_CAMPAIGN)
+
+
+def save_campaign_id(basket, request):
+    """ Saves the Sailthru campaign ID found in the cookies of the request as an attribute of the basket.
+
+    Post-checkout effects are dispatched without the purchase request, so the campaign ID of the purchase
+    must be saved with the basket for Sailthru to be told about it.
+
+    Returns:
+        str: The campaign ID, or None if the request has none.
+    """
+    message_id = request.COOKIES.get(SAILTHRU_CAMPAIGN) if request else None
+    if message_id and basket:
+        BasketAttribute.objects.update_or_create(
+            basket=basket,
+            attribute_type=get_basket_attribute_type(),
+            defaults={'value_text': message_id}
+        )
+
+    return message_id
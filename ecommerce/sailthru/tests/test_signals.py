@@ -104,6 +104,15 @@ class SailthruSignalTests(CouponMixin, CourseCatalogTestMixin, TestCase):
                                                          site_code='edX',
                                                          unit_cost=order.total_excl_tax)
 
+    @patch('ecommerce_worker.sailthru.v1.tasks.update_course_enrollment.delay')
+    def test_process_checkout_complete_repeated_delivery(self, mock_update_course_enrollment):
+        """ Verify Sailthru is only told once of the purchase of each line per idempotency key. """
+        __, order = self._create_order(99)
+        idempotency_key = '{}:sailthru_checkout_complete'.format(order.number)
+        process_checkout_complete(None, order=order, idempotency_key=idempotency_key)
+        process_checkout_complete(None, order=order, idempotency_key=idempotency_key)
+        self.assertEqual(mock_update_course_enrollment.call_count, 1)
+
     @patch('ecommerce_worker.sailthru.v1.tasks.update_course_enrollment.delay')
     def test_process_checkout_complete_without_request(self, mock_update_course_enrollment):
         """ Verify the post_checkout receiver can handle cases in which it is called without a request. """
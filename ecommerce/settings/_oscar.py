@@ -83,6 +83,26 @@ FULFILLMENT_MODULES = [
     'ecommerce.extensions.fulfillment.modules.EnrollmentCodeFulfillmentModule',
 ]
 
+# Side effects of placing an order, other than its fulfillment, by name. They are recorded with the order,
+# and delivered asynchronously, at least once, by the dispatch_post_checkout_effects task.
+POST_CHECKOUT_EFFECTS = {
+    'track_completed_order': 'ecommerce.extensions.checkout.signals.track_completed_order',
+    'send_course_purchase_email': 'ecommerce.extensions.checkout.signals.send_course_purchase_email',
+    'sailthru_checkout_complete': 'ecommerce.sailthru.signals.process_checkout_complete',
+}
+
+# Effects whose delivery fails are delivered again after POST_CHECKOUT_EFFECT_RETRY_BACKOFF * 2 ** attempts
+# seconds, up to POST_CHECKOUT_EFFECT_RETRY_MAX_BACKOFF seconds, and given up on after
+# POST_CHECKOUT_EFFECT_MAX_ATTEMPTS attempts.
+POST_CHECKOUT_EFFECT_RETRY_BACKOFF = 30
+POST_CHECKOUT_EFFECT_RETRY_MAX_BACKOFF = 60 * 60
+POST_CHECKOUT_EFFECT_MAX_ATTEMPTS = 8
+# Maximum number of effects delivered by each run of the dispatch_post_checkout_effects task.
+POST_CHECKOUT_EFFECT_BATCH_SIZE = 100
+# Receivers record the deliveries of effects which cannot be repeated safely (e.g. emails) in the cache, for
+# longer than the retries of an effect last.
+POST_CHECKOUT_EFFECT_DELIVERY_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+
 HAYSTACK_CONNECTIONS = {
     'default': {
         'ENGINE': 'haystack.backends.simple_backend.SimpleEngine',
@@ -132,6 +152,40 @@ PAYMENT_PROCESSOR_CONFIG = {
 }
 
 PAYMENT_PROCESSOR_SWITCH_PREFIX = 'payment_processor_active_'
+
+# Transactions for which an order has been placed are remembered for this long, so that repeated
+# notifications of the transaction are acknowledged without being handled again.
+PAYMENT_NOTIFICATION_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+# Notifications for the same basket are handled one at a time. A notification waits up to
+# PAYMENT_NOTIFICATION_LOCK_WAIT seconds for another to be handled, after which the processor is asked
+# to deliver it again. Locks held for longer than PAYMENT_NOTIFICATION_LOCK_TIMEOUT are assumed to be stale.
+PAYMENT_NOTIFICATION_LOCK_WAIT = 5  # Value is in seconds.
+PAYMENT_NOTIFICATION_LOCK_TIMEOUT = 60  # Value is in seconds.
+
+# Maximum number of connections kept open to each payment processor API host, by each process.
+PAYMENT_PROCESSOR_POOL_MAXSIZE = 10
+# Parsed WSDL documents of SOAP APIs are cached on disk, in this directory, for this many days.
+# If no directory is set, the WSDL cache is kept in the system's temporary directory.
+SOAP_WSDL_CACHE_DIR = None
+SOAP_WSDL_CACHE_DAYS = 1
+
+# ID of the enabled PayPal web profile, cached by the PayPal processor.
+PAYPAL_WEB_PROFILE_CACHE_TIMEOUT = 60 * 60  # Value is in seconds.
+
+# When enabled, deferred payment processor responses are spooled to local disk, and written to the database in
+# batches by a background thread of each process, instead of being written as they are received.
+PAYMENT_PROCESSOR_RESPONSE_BUFFERING = False
+# Directory of the spool files of deferred responses. It must survive restarts, and be shared by the processes of
+# each host. If no directory is set, spool files are kept in the system's temporary directory.
+PAYMENT_PROCESSOR_RESPONSE_SPOOL_DIR = None
+# Maximum number of responses written to the database at once.
+PAYMENT_PROCESSOR_RESPONSE_BATCH_SIZE = 100
+# Maximum delay before spooled responses are written to the database.
+PAYMENT_PROCESSOR_RESPONSE_FLUSH_INTERVAL = 5  # Value is in seconds.
+# Spool files untouched for this long are assumed to have been abandoned by processes which died.
+PAYMENT_PROCESSOR_RESPONSE_SPOOL_STALE_AGE = 60 * 5  # Value is in seconds.
+# Responses older than this are moved to compressed files by the archive_payment_processor_responses command.
+PAYMENT_PROCESSOR_RESPONSE_RETENTION_DAYS = 365 * 2
 # END PAYMENT PROCESSING
 
 
@@ -259,6 +313,23 @@ OSCAR_DASHBOARD_NAVIGATION = [
 # Default timeout for Enrollment API calls
 ENROLLMENT_FULFILLMENT_TIMEOUT = 7
 
+# Enrollment API calls failing with a network error, a time out or a server error are retried up to
+# ENROLLMENT_FULFILLMENT_RETRIES times, waiting ENROLLMENT_FULFILLMENT_RETRY_BACKOFF * 2 ** attempt seconds in between.
+ENROLLMENT_FULFILLMENT_RETRIES = 2
+ENROLLMENT_FULFILLMENT_RETRY_BACKOFF = 0.5
+
+# Maximum number of lines of an order fulfilled concurrently through the Enrollment API
+ENROLLMENT_FULFILLMENT_MAX_WORKERS = 4
+
+# Lines whose fulfillment fails with a network error or a time out are fulfilled again by the
+# retry_fulfillments task, after FULFILLMENT_RETRY_BACKOFF * 2 ** attempts seconds, with jitter, up to
+# FULFILLMENT_RETRY_MAX_BACKOFF seconds. Lines are given up on after FULFILLMENT_RETRY_MAX_ATTEMPTS retries.
+FULFILLMENT_RETRY_BACKOFF = 60
+FULFILLMENT_RETRY_MAX_BACKOFF = 60 * 60 * 6
+FULFILLMENT_RETRY_MAX_ATTEMPTS = 10
+# Maximum number of lines retried by each run of the retry_fulfillments task. Runs never overlap.
+FULFILLMENT_RETRY_BATCH_SIZE = 50
+
 # Coupon code length
 VOUCHER_CODE_LENGTH = 16
 
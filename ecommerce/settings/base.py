@@ -203,6 +203,9 @@ TEMPLATES = [
 # MIDDLEWARE CONFIGURATION
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#middleware-classes
 MIDDLEWARE_CLASSES = (
+    # NOTE: CommitCallbackMiddleware runs callbacks once the request's transaction is committed, and must
+    # remain the first middleware.
+    'ecommerce.core.middleware.CommitCallbackMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -235,12 +238,52 @@ COMMERCE_API_TIMEOUT = 7
 # Cache course info from course API.
 COURSES_API_CACHE_TIMEOUT = 3600  # Value is in seconds
 
+# Number of course runs checked per call to the Course Catalog Service when running a range's catalog query.
+CATALOG_QUERY_BATCH_SIZE = 100
+# Ranges whose catalog query misses the cache CATALOG_QUERY_WARM_THRESHOLD times within
+# CATALOG_QUERY_WARM_WINDOW have their cache warmed, for all course runs, in the background.
+CATALOG_QUERY_WARM_THRESHOLD = 20
+CATALOG_QUERY_WARM_WINDOW = 60  # Value is in seconds.
+
 # PROVIDER DATA PROCESSING
 PROVIDER_DATA_PROCESSING_TIMEOUT = 15  # Value is in seconds.
 CREDIT_PROVIDER_CACHE_TIMEOUT = 600
 # END URL CONFIGURATION
 
-VOUCHER_CACHE_TIMEOUT = 10  # Value is in seconds.
+# Vouchers are cached in the shared cache until they, or their offers, are saved.
+VOUCHER_CACHE_TIMEOUT = 60 * 60  # Value is in seconds.
+# Vouchers are also cached in a per-process LRU cache, which save signals only invalidate
+# within the saving process. Its timeout bounds how long other processes may use a stale voucher.
+VOUCHER_LOCAL_CACHE_TIMEOUT = 5  # Value is in seconds.
+VOUCHER_LOCAL_CACHE_SIZE = 1000
+
+# The products of SKUs are cached in a per-process LRU cache, until a product or stock record is saved.
+# Its timeout bounds how long a process may use a product changed without save signals (e.g. by update()).
+PRODUCT_LOCAL_CACHE_TIMEOUT = 60 * 5  # Value is in seconds.
+PRODUCT_LOCAL_CACHE_SIZE = 1000
+
+# Active site offers are cached until an offer, or its benefit, condition or range, is saved.
+SITE_OFFERS_CACHE_TIMEOUT = 60 * 60  # Value is in seconds.
+
+# Range membership indexes are cached until the range, its products or its catalog change.
+RANGE_MEMBERSHIP_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+RANGE_MEMBERSHIP_LOCAL_CACHE_SIZE = 1000
+
+# Course seat IDs are indexed by certificate type and verification requirement when seats are saved.
+SEAT_INDEX_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+
+# The SKUs of the basket switch links between course seats and enrollment codes are indexed when they are saved.
+SIBLING_SKUS_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+
+# Number of vouchers written per bulk insert when creating vouchers for a coupon.
+# Keep this below 999 so that code lookups fit within SQLite's query variable limit.
+VOUCHER_BULK_CREATE_BATCH_SIZE = 500
+
+# Number of vouchers, with their offers and redemptions, loaded at a time when generating a coupon report.
+COUPON_REPORT_BATCH_SIZE = 500
+
+# Coupon reports still pending, or in progress, after this long are considered failed, and can be requeued.
+COUPON_REPORT_TIMEOUT = 60 * 60  # Value is in seconds.
 
 # APP CONFIGURATION
 DJANGO_APPS = [
@@ -417,6 +460,11 @@ EXTRA_SCOPE = ['permissions']
 # Specify a key to emit events to the corresponding Segment project. `None` disables tracking.
 # See: https://segment.com/docs/libraries/python/
 SEGMENT_KEY = None
+
+# Maximum number of events queued on the Segment client of a write key, in each process. Further events are dropped.
+SEGMENT_CLIENT_MAX_QUEUE_SIZE = 10000
+# Maximum time a process waits, when exiting, for its queued events to be uploaded to Segment.
+SEGMENT_CLIENT_FLUSH_TIMEOUT = 5  # Value is in seconds.
 # END ANALYTICS
 
 
@@ -488,8 +536,25 @@ BROKER_HEARTBEAT_CHECKRATE = 2
 # See http://celery.readthedocs.org/en/latest/configuration.html#celery-imports.
 CELERY_IMPORTS = (
     'ecommerce_worker.fulfillment.v1.tasks',
+    'ecommerce.extensions.voucher.tasks',
+    'ecommerce.extensions.offer.tasks',
+    'ecommerce.extensions.fulfillment.tasks',
+    'ecommerce.extensions.checkout.tasks',
 )
 
+# Periodic tasks, run by celery beat.
+# See http://celery.readthedocs.org/en/latest/userguide/periodic-tasks.html.
+CELERYBEAT_SCHEDULE = {
+    'retry-fulfillments': {
+        'task': 'ecommerce.extensions.fulfillment.tasks.retry_fulfillments',
+        'schedule': datetime.timedelta(minutes=1),
+    },
+    'dispatch-post-checkout-effects': {
+        'task': 'ecommerce.extensions.checkout.tasks.dispatch_post_checkout_effects',
+        'schedule': datetime.timedelta(minutes=1),
+    },
+}
+
 CELERY_ROUTES = {'ecommerce_worker.fulfillment.v1.tasks.fulfill_order': {'queue': 'fulfillment'},
                  'ecommerce_worker.sailthru.v1.tasks.update_course_enrollment': {'queue': 'email_marketing'}}
 
@@ -63,6 +63,8 @@ PASSWORD_HASHERS = (
 
 # ORDER PROCESSING
 EDX_API_KEY = 'replace-me'
+# Retry failed Enrollment API calls without waiting.
+ENROLLMENT_FULFILLMENT_RETRY_BACKOFF = 0
 # END ORDER PROCESSING
 
 
@@ -22,6 +22,7 @@ from threadlocals.threadlocals import set_thread_variable
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
+from ecommerce.extensions.voucher.utils import voucher_cache
 from ecommerce.tests.factories import SiteConfigurationFactory
 
 Applicator = get_class('offer.utils', 'Applicator')
@@ -79,6 +80,18 @@ class ThrottlingMixin(object):
         self.addCleanup(cache.clear)
 
 
+class CacheCleanupMixin(object):
+    """
+    Clears the caches after each test. Rolled back vouchers and ranges do not send the signals which
+    would invalidate their cached copies.
+    """
+
+    def setUp(self):
+        super(CacheCleanupMixin, self).setUp()
+        self.addCleanup(cache.clear)
+        self.addCleanup(voucher_cache.clear)
+
+
 class JwtMixin(object):
     """ Mixin with JWT-related helper functions. """
     JWT_SECRET_KEY = settings.JWT_AUTH['JWT_SECRET_KEY']